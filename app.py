@@ -5,10 +5,11 @@
 # - Normalização de textos para evitar mojibake (Ã, Â, �)
 # - Dashboard multi-arquivo com filtros globais + tabela sempre aparente
 # - Integração opcional com GitHub (persistência/baixa)
+# - Ingestão, gerenciamento e dashboard em fragmentos (st.fragment): um clique num filtro reexecuta só o dashboard
 
 import os
-import re
 import time
+import tempfile
 import pandas as pd
 import streamlit as st
 
@@ -17,16 +18,38 @@ from gpa.config import (
     ESQUEMA_PADRAO,
     ROTULOS_PADRAO_P1,
     ROTULOS_PADRAO_CONCLUSIVA,
+    LIMITE_LINHAS_GRAFICO,
+    LIMITE_BYTES_GRAFICO,
     tabela_gpa_padrao,
 )
 from gpa.io import (
-    leitura_robusta,
+    CacheLeituras,
     garantir_diretorio,
-    converter_decimal,
+)
+from gpa.texto import (
+    normalizar_textos_df,
+)
+from gpa.dados import (
+    CarregadorProcessados,
+    InstantaneoProcessados,
+    listar_arquivos,
+    relatorio_memoria,
+    versao_processados,
+)
+from gpa.compactacao import (
+    compactar_processados,
+    resumo_compactacao,
+    espelhar_no_github,
+)
+from gpa.ingestao import (
+    ParametrosIngestao,
+    processar_lote,
+    trabalhadores_disponiveis,
 )
 from gpa.processamento import (
-    calcular_media_por_trimestre,
-    aplicar_mapeamento_gpa,
+    compilar_mapeamento_gpa,
+    POLITICA_LACUNA_INFERIOR,
+    POLITICA_LACUNA_NAN,
 )
 
 # Imports dos gráficos com fallback seguro
@@ -46,13 +69,37 @@ except ImportError as _e:
     _GRAFICO_INDIVIDUAL_OK = False
     _GRAFICOS_IMPORT_ERROR = str(_e)
 
+from gpa.filtros import DIMENSOES_FILTRO, IndiceFiltros
+from gpa.agregados import agregar_linhas, filtrar_agregados, reagregar
+from gpa.tabela import TAMANHOS_PAGINA, TabelaPaginada, assinatura_filtros
+from gpa.exportacao import (
+    DIVISAO_ESTUDANTE,
+    DIVISAO_NENHUMA,
+    DIVISAO_TURMA,
+    FORMATOS_EXPORTACAO,
+    exportar,
+    formatos_disponiveis,
+    mime_exportacao,
+    nome_arquivo,
+    remover_arquivo,
+)
+from gpa.armazenamento import (
+    FORMATO_CSV,
+    FORMATO_PARQUET,
+    parquet_disponivel,
+    raiz_parquet,
+    listar_particoes,
+    carregar_processados_parquet,
+    versao_parquet,
+)
+from gpa.diagnostico import coletar, etapa, gravar_jsonl, resumo as resumo_diagnostico
+from gpa.sincronizacao import ACAO_IGUAL, planejar_sincronizacao, resumo_plano, sincronizar
 from gpa.github_api import (
     gh_credentials_ok,
     gh_credentials_summary,
-    gh_upload_file_from_local,
     gh_list_dir,
     gh_download_file_to_local,
-    gh_delete_file_from_repo,
+    gh_commit_batch,
 )
 
 # -------------------------
@@ -62,619 +109,752 @@ st.set_page_config(page_title="Conversor de Notas → GPA", layout="wide")
 st.title("Conversor de Notas → GPA (Streamlit)")
 st.caption("Inferência automática de Série/Turma/Trimestre e correção de textos com acentuação.")
 
-# -------------------------
-# 0) Helpers (mojibake + série/turma/trimestre)
-# -------------------------
-_MOJIBAKE_TOKENS = ("Ã", "Â", "�")
-
-def _fix_mojibake(text):
-    if not isinstance(text, str):
-        return text
-    if any(tok in text for tok in _MOJIBAKE_TOKENS):
-        try:
-            return text.encode("latin-1").decode("utf-8")
-        except Exception:
-            return text
-    return text
-
-def normalizar_textos_df(df: pd.DataFrame) -> pd.DataFrame:
-    cols = [c for c in ("Disciplina", "Avaliacao", "Turma", "Estudante") if c in df.columns]
-    for c in cols:
-        df[c] = df[c].astype(str).map(_fix_mojibake).str.strip()
-    return df
-
-def _norm_text(s: str) -> str:
-    return re.sub(r"\s+", " ", s.replace("º", "").strip()) if isinstance(s, str) else ""
-
-def extrair_serie_de_texto_turma(txt: str) -> str | None:
-    s = _norm_text(txt).lower()
-    m = re.search(r"\b(\d{1,2})\s*ano\b", s)
-    if m:
-        return f"{int(m.group(1))}º ano"
-    m = re.search(r"\b(\d{1,2})\b", s)
-    if m:
-        return f"{int(m.group(1))}º ano"
-    return None
-
-def extrair_turma_letra_de_texto_turma(txt: str) -> str | None:
-    s = _norm_text(txt).upper()
-    m = re.search(r"\b\d{1,2}\D*([A-Z])\b", s)
-    if m and m.group(1) != "I":
-        return m.group(1)
-    letras = re.findall(r"\b([A-Z])\b", s)
-    for c in letras:
-        if c != "I":
-            return c
-    return None
-
-_ROMAN = {"i": 1, "ii": 2, "iii": 3}
-
-def parse_filename_metadata(fname: str):
-    base = os.path.basename(fname)
-    s = _norm_text(base)
-    slow = s.lower()
-
-    # Série
-    serie = None
-    m = re.search(r"\b(\d{1,2})\s*ano\b", slow)
-    if m:
-        serie = f"{int(m.group(1))}º ano"
-    else:
-        m = re.search(r"\b(\d{1,2})\b", slow)
-        if m:
-            serie = f"{int(m.group(1))}º ano"
-
-    # Trimestre
-    trimestre = None
-    m = re.search(r"\b([ivx]{1,3})\s*tri", slow)
-    if m:
-        trimestre = _ROMAN.get(m.group(1), None)
-    if trimestre is None:
-        m = re.search(r"\b([123])(?:º)?\s*tri", slow)
-        if m:
-            trimestre = int(m.group(1))
-
-    # Turma
-    turma = None
-    m = re.search(r"\b\d{1,2}\D*([A-Z])\s*[-–—]", s.upper())
-    if m and m.group(1) != "I":
-        turma = m.group(1)
-    if turma is None:
-        letras = re.findall(r"\b([A-Z])\b", s.upper())
-        for L in letras:
-            if L != "I":
-                turma = L
-                break
-
-    return serie, turma, trimestre
-
-def inferir_serie_turma_trimestre(df: pd.DataFrame, col_turma: str, fname: str,
-                                  trimestre_ui: int | None):
-    # Conteúdo
-    serie_txt = None
-    turma_letra = None
-    if col_turma in df.columns:
-        valores = df[col_turma].dropna().astype(str)
-        poss_series = valores.apply(extrair_serie_de_texto_turma).dropna()
-        if not poss_series.empty:
-            serie_txt = poss_series.mode().iloc[0]
-        poss_turmas = valores.apply(extrair_turma_letra_de_texto_turma).dropna()
-        if not poss_turmas.empty:
-            turma_letra = poss_turmas.mode().iloc[0]
-
-    # Nome do arquivo
-    serie_fname, turma_fname, trimestre_fname = parse_filename_metadata(fname)
-
-    # Fusão
-    serie_final = serie_txt or serie_fname
-    turma_final = turma_letra or turma_fname
-
-    # Trimestre
-    if "Trimestre" in df.columns and df["Trimestre"].notna().any():
-        try:
-            tri_val = int(pd.to_numeric(df["Trimestre"], errors="coerce").mode().iloc[0])
-        except Exception:
-            tri_val = None
-    else:
-        tri_val = None
-    if tri_val is None:
-        tri_val = trimestre_fname if trimestre_fname in (1, 2, 3) else None
-    if tri_val is None:
-        tri_val = trimestre_ui if trimestre_ui in (1, 2, 3) else None
-
-    return serie_final, turma_final, tri_val
-
-def listar_arquivos(pasta: str):
-    if not os.path.isdir(pasta):
-        return []
-    full = [os.path.join(pasta, f) for f in os.listdir(pasta)]
-    return sorted([p for p in full if os.path.isfile(p)])
-
-def listar_processados_locais(pasta: str):
-    return [
-        p for p in listar_arquivos(pasta)
-        if os.path.basename(p).startswith("processado_") and p.endswith(".csv")
-    ]
-
-def carregar_todos_processados(pasta: str) -> pd.DataFrame:
-    files = listar_processados_locais(pasta)
-    if not files:
-        return pd.DataFrame()
-    dfs = []
-    for f in files:
-        try:
-            dfs.append(pd.read_csv(f))
-        except Exception as e:
-            st.warning(f"Falha ao ler {os.path.basename(f)}: {e}")
-    if not dfs:
-        return pd.DataFrame()
-    out = pd.concat(dfs, ignore_index=True)
-
-    # Garante colunas essenciais
-    base_cols = ["Estudante", "Turma", "Disciplina", "Trimestre", "P1", "Conclusiva", "Media", "GPA"]
-    for c in base_cols:
-        if c not in out.columns:
-            out[c] = pd.NA
-
-    # Deriva MediaPadronizada se ausente
-    if "MediaPadronizada" not in out.columns:
-        out["MediaPadronizada"] = out["Media"].apply(lambda x: (x/10.0) if pd.notna(x) and x > 10 else x)
-
-    # Série: se não existir ou vier vazia, derivar de Turma
-    if "Serie" not in out.columns:
-        out["Serie"] = out["Turma"].astype(str).apply(lambda t: extrair_serie_de_texto_turma(t) or "")
-    else:
-        mask_vazia = out["Serie"].isna() | (out["Serie"].astype(str).str.strip() == "")
-        out.loc[mask_vazia, "Serie"] = out.loc[mask_vazia, "Turma"].astype(str).apply(
-            lambda t: extrair_serie_de_texto_turma(t) or ""
-        )
 
-    # Corrige mojibake em textos
-    out = normalizar_textos_df(out)
-    return out
+COLUNAS_DASHBOARD = ["Serie", "Turma", "Estudante", "Disciplina", "Trimestre",
+                     "P1", "Conclusiva", "Media", "MediaPadronizada", "GPA"]
 
-# -------------------------
-# 1) Upload (em lote)
-# -------------------------
-st.header("1) Envie o(s) arquivo(s) de notas (CSV/XLSX)")
-arquivos = st.file_uploader(
-    "Selecione um ou vários arquivos CSV/XLSX",
-    type=["csv", "xlsx", "xls"],
-    accept_multiple_files=True
-)
 
 # -------------------------
-# 2) Mapeamento de esquema & rótulos
+# Dados compartilhados entre reruns e sessões (st.cache_resource)
+# A chave é a ficha de versão da pasta (versao_processados/versao_parquet), calculada só nas execuções
+# completas do app: gravar/excluir/sincronizar chamam st.rerun() e a ficha nova aponta para outro instantâneo.
 # -------------------------
-st.header("2) Mapeie as colunas do seu arquivo")
-
-amostra_colunas = ["Nome", "Turma", "DescrMateria", "DescrAvaliacao", "Nota", "Trimestre"]
-if arquivos:
-    f0 = arquivos[0]
-    df_preview = leitura_robusta(f0, nrows=200)
-    df_preview = normalizar_textos_df(df_preview)  # <<< correção de textos na prévia
-    amostra_colunas = list(df_preview.columns)
-    st.caption(f"Prévia do primeiro arquivo: **{f0.name}**")
-    st.dataframe(df_preview.head(20), use_container_width=True)
-else:
-    st.info("Faça upload de pelo menos um arquivo para visualizar as colunas detectadas.")
-
-esquema = ESQUEMA_PADRAO.copy()
-
-c1, c2, c3 = st.columns(3)
-with c1:
-    coluna_nome = st.selectbox(
-        "Coluna de Nome do Estudante",
-        amostra_colunas,
-        index=amostra_colunas.index(esquema["student"]) if esquema["student"] in amostra_colunas else 0,
-    )
-    coluna_turma = st.selectbox(
-        "Coluna de Turma",
-        amostra_colunas,
-        index=amostra_colunas.index(esquema["turma"]) if esquema["turma"] in amostra_colunas else 0,
-    )
-with c2:
-    coluna_disc = st.selectbox(
-        "Coluna de Disciplina",
-        amostra_colunas,
-        index=amostra_colunas.index(esquema["discipline"]) if esquema["discipline"] in amostra_colunas else 0,
-    )
-    coluna_avaliacao = st.selectbox(
-        "Coluna de Tipo de Avaliação",
-        amostra_colunas,
-        index=amostra_colunas.index(esquema["assessment"]) if esquema["assessment"] in amostra_colunas else 0,
-    )
-with c3:
-    coluna_nota = st.selectbox(
-        "Coluna de Nota",
-        amostra_colunas,
-        index=amostra_colunas.index(esquema["grade"]) if esquema["grade"] in amostra_colunas else 0,
-    )
+@st.cache_resource(show_spinner=False)
+def carregador_da_pasta(pasta: str) -> CarregadorProcessados:
+    """Um carregador por pasta: relê só os arquivos novos/alterados a cada versão."""
+    return CarregadorProcessados(pasta)
 
-st.subheader("Trimestre")
-cc1, cc2 = st.columns(2)
-with cc1:
-    coluna_trimestre_opt = st.selectbox(
-        "Coluna de Trimestre (se existir)",
-        ["<nenhuma>"] + amostra_colunas,
-        index=(amostra_colunas.index("Trimestre") + 1) if "Trimestre" in amostra_colunas else 0,
-    )
-with cc2:
-    trimestre_constante = st.select_slider(
-        "Se não houver coluna, selecione o trimestre para os arquivos",
-        options=[1, 2, 3],
-        value=1,
-    )
 
-st.subheader("Rótulos de P1 & Conclusiva")
-cp1, ccon = st.columns(2)
-with cp1:
-    texto_p1 = st.text_input(
-        "Rótulos para P1 (ex.: 'P1', 'Progressiva I')",
-        value=", ".join(ROTULOS_PADRAO_P1),
-    )
-    rotulos_p1 = [s.strip() for s in texto_p1.split(",") if s.strip()]
-with ccon:
-    texto_conc = st.text_input(
-        "Rótulos para Conclusiva (ex.: 'Conclusiva', 'CF')",
-        value=", ".join(ROTULOS_PADRAO_CONCLUSIVA),
-    )
-    rotulos_conclusiva = [s.strip() for s in texto_conc.split(",") if s.strip()]
+@st.cache_resource(max_entries=2, show_spinner="Carregando os processados de ./data...")
+def dataset_csv(pasta: str, versao: tuple) -> InstantaneoProcessados:
+    return carregador_da_pasta(pasta).instantaneo()
 
-# -------------------------
-# 3) Tabela de conversão e ESCALA
-# -------------------------
-st.header("3) Tabela de conversão de Média → GPA (edite se necessário)")
-
-tabela_map = tabela_gpa_padrao()
-tabela_map = st.data_editor(
-    tabela_map,
-    num_rows="dynamic",
-    use_container_width=True,
-    column_config={
-        "min": st.column_config.NumberColumn("min", step=0.1),
-        "max": st.column_config.NumberColumn("max", step=0.1),
-        "gpa": st.column_config.NumberColumn("gpa", step=0.1),
-    },
-    key="gpa_editor",
-)
 
-st.subheader("Escala das suas notas/médias")
-escala_sel = st.radio(
-    "Como estão as notas nos arquivos?",
-    ["Auto (detectar)", "0–10", "0–100"],
-    horizontal=True,
-    index=0,
-)
-escala_param = "auto" if "Auto" in escala_sel else ("0-10" if escala_sel == "0–10" else "0-100")
-
-# Salvar cópia no GitHub após processar?
-gh_ok_flag, gh_err_msg = gh_credentials_ok()
-salvar_no_github_flag = st.checkbox(
-    "Salvar uma cópia no GitHub após processar (requer Secrets configurados)",
-    value=False,
-    help="Envia cada CSV gerado para a pasta data/ do repositório via GitHub API.",
-)
+@st.cache_resource(max_entries=2, show_spinner=False)
+def particoes_parquet(raiz: str, versao: tuple):
+    """Combinações Série/Turma/Trimestre gravadas e o índice dos três primeiros filtros."""
+    particoes = listar_particoes(raiz)
+    return particoes, (IndiceFiltros(particoes, DIMENSOES_FILTRO[:3]) if not particoes.empty else None)
 
-# -------------------------
-# 4) Processar & Salvar (em lote) — com inferência + normalização de textos
-# -------------------------
-st.header("4) Processar e salvar dados")
-diretorio_salvar = st.text_input("Pasta para salvar dados (no repositório)", value=DIRETORIO_DADOS_PADRAO)
-st.caption("Todos os dados ficarão em ./data (por padrão).")
-
-if st.button("Processar arquivo(s)", type="primary", disabled=(not arquivos)):
-    garantir_diretorio(diretorio_salvar)
-    total_ok = 0
-    enviados_gh = 0
-    for f in arquivos:
-        try:
-            f.seek(0)
-        except Exception:
-            pass
-        df = leitura_robusta(f)
-
-        # Normalização de nota
-        if coluna_nota in df.columns:
-            df[coluna_nota] = converter_decimal(df[coluna_nota])
-
-        # Renomear colunas principais
-        try:
-            df = df.rename(
-                columns={
-                    coluna_nome: "Estudante",
-                    coluna_turma: "Turma",
-                    coluna_disc: "Disciplina",
-                    coluna_avaliacao: "Avaliacao",
-                    coluna_nota: "Nota",
-                }
-            )[
-                ["Estudante", "Turma", "Disciplina", "Avaliacao", "Nota"] + (["Trimestre"] if "Trimestre" in df.columns else [])
-            ]
-        except Exception as e:
-            st.error(f"[{f.name}] Falha ao padronizar colunas: {e}")
-            continue
-
-        # Corrige mojibake nos textos
-        df = normalizar_textos_df(df)
-
-        # Inferência de Série/Turma/Trimestre
-        serie_final, turma_final, tri_final = inferir_serie_turma_trimestre(
-            df, col_turma="Turma", fname=getattr(f, "name", "arquivo"), trimestre_ui=trimestre_constante
-        )
 
-        # Completa Turma se necessário
-        if ("Turma" not in df.columns) or df["Turma"].isna().all() or (df["Turma"].astype(str).str.strip() == "").all():
-            if turma_final:
-                df["Turma"] = turma_final
+@st.cache_resource(max_entries=4, show_spinner="Lendo as partições selecionadas...")
+def dataset_parquet(raiz: str, versao: tuple, series: tuple, turmas: tuple, trimestres: tuple):
+    """Partições selecionadas (já filtradas por Série/Turma/Trimestre), com índice e agregados."""
+    dados = carregar_processados_parquet(
+        raiz, series=list(series), turmas=list(turmas), trimestres=list(trimestres), colunas=COLUNAS_DASHBOARD,
+    )
+    return dados, IndiceFiltros(dados), agregar_linhas(dados)
 
-        # Define/ajusta Trimestre
-        if "Trimestre" not in df.columns or df["Trimestre"].isna().all():
-            df["Trimestre"] = tri_final if tri_final in (1, 2, 3) else trimestre_constante
 
-        # 1) Média por trimestre = (P1 + Conclusiva)/2
-        medias = calcular_media_por_trimestre(
-            df,
-            rotulos_p1=rotulos_p1,
-            rotulos_conclusiva=rotulos_conclusiva,
-        )
+# Mensagens de uma ação que alterou ./data: sobrevivem ao st.rerun() que atualiza as demais seções
+def exibir_mensagens(mensagens: list) -> None:
+    for tipo, conteudo in mensagens:
+        if tipo == "dataframe":
+            st.dataframe(conteudo, use_container_width=True, hide_index=True)
+        else:
+            getattr(st, tipo)(conteudo)
 
-        # 2) Inserir Serie e normalizar textos
-        medias["Serie"] = serie_final if serie_final else ""
-        medias = normalizar_textos_df(medias)
-
-        # 3) Aplicar mapeamento Média → GPA
-        gpa_df = aplicar_mapeamento_gpa(medias, tabela_map, escala=escala_param)
-
-        # 4) Persistir dados
-        ts = time.strftime("%Y%m%d-%H%M%S")
-        nome_base = os.path.splitext(f.name)[0] if hasattr(f, "name") else "arquivo"
-        caminho_saida = os.path.join(diretorio_salvar, f"processado_{nome_base}_{ts}.csv")
-        try:
-            gpa_df.to_csv(caminho_saida, index=False, encoding="utf-8-sig")
-            total_ok += 1
-            st.success(f"[{f.name}] Salvo em {caminho_saida}")
-        except Exception as e:
-            st.error(f"[{f.name}] Falha ao salvar: {e}")
-            continue
-
-        # 5) (Opcional) enviar cópia ao GitHub
-        if salvar_no_github_flag:
-            if gh_ok_flag:
-                rel_path = os.path.relpath(caminho_saida, start=".").replace("\\", "/")
-                ok_up, msg_up = gh_upload_file_from_local(
-                    caminho_saida,
-                    path_rel=rel_path,
-                    message=f"feat: adiciona {rel_path} (processado via app)"
-                )
-                if ok_up:
-                    enviados_gh += 1
-                    st.info(f"[{f.name}] Cópia enviada ao GitHub: {rel_path}")
-                else:
-                    st.error(f"[{f.name}] Falha ao enviar ao GitHub: {msg_up}")
-            else:
-                st.warning(f"[{f.name}] Secrets do GitHub ausentes/incompletos: {gh_err_msg}")
 
-    st.info(f"Resumo do processamento: {total_ok} arquivo(s) salvo(s) localmente; {enviados_gh} enviado(s) ao GitHub.")
-    st.session_state["_ultimo_arquivo_processado"] = None
+def recarregar_app(chave: str, mensagens: list) -> None:
+    st.session_state[chave] = mensagens
+    st.rerun()
 
-st.divider()
 
-# -------------------------
-# 5) Gerenciar dados (Excluir)
-# -------------------------
-st.header("5) Gerenciar dados (Excluir)")
+def mensagens_pendentes(chave: str) -> None:
+    exibir_mensagens(st.session_state.pop(chave, []))
+
+
+# Leituras já feitas nesta sessão (prévia e processamento compartilham; reruns não relêem arquivos)
+cache_leituras = st.session_state.setdefault("_cache_leituras", CacheLeituras())
 
-col_g, col_info = st.columns([2, 1])
-with col_g:
-    st.write(f"Diretório atual: `{diretorio_salvar}`")
-    arquivos_locais = listar_arquivos(diretorio_salvar)
 
-    if not arquivos_locais:
-        st.info("Nenhum arquivo encontrado em `./data`. Processe arquivos para gerar resultados.")
+@st.fragment
+def secao_ingestao(diretorio_salvar: str, formato_armazenamento: str) -> None:
+    """Seções 1–4: upload, mapeamento, tabela GPA e processamento (reexecuta sozinha a cada widget)."""
+    # -------------------------
+    # 1) Upload (em lote)
+    # -------------------------
+    st.header("1) Envie o(s) arquivo(s) de notas (CSV/XLSX)")
+    arquivos = st.file_uploader(
+        "Selecione um ou vários arquivos CSV/XLSX",
+        type=["csv", "xlsx", "xls"],
+        accept_multiple_files=True
+    )
+
+    # -------------------------
+    # 2) Mapeamento de esquema & rótulos
+    # -------------------------
+    st.header("2) Mapeie as colunas do seu arquivo")
+
+    amostra_colunas = ["Nome", "Turma", "DescrMateria", "DescrAvaliacao", "Nota", "Trimestre"]
+    if arquivos:
+        f0 = arquivos[0]
+        df_preview, dialeto_preview = cache_leituras.ler(f0, nrows=200)
+        df_preview = normalizar_textos_df(df_preview)  # <<< correção de textos na prévia
+        amostra_colunas = list(df_preview.columns)
+        st.caption(f"Prévia do primeiro arquivo: **{f0.name}** — {dialeto_preview.descricao()}")
+        st.dataframe(df_preview.head(20), use_container_width=True)
     else:
-        infos = []
-        for p in arquivos_locais:
-            try:
-                size = os.path.getsize(p)
-                mtime = os.path.getmtime(p)
-            except Exception:
-                size, mtime = None, None
-            infos.append({
-                "arquivo": os.path.basename(p),
-                "caminho": p,
-                "tamanho_bytes": size,
-                "modificado_em": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(mtime)) if mtime else "",
-            })
-        df_infos = pd.DataFrame(infos)
-        st.dataframe(df_infos, use_container_width=True, hide_index=True)
+        st.info("Faça upload de pelo menos um arquivo para visualizar as colunas detectadas.")
 
-        opcoes = [os.path.basename(p) for p in arquivos_locais]
-        selecao = st.multiselect("Selecione arquivos para excluir", opcoes, default=[])
+    esquema = ESQUEMA_PADRAO.copy()
 
-        excluir_github = st.checkbox("Excluir também do GitHub (se configurado em Secrets)", value=False)
-        gh_ok, gh_err = gh_credentials_ok()
-        if excluir_github:
-            if gh_ok:
-                st.success(f"GitHub Secrets OK — {gh_credentials_summary()}")
-            else:
-                st.warning(f"Secrets do GitHub ausentes/incompletos: {gh_err}")
-
-        if st.button("Excluir selecionados", type="secondary", disabled=(len(selecao) == 0)):
-            sucesso_local = 0
-            sucesso_gh = 0
-            for nome_arq in selecao:
-                full_path = os.path.join(diretorio_salvar, nome_arq)
-                if not os.path.abspath(full_path).startswith(os.path.abspath(diretorio_salvar) + os.sep):
-                    st.error(f"Bloqueado (fora da pasta de dados): {full_path}")
+    c1, c2, c3 = st.columns(3)
+    with c1:
+        coluna_nome = st.selectbox(
+            "Coluna de Nome do Estudante",
+            amostra_colunas,
+            index=amostra_colunas.index(esquema["student"]) if esquema["student"] in amostra_colunas else 0,
+        )
+        coluna_turma = st.selectbox(
+            "Coluna de Turma",
+            amostra_colunas,
+            index=amostra_colunas.index(esquema["turma"]) if esquema["turma"] in amostra_colunas else 0,
+        )
+    with c2:
+        coluna_disc = st.selectbox(
+            "Coluna de Disciplina",
+            amostra_colunas,
+            index=amostra_colunas.index(esquema["discipline"]) if esquema["discipline"] in amostra_colunas else 0,
+        )
+        coluna_avaliacao = st.selectbox(
+            "Coluna de Tipo de Avaliação",
+            amostra_colunas,
+            index=amostra_colunas.index(esquema["assessment"]) if esquema["assessment"] in amostra_colunas else 0,
+        )
+    with c3:
+        coluna_nota = st.selectbox(
+            "Coluna de Nota",
+            amostra_colunas,
+            index=amostra_colunas.index(esquema["grade"]) if esquema["grade"] in amostra_colunas else 0,
+        )
+
+    st.subheader("Trimestre")
+    cc1, cc2 = st.columns(2)
+    with cc1:
+        # Só informativo, como antes: a ingestão usa a coluna "Trimestre" quando ela existe
+        st.selectbox(
+            "Coluna de Trimestre (se existir)",
+            ["<nenhuma>"] + amostra_colunas,
+            index=(amostra_colunas.index("Trimestre") + 1) if "Trimestre" in amostra_colunas else 0,
+        )
+    with cc2:
+        trimestre_constante = st.select_slider(
+            "Se não houver coluna, selecione o trimestre para os arquivos",
+            options=[1, 2, 3],
+            value=1,
+        )
+
+    st.subheader("Rótulos de P1 & Conclusiva")
+    cp1, ccon = st.columns(2)
+    with cp1:
+        texto_p1 = st.text_input(
+            "Rótulos para P1 (ex.: 'P1', 'Progressiva I')",
+            value=", ".join(ROTULOS_PADRAO_P1),
+        )
+        rotulos_p1 = [s.strip() for s in texto_p1.split(",") if s.strip()]
+    with ccon:
+        texto_conc = st.text_input(
+            "Rótulos para Conclusiva (ex.: 'Conclusiva', 'CF')",
+            value=", ".join(ROTULOS_PADRAO_CONCLUSIVA),
+        )
+        rotulos_conclusiva = [s.strip() for s in texto_conc.split(",") if s.strip()]
+
+    # -------------------------
+    # 3) Tabela de conversão e ESCALA
+    # -------------------------
+    st.header("3) Tabela de conversão de Média → GPA (edite se necessário)")
+
+    tabela_map = tabela_gpa_padrao()
+    tabela_map = st.data_editor(
+        tabela_map,
+        num_rows="dynamic",
+        use_container_width=True,
+        column_config={
+            "min": st.column_config.NumberColumn("min", step=0.1),
+            "max": st.column_config.NumberColumn("max", step=0.1),
+            "gpa": st.column_config.NumberColumn("gpa", step=0.1),
+        },
+        key="gpa_editor",
+    )
+
+    politica_sel = st.radio(
+        "Médias entre duas faixas (ex.: 8.95 entre 8.9 e 9.0)",
+        ["Usar a faixa inferior", "Deixar sem GPA"],
+        horizontal=True,
+        index=0,
+    )
+    politica_lacunas = POLITICA_LACUNA_INFERIOR if politica_sel == "Usar a faixa inferior" else POLITICA_LACUNA_NAN
+    mapa_gpa = compilar_mapeamento_gpa(tabela_map, politica_lacunas=politica_lacunas)
+    avisos_mapa = mapa_gpa.avisos()
+    if mapa_gpa.sobreposicoes or mapa_gpa.descartadas:
+        st.warning("Verifique a tabela de conversão:\n\n" + "\n".join(f"- {m}" for m in avisos_mapa))
+    elif avisos_mapa:
+        with st.expander(f"Lacunas na tabela ({len(mapa_gpa.lacunas)})"):
+            st.markdown("\n".join(f"- {m}" for m in avisos_mapa))
+
+    st.subheader("Escala das suas notas/médias")
+    escala_sel = st.radio(
+        "Como estão as notas nos arquivos?",
+        ["Auto (detectar)", "0–10", "0–100"],
+        horizontal=True,
+        index=0,
+    )
+    escala_param = "auto" if "Auto" in escala_sel else ("0-10" if escala_sel == "0–10" else "0-100")
+
+    # Salvar cópia no GitHub após processar?
+    gh_ok_flag, gh_err_msg = gh_credentials_ok()
+    salvar_no_github_flag = st.checkbox(
+        "Salvar uma cópia no GitHub após processar (requer Secrets configurados)",
+        value=False,
+        help="Envia cada CSV gerado para a pasta data/ do repositório via GitHub API.",
+    )
+
+    # -------------------------
+    # 4) Processar & Salvar (em lote) — com inferência + normalização de textos
+    # -------------------------
+    st.header("4) Processar e salvar dados")
+    st.caption(f"Destino: `{diretorio_salvar}` ({formato_armazenamento}) — altere em **Armazenamento**, na barra lateral.")
+    painel_diagnostico = st.expander("Diagnóstico")
+    with painel_diagnostico:
+        diagnostico_ligado = st.checkbox(
+            "Medir etapas do processamento (tempo, linhas e memória por arquivo)",
+            value=False,
+            help="Leitura, decimal, inferência, médias, GPA, gravação e envio ao GitHub. "
+                 "O resultado fica abaixo e é acrescentado a diagnostico.jsonl na pasta de dados.",
+        )
+        diagnostico_memoria = st.checkbox(
+            "Incluir pico de memória (tracemalloc — deixa o processamento mais lento)",
+            value=True,
+            disabled=not diagnostico_ligado,
+        )
+
+    if st.button("Processar arquivo(s)", type="primary", disabled=(not arquivos)):
+        garantir_diretorio(diretorio_salvar)
+        total_ok = 0
+        enviados_gh = 0
+        envios_gh = []
+        params_ingestao = ParametrosIngestao(
+            coluna_nome=coluna_nome,
+            coluna_turma=coluna_turma,
+            coluna_disc=coluna_disc,
+            coluna_avaliacao=coluna_avaliacao,
+            coluna_nota=coluna_nota,
+            rotulos_p1=tuple(rotulos_p1),
+            rotulos_conclusiva=tuple(rotulos_conclusiva),
+            trimestre_constante=trimestre_constante,
+            mapa_gpa=mapa_gpa,
+            escala=escala_param,
+            diretorio_saida=diretorio_salvar,
+            formato=formato_armazenamento,
+            diagnostico=diagnostico_ligado,
+            diagnostico_memoria=diagnostico_memoria,
+        )
+        # Bytes + dialeto já detectado na prévia (quando houver); cada arquivo roda num processo do pool
+        itens_ingestao = []
+        for f in arquivos:
+            bruto_f = f.getvalue()
+            itens_ingestao.append((f.name, bruto_f, cache_leituras.dialeto_em_cache(bruto_f)))
+
+        etapas_arquivos = []
+        avisos = []  # exibidos após o st.rerun() que atualiza gerenciamento e dashboard
+        with coletar(ligar=diagnostico_ligado, memoria=diagnostico_memoria) as etapas_app, \
+                etapa("lote", arquivos=len(itens_ingestao)):
+            n_trab = min(trabalhadores_disponiveis(), len(itens_ingestao))
+            progresso = st.progress(0.0, text=f"Processando {len(itens_ingestao)} arquivo(s) com {n_trab} processo(s)...")
+            for i, res in enumerate(processar_lote(itens_ingestao, params_ingestao), start=1):
+                etapas_arquivos += res["etapas"]
+                progresso.progress(i / len(itens_ingestao), text=f"{i}/{len(itens_ingestao)} concluído(s) — {res['nome']}")
+                if not res["ok"]:
+                    avisos.append(("error", f"[{res['nome']}] {res['erro']}"))
                     continue
+                total_ok += 1
+                caminhos_saida = res["caminhos"]
+                avisos.append(("success", f"[{res['nome']}] Salvo em {', '.join(caminhos_saida)} "
+                                          f"({res['dialeto'].descricao()})"))
+                envios_gh += [(c, os.path.relpath(c, start=".").replace("\\", "/")) for c in caminhos_saida]
+
+            # 5) (Opcional) enviar cópia ao GitHub — todos os arquivos do lote num único commit
+            if salvar_no_github_flag and envios_gh:
+                if gh_ok_flag:
+                    with st.spinner(f"Enviando {len(envios_gh)} arquivo(s) ao GitHub em um commit..."):
+                        ok_up, msg_up = gh_commit_batch(
+                            envios_gh, message=f"feat: adiciona {len(envios_gh)} arquivo(s) processado(s) via app"
+                        )
+                    if ok_up:
+                        enviados_gh = len(envios_gh)
+                        avisos.append(("info", f"Cópias enviadas ao GitHub no commit {msg_up[:7]}: "
+                                               + ", ".join(rel for _, rel in envios_gh)))
+                    else:
+                        avisos.append(("error", f"Falha ao enviar ao GitHub: {msg_up}"))
+                else:
+                    avisos.append(("warning", f"Secrets do GitHub ausentes/incompletos: {gh_err_msg}"))
+
+        registros_diagnostico = etapas_app + etapas_arquivos
+        if registros_diagnostico:
+            execucao = time.strftime("%Y%m%d-%H%M%S")
+            st.session_state["diagnostico"] = {
+                "execucao": execucao,
+                "registros": registros_diagnostico,
+                "caminho": gravar_jsonl(registros_diagnostico, diretorio_salvar, execucao=execucao),
+            }
+
+        avisos.append(("info", f"Resumo do processamento: {total_ok} arquivo(s) salvo(s) localmente; "
+                               f"{enviados_gh} enviado(s) ao GitHub."))
+        avisos.append(("caption", f"Cache de leituras: {len(cache_leituras)} arquivo(s), "
+                                  f"{cache_leituras.bytes_em_uso() / 1e6:.1f} MB, "
+                                  f"{cache_leituras.acertos} reaproveitamento(s)."))
+        st.session_state["_ultimo_arquivo_processado"] = None
+        recarregar_app("_avisos_ingestao", avisos)
+    mensagens_pendentes("_avisos_ingestao")
+
+    diagnostico_ultimo = st.session_state.get("diagnostico")
+    if diagnostico_ultimo:
+        with painel_diagnostico:
+            registros_diag = diagnostico_ultimo["registros"]
+            st.caption(f"Última execução medida: {diagnostico_ultimo['execucao']} — {len(registros_diag)} etapa(s); "
+                       f"log em `{diagnostico_ultimo['caminho']}`.")
+            aba_etapas, aba_arquivos = st.tabs(["Por etapa", "Por arquivo"])
+            with aba_etapas:
+                st.dataframe(resumo_diagnostico(registros_diag), use_container_width=True, hide_index=True)
+            with aba_arquivos:
+                df_diag = pd.DataFrame(registros_diag)
+                df_diag = df_diag[df_diag["arquivo"].notna()]
+                if df_diag.empty:
+                    st.info("Nenhuma etapa por arquivo registrada.")
+                else:
+                    st.dataframe(
+                        df_diag.pivot_table(index="arquivo", columns="etapa", values="segundos", aggfunc="sum"),
+                        use_container_width=True,
+                    )
+
+
+@st.fragment
+def secao_gerenciar(diretorio_salvar: str) -> None:
+    """Seção 5: listagem, exclusão e compactação de ./data."""
+    # -------------------------
+    # 5) Gerenciar dados (Excluir)
+    # -------------------------
+    st.header("5) Gerenciar dados (Excluir)")
+
+    col_g, col_info = st.columns([2, 1])
+    with col_g:
+        st.write(f"Diretório atual: `{diretorio_salvar}`")
+        arquivos_locais = listar_arquivos(diretorio_salvar)
+
+        if not arquivos_locais:
+            st.info("Nenhum arquivo encontrado em `./data`. Processe arquivos para gerar resultados.")
+        else:
+            infos = []
+            for p in arquivos_locais:
                 try:
-                    os.remove(full_path)
-                    sucesso_local += 1
-                    st.success(f"Excluído localmente: {full_path}")
-                except FileNotFoundError:
-                    st.warning(f"Arquivo já não existe localmente: {full_path}")
-                except Exception as e:
-                    st.error(f"Falha ao excluir localmente {full_path}: {e}")
-                if excluir_github and gh_ok:
-                    rel_path = os.path.relpath(full_path, start=".").replace("\\", "/")
-                    ok, status_msg = gh_delete_file_from_repo(rel_path, message=f"chore: remove {rel_path} via app")
+                    size = os.path.getsize(p)
+                    mtime = os.path.getmtime(p)
+                except Exception:
+                    size, mtime = None, None
+                infos.append({
+                    "arquivo": os.path.basename(p),
+                    "caminho": p,
+                    "tamanho_bytes": size,
+                    "modificado_em": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(mtime)) if mtime else "",
+                })
+            df_infos = pd.DataFrame(infos)
+            st.dataframe(df_infos, use_container_width=True, hide_index=True)
+
+            opcoes = [os.path.basename(p) for p in arquivos_locais]
+            selecao = st.multiselect("Selecione arquivos para excluir", opcoes, default=[])
+
+            excluir_github = st.checkbox("Excluir também do GitHub (se configurado em Secrets)", value=False)
+            gh_ok, gh_err = gh_credentials_ok()
+            if excluir_github:
+                if gh_ok:
+                    st.success(f"GitHub Secrets OK — {gh_credentials_summary()}")
+                else:
+                    st.warning(f"Secrets do GitHub ausentes/incompletos: {gh_err}")
+
+            if st.button("Excluir selecionados", type="secondary", disabled=(len(selecao) == 0)):
+                sucesso_local = 0
+                sucesso_gh = 0
+                exclusoes_gh = []
+                avisos = []
+                for nome_arq in selecao:
+                    full_path = os.path.join(diretorio_salvar, nome_arq)
+                    if not os.path.abspath(full_path).startswith(os.path.abspath(diretorio_salvar) + os.sep):
+                        avisos.append(("error", f"Bloqueado (fora da pasta de dados): {full_path}"))
+                        continue
+                    try:
+                        os.remove(full_path)
+                        sucesso_local += 1
+                        avisos.append(("success", f"Excluído localmente: {full_path}"))
+                    except FileNotFoundError:
+                        avisos.append(("warning", f"Arquivo já não existe localmente: {full_path}"))
+                    except Exception as e:
+                        avisos.append(("error", f"Falha ao excluir localmente {full_path}: {e}"))
+                    if excluir_github and gh_ok:
+                        exclusoes_gh.append(os.path.relpath(full_path, start=".").replace("\\", "/"))
+                if exclusoes_gh:
+                    # Uma única remoção em lote (um commit) no GitHub
+                    ok, status_msg = gh_commit_batch(
+                        exclusoes=exclusoes_gh, message=f"chore: remove {len(exclusoes_gh)} arquivo(s) via app"
+                    )
                     if ok:
-                        sucesso_gh += 1
-                        st.success(f"Excluído do GitHub: {rel_path}")
+                        sucesso_gh = len(exclusoes_gh)
+                        avisos.append(("success", f"Excluído(s) do GitHub no commit {status_msg[:7]}: "
+                                                  f"{', '.join(exclusoes_gh)}"))
                     else:
-                        st.error(f"Falha ao excluir do GitHub {rel_path}: {status_msg}")
-            st.info(f"Resumo: {sucesso_local} excluído(s) localmente; {sucesso_gh} excluído(s) no GitHub.")
-
-with col_info:
-    st.markdown("**Observações:**")
-    st.markdown("- A exclusão local remove o arquivo **desta instância** (armazenamento efêmero).")
-    st.markdown("- A exclusão no **GitHub** requer Secrets válidos e o arquivo **estar versionado**.")
-    st.markdown("- Caminhos fora da pasta de dados são **bloqueados** por segurança.")
+                        avisos.append(("error", f"Falha ao excluir do GitHub: {status_msg}"))
+                avisos.append(("info", f"Resumo: {sucesso_local} excluído(s) localmente; "
+                                       f"{sucesso_gh} excluído(s) no GitHub."))
+                recarregar_app("_avisos_exclusao", avisos)
+            mensagens_pendentes("_avisos_exclusao")
+
+    with col_info:
+        st.markdown("**Observações:**")
+        st.markdown("- A exclusão local remove o arquivo **desta instância** (armazenamento efêmero).")
+        st.markdown("- A exclusão no **GitHub** requer Secrets válidos e o arquivo **estar versionado**.")
+        st.markdown("- Caminhos fora da pasta de dados são **bloqueados** por segurança.")
+
+    with st.expander("Compactar versões reenviadas (última versão vence)"):
+        st.caption(
+            "Agrupa os processado_*.csv por Série, Turma, Trimestre e arquivo de origem e mantém, para cada "
+            "(Estudante, Disciplina, Trimestre), a linha do envio mais recente — um arquivo por grupo. "
+            "Sem interface: python -m gpa.compactacao --pasta ./data [--simular] [--github]"
+        )
+        compactar_gh = st.checkbox("Replicar no GitHub (envia consolidados e exclui versões antigas)", value=False)
+        bc1, bc2 = st.columns(2)
+        simular_comp = bc1.button("Simular compactação")
+        executar_comp = bc2.button("Compactar agora", type="secondary")
+        if simular_comp or executar_comp:
+            relatorio_comp = compactar_processados(diretorio_salvar, simular=simular_comp)
+            res_comp = resumo_compactacao(relatorio_comp)
+            avisos = []
+            if not relatorio_comp:
+                avisos.append(("info", "Nenhum arquivo com versões duplicadas."))
+            else:
+                avisos.append(("dataframe", pd.DataFrame([{
+                    "grupo": r["grupo"],
+                    "versões": len(r["removidos"]) + 1,
+                    "mantido": os.path.basename(r["mantido"]),
+                    "linhas antes": r["linhas_antes"],
+                    "linhas depois": r["linhas_depois"],
+                    "bytes recuperados": r["bytes_antes"] - r["bytes_depois"],
+                } for r in relatorio_comp])))
+                prefixo = "Simulação: " if simular_comp else ""
+                avisos.append(("success",
+                    f"{prefixo}{res_comp['grupos']} grupo(s), {res_comp['arquivos_removidos']} arquivo(s) removido(s), "
+                    f"{res_comp['linhas_recuperadas']} linha(s) e {res_comp['bytes_recuperados'] / 1024:.1f} KB recuperados."
+                ))
+            if not (executar_comp and relatorio_comp):
+                exibir_mensagens(avisos)
+            else:
+                if compactar_gh:
+                    gh_ok_c, gh_err_c = gh_credentials_ok()
+                    if gh_ok_c:
+                        enviados_c, excluidos_c = espelhar_no_github(
+                            relatorio_comp, gh_commit_batch, log=lambda msg: avisos.append(("error", msg)),
+                        )
+                        avisos.append(("info", f"GitHub: {enviados_c} consolidado(s) enviado(s), "
+                                               f"{excluidos_c} versão(ões) excluída(s)."))
+                    else:
+                        avisos.append(("warning", f"Secrets do GitHub ausentes/incompletos: {gh_err_c}"))
+                recarregar_app("_avisos_compactacao", avisos)
+        mensagens_pendentes("_avisos_compactacao")
+
+
+@st.fragment
+def secao_dashboard(diretorio_salvar: str, formato_armazenamento: str, versao_dados: tuple) -> None:
+    """Seção 6: sincronização e dashboard. Dataset e índices vêm do cache_resource da versão dos dados."""
+    # -------------------------
+    # 6) Dashboard (multi-arquivo + filtros globais + tabela)
+    # -------------------------
+    st.header("Dashboard com filtros globais e comparação entre turmas")
+
+    # 6.0) Sincronização opcional com GitHub
+    gh_ok2, gh_err2 = gh_credentials_ok()
+    with st.expander("Sincronização com GitHub (opcional)"):
+        if gh_ok2:
+            st.caption(f"Conectado a: {gh_credentials_summary()}")
+            st.caption("Compara o SHA de cada 'processado_*.csv' remoto com o arquivo local e baixa só o que difere.")
+            scol1, scol2 = st.columns(2)
+            simular_sync = scol1.button("Simular sincronização")
+            executar_sync = scol2.button("Sincronizar 'processado_*.csv' do GitHub para ./data")
+            if simular_sync or executar_sync:
+                ok, itens = gh_list_dir("data")
+                if ok and isinstance(itens, list):
+                    plano = planejar_sincronizacao(itens, "data")
+                    res_plano = resumo_plano(plano)
+                    st.caption(
+                        f"{res_plano['novos']} novo(s), {res_plano['alterados']} alterado(s), "
+                        f"{res_plano['iguais']} igual(is) — {res_plano['bytes_a_baixar'] / 1e6:.2f} MB a baixar."
+                    )
+                    if simular_sync:
+                        pend = [{"Arquivo": p["nome"], "Ação": p["acao"], "Bytes": p["tamanho"]}
+                                for p in plano if p["acao"] != ACAO_IGUAL]
+                        if pend:
+                            st.dataframe(pd.DataFrame(pend), use_container_width=True, hide_index=True)
+                    else:
+                        barra_sync = st.progress(0.0, text="Baixando...")
 
-st.divider()
+                        def _progresso_sync(feitos, total, item, okb, msg):
+                            barra_sync.progress(feitos / total, text=f"{feitos}/{total}: {item['nome']}")
 
-# -------------------------
-# 6) Dashboard (multi-arquivo + filtros globais + tabela)
-# -------------------------
-st.header("Dashboard com filtros globais e comparação entre turmas")
-
-# 6.0) Sincronização opcional com GitHub
-gh_ok2, gh_err2 = gh_credentials_ok()
-with st.expander("Sincronização com GitHub (opcional)"):
-    if gh_ok2:
-        st.caption(f"Conectado a: {gh_credentials_summary()}")
-        if st.button("Sincronizar TODOS os 'processado_*.csv' do GitHub para ./data"):
-            ok, itens = gh_list_dir("data")
-            if ok and isinstance(itens, list):
-                nomes_gh = [i["name"] for i in itens if i.get("type") == "file"
-                            and i.get("name", "").startswith("processado_")
-                            and i.get("name", "").endswith(".csv")]
-                baixados = 0
-                for nome in nomes_gh:
-                    rel_path = f"data/{nome}"
-                    local_dest = os.path.join("data", nome)
-                    if not os.path.exists(local_dest):
-                        okb, msg = gh_download_file_to_local(rel_path, local_dest)
-                        if okb:
-                            baixados += 1
-                        else:
-                            st.error(f"Erro ao baixar {rel_path}: {msg}")
-                st.success(f"Sincronização concluída. Baixados {baixados} arquivo(s).")
-            else:
-                st.error(f"Falha ao listar pasta data/ no GitHub: {itens}")
+                        res_sync = sincronizar(plano, gh_download_file_to_local, progresso=_progresso_sync)
+                        avisos = [("error", f"Erro ao baixar data/{nome}: {msg}") for nome, msg in res_sync["falhas"]]
+                        avisos.append(("success", f"Sincronização concluída. Baixados {res_sync['baixados']} "
+                                                  f"arquivo(s); {res_sync['iguais']} já estavam iguais."))
+                        recarregar_app("_avisos_sincronizacao", avisos)
+                else:
+                    st.error(f"Falha ao listar pasta data/ no GitHub: {itens}")
+            mensagens_pendentes("_avisos_sincronizacao")
+        else:
+            st.info("Configure os Secrets do GitHub para habilitar sincronização (GITHUB_TOKEN, REPO_OWNER, REPO_NAME, DEFAULT_BRANCH).")
+
+    # 6.1) Carregar todos os processados locais (instantâneo compartilhado da versão 'versao_dados')
+    # Parquet: Série/Turma/Trimestre vêm dos nomes das partições e só as partições selecionadas são lidas
+    usar_parquet = formato_armazenamento == FORMATO_PARQUET
+    if st.button("Recarregar ./data", help="Relê arquivos novos/alterados (ex.: gravados por outra sessão)."):
+        st.rerun()  # execução completa: recalcula a versão dos dados
+    if usar_parquet:
+        base_filtros, idx_base = particoes_parquet(raiz_parquet(diretorio_salvar), versao_dados)
+    else:
+        dataset = dataset_csv(diretorio_salvar, versao_dados)
+        for msg in dataset.erros:
+            st.warning(msg)
+        dados_all = base_filtros = dataset.dados
+        idx_base = dataset.indice
+    if base_filtros.empty:
+        st.info("Nenhum arquivo processado encontrado em ./data. Processe ou sincronize do GitHub.")
     else:
-        st.info("Configure os Secrets do GitHub para habilitar sincronização (GITHUB_TOKEN, REPO_OWNER, REPO_NAME, DEFAULT_BRANCH).")
-
-# 6.1) Carregar todos os processados locais
-dados_all = carregar_todos_processados(diretorio_salvar)
-if dados_all.empty:
-    st.info("Nenhum arquivo processado encontrado em ./data. Processe ou sincronize do GitHub.")
-else:
-    # ---- Filtros globais ----
-    fcol1, fcol2, fcol3 = st.columns(3)
-    with fcol1:
-        series_disp = sorted([s for s in dados_all["Serie"].dropna().unique() if str(s).strip() != ""])
-        serie_sel = st.multiselect("Série", series_disp, default=series_disp)
-    with fcol2:
-        turmas_disp = sorted(dados_all.query("Serie in @serie_sel")["Turma"].dropna().unique()) if serie_sel else []
-        turma_sel = st.multiselect("Turma", turmas_disp, default=turmas_disp)
-    with fcol3:
-        trimestres_disp = sorted(dados_all.query("Serie in @serie_sel and Turma in @turma_sel")["Trimestre"].dropna().unique()) if turma_sel else []
-        trim_sel = st.multiselect("Trimestre", trimestres_disp, default=trimestres_disp)
-
-    fcol4, fcol5 = st.columns(2)
-    with fcol4:
-        disc_disp = sorted(dados_all.query(
-            "Serie in @serie_sel and Turma in @turma_sel and Trimestre in @trim_sel"
-        )["Disciplina"].dropna().unique()) if trim_sel else []
-        disc_sel = st.multiselect("Disciplina", disc_disp, default=disc_disp)
-    with fcol5:
-        est_disp = sorted(dados_all.query(
-            "Serie in @serie_sel and Turma in @turma_sel and Trimestre in @trim_sel and Disciplina in @disc_sel"
-        )["Estudante"].dropna().unique()) if disc_sel else []
-        est_sel = st.multiselect("Estudante", est_disp, default=est_disp[: min(20, len(est_disp))])
-
-    # Aplicar filtros
-    dados_filtrados = dados_all.copy()
-    if serie_sel:
-        dados_filtrados = dados_filtrados[dados_filtrados["Serie"].isin(serie_sel)]
-    if turma_sel:
-        dados_filtrados = dados_filtrados[dados_filtrados["Turma"].isin(turma_sel)]
-    if trim_sel:
-        dados_filtrados = dados_filtrados[dados_filtrados["Trimestre"].isin(trim_sel)]
-    if disc_sel:
-        dados_filtrados = dados_filtrados[dados_filtrados["Disciplina"].isin(disc_sel)]
-    if est_sel:
-        dados_filtrados = dados_filtrados[dados_filtrados["Estudante"].isin(est_sel)]
-
-    # ---- Tabela sempre aparente ----
-    st.subheader("Tabela (Série/Turma/Estudante/Disciplina/Trimestre, P1, Conclusiva, Média, GPA)")
-    tabela_cols = ["Serie", "Turma", "Estudante", "Disciplina", "Trimestre", "P1", "Conclusiva", "Media", "GPA"]
-    for c in tabela_cols:
-        if c not in dados_filtrados.columns:
-            dados_filtrados[c] = pd.NA
-    tabela_view = dados_filtrados[tabela_cols].sort_values(["Serie", "Turma", "Estudante", "Disciplina", "Trimestre"])
-    st.dataframe(tabela_view, use_container_width=True, hide_index=True)
-
-    # Download da tabela filtrada
-    csv_bytes = tabela_view.to_csv(index=False, encoding="utf-8-sig").encode("utf-8-sig")
-    st.download_button("Baixar tabela filtrada (CSV)", data=csv_bytes, file_name="gpa_filtrado.csv", mime="text/csv")
-
-    st.divider()
-
-    # ---- Gráficos ----
-    aba1, aba2 = st.tabs([
-        "Comparação por disciplina × turma (GPA médio por trimestre)",
-        "Tendência por estudante × disciplina (GPA)",
-    ])
-
-    with aba1:
-        if not disc_sel or not turma_sel:
-            st.info("Selecione pelo menos uma disciplina e uma turma para visualizar.")
+        # ---- Filtros globais ----
+        # Índice por dimensão: cada seleção estreita um array de posições de linha (sem DataFrames intermediários)
+        fcol1, fcol2, fcol3 = st.columns(3)
+        with fcol1:
+            series_disp = [s for s in idx_base.valores("Serie") if str(s).strip() != ""]
+            serie_sel = st.multiselect("Série", series_disp, default=series_disp)
+            pos_base = idx_base.filtrar(None, "Serie", serie_sel)
+        with fcol2:
+            turmas_disp = idx_base.valores("Turma", pos_base) if serie_sel else []
+            turma_sel = st.multiselect("Turma", turmas_disp, default=turmas_disp)
+            pos_base = idx_base.filtrar(pos_base, "Turma", turma_sel)
+        with fcol3:
+            trimestres_disp = idx_base.valores("Trimestre", pos_base) if turma_sel else []
+            trim_sel = st.multiselect("Trimestre", trimestres_disp, default=trimestres_disp)
+            pos_base = idx_base.filtrar(pos_base, "Trimestre", trim_sel)
+
+        if usar_parquet:
+            dados_all, idx, agregados_base = dataset_parquet(
+                raiz_parquet(diretorio_salvar), versao_dados, tuple(serie_sel), tuple(turma_sel), tuple(trim_sel),
+            )
+            pos = None  # a leitura já aplicou Série/Turma/Trimestre
         else:
-            fig1 = grafico_tendencia_gpa_por_disciplina_turma(dados_filtrados, disciplinas=disc_sel, turmas=turma_sel)
-            st.altair_chart(fig1, use_container_width=True)
-
-    with aba2:
-        if not disc_sel or not est_sel:
-            st.info("Selecione pelo menos uma disciplina e um estudante para visualizar.")
+            idx, pos = idx_base, pos_base
+            agregados_base = dataset.agregados
+
+        with st.expander("Memória do dataset em uso"):
+            mem = relatorio_memoria(dados_all)
+            total_mb, sem_tipagem_mb = mem["bytes"].sum() / 1e6, mem["bytes_sem_tipagem"].sum() / 1e6
+            st.caption(
+                f"{len(dados_all):,} linha(s): {total_mb:.2f} MB em memória "
+                f"(≈ {sem_tipagem_mb:.2f} MB como texto/float64 — {sem_tipagem_mb / max(total_mb, 1e-9):.1f}x)."
+            )
+            st.dataframe(mem, use_container_width=True, hide_index=True)
+
+        fcol4, fcol5 = st.columns(2)
+        with fcol4:
+            disc_disp = idx.valores("Disciplina", pos) if trim_sel else []
+            disc_sel = st.multiselect("Disciplina", disc_disp, default=disc_disp)
+            pos = idx.filtrar(pos, "Disciplina", disc_sel)
+        with fcol5:
+            est_disp = idx.valores("Estudante", pos) if disc_sel else []
+            est_sel = st.multiselect("Estudante", est_disp, default=est_disp[: min(20, len(est_disp))])
+            pos = idx.filtrar(pos, "Estudante", est_sel)
+
+        # Aplicar filtros (uma única seleção de linhas)
+        dados_filtrados = idx.linhas(pos)
+
+        # Agregados Série × Turma × Disciplina × Trimestre (gráfico por turma e resumo). O grão não tem Estudante:
+        # com o filtro de Estudante restringindo a seleção, são refeitos a partir das linhas filtradas
+        filtro_estudante = bool(est_sel) and len(est_sel) < len(est_disp)
+        if filtro_estudante:
+            agregados_sel = agregar_linhas(dados_filtrados)
         else:
-            fig2 = grafico_tendencia_gpa_por_estudante_disciplina(dados_filtrados, disciplinas=disc_sel, estudantes=est_sel)
-            st.altair_chart(fig2, use_container_width=True)
-
-    if _GRAFICO_INDIVIDUAL_OK and grafico_gpa_individual_estudante_disciplinas:
-        aba3 = st.tabs(["GPA individual (série→turma→estudante)"])[0]
-        with aba3:
-            if not serie_sel or not turma_sel:
-                st.info("Selecione pelo menos uma Série e uma Turma.")
+            agregados_sel = filtrar_agregados(
+                agregados_base, Serie=serie_sel, Turma=turma_sel, Trimestre=trim_sel, Disciplina=disc_sel
+            )
+
+        # ---- Tabela sempre aparente ----
+        st.subheader("Tabela (Série/Turma/Estudante/Disciplina/Trimestre, P1, Conclusiva, Média, GPA)")
+        # Ordenação e CSV ficam em cache por (versão dos dados, filtros); só a página visível é montada
+        assinatura = assinatura_filtros(versao_dados, {
+            "Serie": serie_sel, "Turma": turma_sel, "Trimestre": trim_sel, "Disciplina": disc_sel, "Estudante": est_sel,
+        })
+        tabela = st.session_state.get("tabela_paginada")
+        if tabela is None or tabela.assinatura != assinatura:
+            tabela = TabelaPaginada(dados_filtrados, assinatura)
+            st.session_state["tabela_paginada"] = tabela
+
+        pcol1, pcol2, pcol3 = st.columns([1, 1, 2])
+        with pcol1:
+            tamanho_pagina = st.selectbox("Linhas por página", TAMANHOS_PAGINA, index=1)
+        with pcol2:
+            n_paginas = tabela.total_paginas(tamanho_pagina)
+            pagina = int(st.number_input(f"Página (de {n_paginas})", min_value=1, max_value=n_paginas, value=1, step=1))
+        with pcol3:
+            inicio = (pagina - 1) * tamanho_pagina
+            st.caption(f"Linhas {min(inicio + 1, len(tabela)):,}–{min(inicio + tamanho_pagina, len(tabela)):,} "
+                       f"de {len(tabela):,}")
+        st.dataframe(tabela.pagina(pagina, tamanho_pagina), use_container_width=True, hide_index=True)
+
+        # Download da tabela filtrada (CSV gerado só quando pedido; reaproveitado enquanto filtros/dados não mudarem)
+        if tabela.csv_gerado() is None:
+            if st.button("Gerar CSV da tabela filtrada"):
+                tabela.exportar_csv()
+        if tabela.csv_gerado() is not None:
+            st.download_button("Baixar tabela filtrada (CSV)", data=tabela.csv_gerado(),
+                               file_name="gpa_filtrado.csv", mime="text/csv")
+
+        with st.expander("Exportar dados (CSV, gzip, Excel, Parquet; um arquivo por turma/estudante)"):
+            ecol1, ecol2, ecol3 = st.columns(3)
+            with ecol1:
+                origem_exp = st.radio("Dados", ["Tabela filtrada", "Dataset completo"], horizontal=True)
+            with ecol2:
+                formato_exp = st.selectbox("Formato", formatos_disponiveis(),
+                                           format_func=lambda f: FORMATOS_EXPORTACAO[f][0])
+            with ecol3:
+                rotulos_divisao = {DIVISAO_NENHUMA: "Arquivo único", DIVISAO_TURMA: "ZIP: um por turma",
+                                   DIVISAO_ESTUDANTE: "ZIP: um por estudante"}
+                divisao_exp = st.selectbox("Arquivos", list(rotulos_divisao), format_func=rotulos_divisao.get)
+            filtrada = origem_exp == "Tabela filtrada"
+            chave_exp = (assinatura if filtrada else repr(versao_dados), origem_exp, formato_exp, divisao_exp)
+            exp = st.session_state.get("exportacao")
+            if exp is None or exp["chave"] != chave_exp:
+                if st.button("Gerar arquivo para download"):
+                    if exp is not None:
+                        remover_arquivo(exp["caminho"])
+                    fd, caminho_exp = tempfile.mkstemp(prefix="gpa_export_")
+                    os.close(fd)
+                    with st.spinner("Exportando em blocos..."):
+                        if filtrada:
+                            linhas_exp = exportar(tabela.df, caminho_exp, formato_exp, divisao_exp,
+                                                  posicoes=tabela.ordem(), colunas=tabela.colunas)
+                        else:
+                            completo = (carregar_processados_parquet(raiz_parquet(diretorio_salvar))
+                                        if usar_parquet else dataset.dados)
+                            linhas_exp = exportar(completo, caminho_exp, formato_exp, divisao_exp)
+                    base_exp = "gpa_filtrado" if filtrada else "gpa_completo"
+                    exp = {
+                        "chave": chave_exp, "caminho": caminho_exp, "linhas": linhas_exp,
+                        "nome": nome_arquivo(base_exp, formato_exp, divisao_exp),
+                        "mime": mime_exportacao(formato_exp, divisao_exp),
+                    }
+                    st.session_state["exportacao"] = exp
+            if exp is not None and exp["chave"] == chave_exp and os.path.exists(exp["caminho"]):
+                st.caption(f"{exp['linhas']:,} linha(s), {os.path.getsize(exp['caminho']) / 1e6:.2f} MB.")
+                with open(exp["caminho"], "rb") as fh:
+                    st.download_button(f"Baixar {exp['nome']}", data=fh, file_name=exp["nome"], mime=exp["mime"])
+
+        with st.expander("Resumo por turma (estudantes selecionados)" if filtro_estudante
+                         else "Resumo por turma (todos os estudantes)"):
+            resumo = reagregar(agregados_sel, ["Serie", "Turma", "Trimestre"]).rename(columns={
+                "GPA_n": "Registros", "GPA_media": "GPA médio", "GPA_min": "GPA mín.", "GPA_max": "GPA máx.",
+                "Media_media": "Média média",
+            })
+            st.dataframe(
+                resumo[["Serie", "Turma", "Trimestre", "Registros", "GPA médio", "GPA mín.", "GPA máx.", "Média média"]]
+                .round(2),
+                use_container_width=True, hide_index=True,
+            )
+
+        st.divider()
+
+        # ---- Gráficos ----
+        with st.expander("Limites de dados dos gráficos"):
+            st.caption("Acima destes limites a tendência por estudante é agregada no servidor (mediana + faixa P25–P75).")
+            limite_linhas_graf = int(st.number_input(
+                "Máx. de pontos por gráfico", min_value=100, value=LIMITE_LINHAS_GRAFICO, step=500
+            ))
+            limite_bytes_graf = int(st.number_input(
+                "Máx. de KB enviados por gráfico", min_value=50, value=LIMITE_BYTES_GRAFICO // 1000, step=100
+            )) * 1000
+        aba1, aba2 = st.tabs([
+            "Comparação por disciplina × turma (GPA médio por trimestre)",
+            "Tendência por estudante × disciplina (GPA)",
+        ])
+
+        with aba1:
+            if not disc_sel or not turma_sel:
+                st.info("Selecione pelo menos uma disciplina e uma turma para visualizar.")
+            else:
+                fig1 = grafico_tendencia_gpa_por_disciplina_turma(agregados_sel, disciplinas=disc_sel, turmas=turma_sel)
+                st.altair_chart(fig1, use_container_width=True)
+
+        with aba2:
+            if not disc_sel or not est_sel:
+                st.info("Selecione pelo menos uma disciplina e um estudante para visualizar.")
             else:
-                dados_ind = dados_filtrados.copy()
-                series_loc = sorted(set(serie_sel))
-                serie_escolha = st.selectbox("Série (para visão individual)", series_loc, index=0)
-                turmas_loc = sorted(dados_ind.query("Serie == @serie_escolha")["Turma"].dropna().unique())
-                turma_escolha = st.selectbox("Turma (para visão individual)", turmas_loc, index=0)
-                alunos_loc = sorted(dados_ind.query(
-                    "Serie == @serie_escolha and Turma == @turma_escolha"
-                )["Estudante"].dropna().unique())
-                if not alunos_loc:
-                    st.info("Não há estudantes para os filtros selecionados.")
+                fig2 = grafico_tendencia_gpa_por_estudante_disciplina(
+                    dados_filtrados, disciplinas=disc_sel, estudantes=est_sel,
+                    limite_linhas=limite_linhas_graf, limite_bytes=limite_bytes_graf,
+                )
+                st.altair_chart(fig2, use_container_width=True)
+
+        if _GRAFICO_INDIVIDUAL_OK and grafico_gpa_individual_estudante_disciplinas:
+            aba3 = st.tabs(["GPA individual (série→turma→estudante)"])[0]
+            with aba3:
+                if not serie_sel or not turma_sel:
+                    st.info("Selecione pelo menos uma Série e uma Turma.")
                 else:
-                    aluno_escolha = st.selectbox("Estudante", alunos_loc, index=0)
-                    disps = sorted(dados_ind.query(
-                        "Serie == @serie_escolha and Turma == @turma_escolha and Estudante == @aluno_escolha"
-                    )["Disciplina"].dropna().unique())
-                    if not disps:
-                        st.info("Não há disciplinas para este estudante.")
+                    dados_ind = dados_filtrados
+                    series_loc = sorted(set(serie_sel))
+                    serie_escolha = st.selectbox("Série (para visão individual)", series_loc, index=0)
+                    da_serie = dados_ind[dados_ind["Serie"] == serie_escolha]
+                    turmas_loc = sorted(da_serie["Turma"].dropna().unique())
+                    turma_escolha = st.selectbox("Turma (para visão individual)", turmas_loc, index=0)
+                    da_turma = da_serie[da_serie["Turma"] == turma_escolha]
+                    alunos_loc = sorted(da_turma["Estudante"].dropna().unique())
+                    if not alunos_loc:
+                        st.info("Não há estudantes para os filtros selecionados.")
                     else:
-                        dis_sel3 = st.multiselect("Disciplinas (individual)", disps, default=disps[:min(4, len(disps))])
-                        if dis_sel3:
-                            dados_f = dados_ind.query(
-                                "Serie == @serie_escolha and Turma == @turma_escolha and Estudante == @aluno_escolha"
-                            )
-                            fig3 = grafico_gpa_individual_estudante_disciplinas(dados_f, estudante=aluno_escolha, disciplinas=dis_sel3)
-                            st.altair_chart(fig3, use_container_width=True)
+                        aluno_escolha = st.selectbox("Estudante", alunos_loc, index=0)
+                        dados_f = da_turma[da_turma["Estudante"] == aluno_escolha]
+                        disps = sorted(dados_f["Disciplina"].dropna().unique())
+                        if not disps:
+                            st.info("Não há disciplinas para este estudante.")
                         else:
-                            st.info("Selecione pelo menos uma disciplina.")
-    else:
-        st.warning("O gráfico individual não foi carregado. Verifique/atualize o arquivo 'gpa/graficos.py' no GitHub.")
+                            dis_sel3 = st.multiselect("Disciplinas (individual)", disps, default=disps[:min(4, len(disps))])
+                            if dis_sel3:
+                                fig3 = grafico_gpa_individual_estudante_disciplinas(dados_f, estudante=aluno_escolha, disciplinas=dis_sel3)
+                                st.altair_chart(fig3, use_container_width=True)
+                            else:
+                                st.info("Selecione pelo menos uma disciplina.")
+        else:
+            st.warning("O gráfico individual não foi carregado. Verifique/atualize o arquivo 'gpa/graficos.py' no GitHub.")
+
+
+# -------------------------
+# Página: armazenamento (barra lateral) e seções
+# -------------------------
+with st.sidebar:
+    st.header("Armazenamento")
+    diretorio_salvar = st.text_input("Pasta para salvar dados (no repositório)", value=DIRETORIO_DADOS_PADRAO)
+    st.caption("Todos os dados ficarão em ./data (por padrão).")
+    formato_sel = st.radio(
+        "Formato de armazenamento",
+        ["CSV (processado_*.csv)", "Parquet particionado (Série/Turma/Trimestre)"],
+        horizontal=True,
+        index=0,
+        disabled=not parquet_disponivel(),
+        help=("Parquet grava em ./data/parquet e o dashboard lê só as partições e colunas filtradas. "
+              "Converta os CSVs existentes com: python -m gpa.armazenamento migrar"),
+    )
+    formato_armazenamento = FORMATO_PARQUET if formato_sel.startswith("Parquet") else FORMATO_CSV
+usar_parquet = formato_armazenamento == FORMATO_PARQUET
+# Ficha de versão dos dados: recalculada a cada execução completa (não nas reexecuções de fragmentos)
+versao_dados = (versao_parquet(raiz_parquet(diretorio_salvar)) if usar_parquet
+                else versao_processados(diretorio_salvar))
+
+secao_ingestao(diretorio_salvar, formato_armazenamento)
+st.divider()
+secao_gerenciar(diretorio_salvar)
+st.divider()
+secao_dashboard(diretorio_salvar, formato_armazenamento, versao_dados)
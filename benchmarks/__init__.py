@@ -0,0 +1 @@
+# Benchmarks do pacote gpa — execute com: python -m benchmarks.<modulo>
@@ -0,0 +1,98 @@
+# benchmarks/bench_armazenamento.py — tempo de carga de um ./data multi-ano: CSV × Parquet particionado
+# Uso: python -m benchmarks.bench_armazenamento [--anos 3] [--turmas 16] [--alunos 30] [--manter PASTA]
+import argparse
+import glob
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from gpa.armazenamento import carregar_processados_parquet, migrar_csvs_para_parquet, raiz_parquet
+
+_DISCIPLINAS = ["Arte", "Ciências", "Educação Física", "Geografia", "História", "Inglês",
+                "Matemática", "Português", "Redação", "Filosofia", "Espanhol", "Tecnologia"]
+
+
+def _gerar_data_dir(pasta: str, anos: int, turmas: int, alunos: int, seed: int = 3) -> int:
+    """Um processado_*.csv por (ano, série, turma, trimestre), no formato gravado pelo app."""
+    rng = np.random.default_rng(seed)
+    letras = "ABCDEFGH"
+    series = [6, 7, 8, 9]
+    total = 0
+    for ano in range(2025 - anos + 1, 2026):
+        for i in range(turmas):
+            serie, letra = series[i % len(series)], letras[i // len(series) % len(letras)]
+            nomes = [f"ALUNO {ano}-{serie}{letra}-{k:03d}" for k in range(alunos)]
+            for tri in (1, 2, 3):
+                n = alunos * len(_DISCIPLINAS)
+                p1 = np.round(rng.uniform(0, 10, n), 1)
+                conc = np.round(rng.uniform(0, 10, n), 1)
+                media = (p1 + conc) / 2
+                df = pd.DataFrame({
+                    "Estudante": np.repeat(nomes, len(_DISCIPLINAS)),
+                    "Turma": letra,
+                    "Disciplina": np.tile(_DISCIPLINAS, alunos),
+                    "Trimestre": tri,
+                    "P1": p1, "Conclusiva": conc, "Media": media,
+                    "Serie": f"{serie}º ano",
+                    "MediaPadronizada": media,
+                    "GPA": np.round(media / 2.5, 1),
+                })
+                nome = f"processado_{serie}º {letra} - {tri} TRIMESTRE {ano}_{ano}0101-000000.csv"
+                df.to_csv(os.path.join(pasta, nome), index=False, encoding="utf-8-sig")
+                total += len(df)
+    return total
+
+
+def _cronometrar(func, repeticoes: int = 3):
+    melhor, res = float("inf"), None
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        res = func()
+        melhor = min(melhor, time.perf_counter() - t0)
+    return melhor, res
+
+
+def _carregar_csvs(pasta: str) -> pd.DataFrame:
+    """Mesmo caminho de leitura de carregar_todos_processados (sem as derivações)."""
+    arquivos = sorted(glob.glob(os.path.join(pasta, "processado_*.csv")))
+    return pd.concat([pd.read_csv(f) for f in arquivos], ignore_index=True)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Carga de ./data: CSV × Parquet particionado")
+    ap.add_argument("--anos", type=int, default=3)
+    ap.add_argument("--turmas", type=int, default=16)
+    ap.add_argument("--alunos", type=int, default=30)
+    ap.add_argument("--manter", default=None, help="gera em PASTA e não apaga ao final")
+    args = ap.parse_args()
+
+    pasta = args.manter or tempfile.mkdtemp(prefix="gpa_bench_")
+    os.makedirs(pasta, exist_ok=True)
+    try:
+        linhas = _gerar_data_dir(pasta, args.anos, args.turmas, args.alunos)
+        t_mig, _ = _cronometrar(lambda: migrar_csvs_para_parquet(pasta, log=lambda *_: None), 1)
+        raiz = raiz_parquet(pasta)
+
+        t_csv, df_csv = _cronometrar(lambda: _carregar_csvs(pasta))
+        t_pq, df_pq = _cronometrar(lambda: carregar_processados_parquet(raiz))
+        t_filtro, df_f = _cronometrar(lambda: carregar_processados_parquet(
+            raiz, series=["8º ano"], turmas=["A", "B"], trimestres=[2],
+            colunas=["Estudante", "Disciplina", "Trimestre", "GPA"],
+        ))
+
+        n_csv = len(glob.glob(os.path.join(pasta, "processado_*.csv")))
+        print(f"arquivos: {n_csv} CSV  |  linhas: {linhas:,}  |  migração: {t_mig:.2f} s")
+        print(f"CSV (todos):                {t_csv:.3f} s  ({len(df_csv):,} linhas)")
+        print(f"Parquet (todos):            {t_pq:.3f} s  ({len(df_pq):,} linhas)  {t_csv / t_pq:.1f}x")
+        print(f"Parquet (filtro + colunas): {t_filtro:.3f} s  ({len(df_f):,} linhas)  {t_csv / t_filtro:.1f}x")
+    finally:
+        if args.manter is None:
+            shutil.rmtree(pasta, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# benchmarks/bench_filtros.py — Filtros em cascata do dashboard: IndiceFiltros × query(...) + isin encadeado
+# Uso: python -m benchmarks.bench_filtros [--anos 1 4 16] [--repeticoes 5]
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from gpa.dados import tipar_dataset
+from gpa.filtros import IndiceFiltros
+
+
+def _gerar_historico(anos: int, seed: int = 11) -> pd.DataFrame:
+    """~90 mil linhas por ano letivo: 4 séries × 5 turmas × 3 trimestres × 9 disciplinas × ~170 estudantes."""
+    rng = np.random.default_rng(seed)
+    n = anos * 90_000
+    series = [f"{s}º ano" for s in (6, 7, 8, 9)]
+    return tipar_dataset(pd.DataFrame({
+        "Serie": rng.choice(series, n),
+        "Turma": rng.choice(list("ABCDE"), n),
+        "Trimestre": rng.integers(1, 4, n),
+        "Disciplina": rng.choice([f"Disciplina {i}" for i in range(9)], n),
+        "Estudante": [f"Estudante {i}" for i in rng.integers(0, 700 * anos, n)],
+        "GPA": rng.uniform(0, 4, n),
+    }))
+
+
+def _cascata_legado(df: pd.DataFrame, sel: dict) -> pd.DataFrame:
+    """Cópia do caminho antigo: um query por lista de opções e cinco cópias booleanas no fim."""
+    serie_sel, turma_sel, trim_sel, disc_sel = sel["Serie"], sel["Turma"], sel["Trimestre"], sel["Disciplina"]
+    sorted(df.query("Serie in @serie_sel")["Turma"].dropna().unique())
+    sorted(df.query("Serie in @serie_sel and Turma in @turma_sel")["Trimestre"].dropna().unique())
+    sorted(df.query("Serie in @serie_sel and Turma in @turma_sel and Trimestre in @trim_sel")["Disciplina"]
+           .dropna().unique())
+    est_disp = sorted(df.query(
+        "Serie in @serie_sel and Turma in @turma_sel and Trimestre in @trim_sel and Disciplina in @disc_sel"
+    )["Estudante"].dropna().unique())
+    out = df.copy()
+    for c, v in list(sel.items()) + [("Estudante", est_disp[:20])]:
+        if v:
+            out = out[out[c].isin(v)]
+    return out
+
+
+def _cascata_indice(idx: IndiceFiltros, sel: dict) -> pd.DataFrame:
+    pos = None
+    for dim, prox in (("Serie", "Turma"), ("Turma", "Trimestre"), ("Trimestre", "Disciplina"),
+                      ("Disciplina", "Estudante")):
+        pos = idx.filtrar(pos, dim, sel[dim])
+        opcoes = idx.valores(prox, pos)
+    pos = idx.filtrar(pos, "Estudante", opcoes[:20])
+    return idx.linhas(pos)
+
+
+def _cronometrar(func, repeticoes: int) -> float:
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        func()
+        melhor = min(melhor, time.perf_counter() - t0)
+    return melhor
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Filtros em cascata: índice × query encadeado")
+    ap.add_argument("--anos", type=int, nargs="+", default=[1, 4, 16])
+    ap.add_argument("--repeticoes", type=int, default=5)
+    args = ap.parse_args()
+
+    print(f"{'anos':>5} {'linhas':>10} {'índice (build)':>15} {'índice':>9} {'antigo':>9} {'ganho':>7}")
+    for anos in args.anos:
+        df = _gerar_historico(anos)
+        # Seleção típica: uma série, uma turma, um trimestre, todas as disciplinas
+        sel = {"Serie": ["8º ano"], "Turma": ["B"], "Trimestre": [2], "Disciplina": []}
+        sel["Disciplina"] = sorted(df.query("Serie == '8º ano' and Turma == 'B'")["Disciplina"].unique())
+
+        t0 = time.perf_counter()
+        idx = IndiceFiltros(df)
+        t_build = time.perf_counter() - t0
+        pd.testing.assert_frame_equal(_cascata_indice(idx, sel), _cascata_legado(df, sel))
+
+        t_idx = _cronometrar(lambda: _cascata_indice(idx, sel), args.repeticoes)
+        t_leg = _cronometrar(lambda: _cascata_legado(df, sel), args.repeticoes)
+        print(f"{anos:>5} {len(df):>10,} {t_build * 1e3:>12.1f} ms {t_idx * 1e3:>6.1f} ms "
+              f"{t_leg * 1e3:>6.1f} ms {t_leg / t_idx:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# benchmarks/bench_github.py — Vazão de gpa.github_api contra o GitHub falso local (arquivos/s)
+# Uso: python -m benchmarks.bench_github [--arquivos 10 30 100] [--latencia 0.05] [--taxa-erro 0.0] [--kb 40]
+import os
+import argparse
+import shutil
+import tempfile
+import time
+
+from benchmarks.github_falso import GitHubFalso
+from gpa.github_api import ClienteGitHub
+from gpa.sincronizacao import planejar_sincronizacao, sincronizar
+
+
+def _gerar_arquivos(pasta: str, n: int, kb: int) -> list:
+    linha = "ESTUDANTE EXEMPLO,A,Matemática,1,7.5,8.0,7.75,8º ano,7.75,3.3\n"
+    caminhos = []
+    for i in range(n):
+        caminho = os.path.join(pasta, f"processado_turma_{i:03d}_20250101-000000.csv")
+        with open(caminho, "w", encoding="utf-8") as fh:
+            fh.write("Estudante,Turma,Disciplina,Trimestre,P1,Conclusiva,Media,Serie,MediaPadronizada,GPA\n")
+            fh.write(linha * max(1, kb * 1024 // len(linha)))
+        caminhos.append(caminho)
+    return caminhos
+
+
+def _medir(func) -> float:
+    t0 = time.perf_counter()
+    func()
+    return time.perf_counter() - t0
+
+
+def _rodada(n: int, args) -> dict:
+    origem = tempfile.mkdtemp(prefix="bench_gh_")
+    destino = tempfile.mkdtemp(prefix="bench_gh_sync_")
+    try:
+        locais = _gerar_arquivos(origem, n, args.kb)
+        envios = [(p, f"data/{os.path.basename(p)}") for p in locais]
+        out = {}
+        with GitHubFalso(latencia=args.latencia, taxa_erro=args.taxa_erro, semente=n) as gh:
+            cli = ClienteGitHub("token", gh.owner, gh.repo, base_url=gh.url, backoff=0.01, dormir=time.sleep)
+
+            # Envio: um PUT (e um GET de SHA) por arquivo × um commit em lote
+            out["envio por arquivo"] = _medir(lambda: [cli.enviar(local, rel) for local, rel in envios])
+            commits_antes = gh.n_commits()
+            envios_lote = [(p, rel.replace("data/", "data/lote/")) for p, rel in envios]
+            out["envio em lote"] = _medir(lambda: cli.commit_em_lote(envios_lote))
+            assert gh.n_commits() == commits_antes + 1
+
+            # Sincronização: download serial de tudo × plano por SHA + pool de threads
+            def serial():
+                for _, rel in envios:
+                    cli.baixar(rel, os.path.join(destino, "serial", os.path.basename(rel)))
+
+            def concorrente():
+                ok, itens = cli.listar("data")
+                assert ok
+                plano = planejar_sincronizacao(itens, os.path.join(destino, "pool"))
+                sincronizar(plano, cli.baixar, max_trabalhadores=args.trabalhadores)
+
+            out["sync serial"] = _medir(serial)
+            out["sync concorrente"] = _medir(concorrente)
+            out["sync sem mudanças"] = _medir(concorrente)  # tudo igual: só a listagem
+
+            # Exclusão: um DELETE por arquivo × um commit em lote
+            out["exclusão por arquivo"] = _medir(lambda: [cli.excluir(rel) for _, rel in envios])
+            out["exclusão em lote"] = _medir(lambda: cli.commit_em_lote(exclusoes=[r for _, r in envios_lote]))
+            assert not gh.arquivos()
+            out["_requisicoes"] = gh.requisicoes
+            out["_repeticoes"] = cli.repeticoes
+        return out
+    finally:
+        shutil.rmtree(origem, ignore_errors=True)
+        shutil.rmtree(destino, ignore_errors=True)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Vazão de gpa.github_api contra um GitHub falso local")
+    ap.add_argument("--arquivos", type=int, nargs="+", default=[10, 30, 100])
+    ap.add_argument("--latencia", type=float, default=0.05, help="segundos por requisição no servidor")
+    ap.add_argument("--taxa-erro", type=float, default=0.0, help="probabilidade de 502 por requisição")
+    ap.add_argument("--kb", type=int, default=40, help="tamanho de cada arquivo (KB)")
+    ap.add_argument("--trabalhadores", type=int, default=8)
+    args = ap.parse_args()
+
+    print(f"latência {args.latencia * 1000:.0f} ms/req, erro {args.taxa_erro:.0%}, arquivos de {args.kb} KB")
+    for n in args.arquivos:
+        res = _rodada(n, args)
+        print(f"\n{n} arquivo(s) — {res.pop('_requisicoes')} requisições, {res.pop('_repeticoes')} repetição(ões)")
+        for nome, seg in res.items():
+            print(f"  {nome:<22} {seg:7.2f} s  {n / seg:8.1f} arquivos/s")
+
+
+if __name__ == "__main__":
+    main()
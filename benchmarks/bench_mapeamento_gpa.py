@@ -0,0 +1,67 @@
+# benchmarks/bench_mapeamento_gpa.py — MapeamentoGPA (searchsorted) × mapeamento antigo por linha (apply)
+# Uso: python -m benchmarks.bench_mapeamento_gpa [--linhas 1000000] [--amostra-legado 20000] [--legado-completo]
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from gpa.config import tabela_gpa_padrao
+from gpa.processamento import POLITICA_LACUNA_NAN, aplicar_mapeamento_gpa, compilar_mapeamento_gpa
+
+
+def _media_para_gpa_legado(mapa: pd.DataFrame, x: float):
+    """Cópia do caminho antigo: filtra a tabela inteira para cada média."""
+    if pd.isna(x):
+        return np.nan
+    linha = mapa[(mapa["min"] <= x) & (x <= mapa["max"])].head(1)
+    if not linha.empty:
+        return float(linha.iloc[0]["gpa"])
+    return np.nan
+
+
+def _gerar_medias(n: int, seed: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    media = (rng.integers(0, 101, n) + rng.integers(0, 101, n)) / 20.0  # (P1+Conclusiva)/2 com 1 casa
+    media[rng.random(n) < 0.01] = np.nan
+    return pd.DataFrame({"Media": media})
+
+
+def main():
+    ap = argparse.ArgumentParser(description="MapeamentoGPA × apply por linha")
+    ap.add_argument("--linhas", type=int, default=1_000_000)
+    ap.add_argument("--amostra-legado", type=int, default=20_000,
+                    help="linhas usadas para medir o caminho antigo (tempo extrapolado para --linhas)")
+    ap.add_argument("--legado-completo", action="store_true", help="mede o caminho antigo em todas as linhas (lento)")
+    args = ap.parse_args()
+
+    tabela = tabela_gpa_padrao()
+    df = _gerar_medias(args.linhas)
+
+    t0 = time.perf_counter()
+    mapa = compilar_mapeamento_gpa(tabela, politica_lacunas=POLITICA_LACUNA_NAN)
+    t_compilar = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    novo = aplicar_mapeamento_gpa(df, mapa, escala="0-10")
+    t_novo = time.perf_counter() - t0
+
+    n_leg = args.linhas if args.legado_completo else min(args.amostra_legado, args.linhas)
+    amostra = df["Media"].iloc[:n_leg]
+    mapa_leg = tabela.sort_values(["min", "max"]).reset_index(drop=True)
+    t0 = time.perf_counter()
+    legado = amostra.apply(lambda x: _media_para_gpa_legado(mapa_leg, x))
+    t_leg = (time.perf_counter() - t0) * (args.linhas / n_leg)
+
+    iguais = np.array_equal(novo["GPA"].iloc[:n_leg].to_numpy(), legado.to_numpy(), equal_nan=True)
+    sufixo = "" if n_leg == args.linhas else f" (extrapolado de {n_leg:,} linhas)"
+    print(f"linhas:             {args.linhas:,}")
+    print(f"compilar tabela:    {t_compilar * 1e3:.3f} ms")
+    print(f"searchsorted:       {t_novo:.3f} s  ({args.linhas / t_novo:,.0f} linhas/s)")
+    print(f"apply por linha:    {t_leg:.3f} s{sufixo}")
+    print(f"ganho:              {t_leg / t_novo:,.0f}x")
+    print(f"resultados iguais:  {iguais}")
+
+
+if __name__ == "__main__":
+    main()
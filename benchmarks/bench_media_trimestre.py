@@ -0,0 +1,95 @@
+# benchmarks/bench_media_trimestre.py — calcular_media_por_trimestre: atual × versão antiga (apply + 5 chaves string)
+# Uso: python -m benchmarks.bench_media_trimestre [--linhas 500000] [--repeticoes 3]
+import argparse
+import time
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from gpa.config import ROTULOS_PADRAO_CONCLUSIVA, ROTULOS_PADRAO_P1
+from gpa.processamento import calcular_media_por_trimestre
+
+
+def _calcular_media_legado(df: pd.DataFrame, rotulos_p1: List[str], rotulos_conclusiva: List[str]) -> pd.DataFrame:
+    """Cópia do caminho antigo: classificação por linha e groupby sobre strings."""
+    trab = df.copy()
+
+    def classificar(av: str) -> str:
+        s = str(av).strip().lower()
+        if any(lbl.lower() in s for lbl in rotulos_p1):
+            return "P1"
+        if any(lbl.lower() in s for lbl in rotulos_conclusiva):
+            return "Conclusiva"
+        return "Outro"
+
+    trab["_tipo"] = trab["Avaliacao"].apply(classificar)
+    trab = trab[trab["_tipo"].isin(["P1", "Conclusiva"])]
+    agg = (
+        trab
+        .groupby(["Estudante", "Turma", "Disciplina", "Trimestre", "_tipo"], dropna=False)["Nota"]
+        .mean()
+        .unstack("_tipo")
+        .reset_index()
+    )
+    agg["P1"] = agg.get("P1")
+    agg["Conclusiva"] = agg.get("Conclusiva")
+    agg["Media"] = (agg["P1"] + agg["Conclusiva"]) / 2.0
+    return agg[["Estudante", "Turma", "Disciplina", "Trimestre", "P1", "Conclusiva", "Media"]]
+
+
+def _gerar_notas(n: int, seed: int = 7) -> pd.DataFrame:
+    """Export sintético: poucas dezenas de DescrAvaliacao repetidas em muitas linhas."""
+    rng = np.random.default_rng(seed)
+    avaliacoes = (
+        ["P1", "Progressiva I", "Prova 1 - Recuperação", "Conclusiva", "CF", "Prova Final"]
+        + [f"Trabalho {i}" for i in range(1, 15)]
+        + [f"Atividade Avaliativa {i}" for i in range(1, 15)]
+    )
+    disciplinas = ["Arte", "Ciências", "Educação Física", "Geografia", "História", "Inglês",
+                   "Matemática", "Português", "Redação"]
+    n_est = max(n // 60, 1)
+    return pd.DataFrame({
+        "Estudante": rng.integers(0, n_est, n).astype(str),
+        "Turma": rng.choice(list("ABCDE"), n),
+        "Disciplina": rng.choice(disciplinas, n),
+        "Avaliacao": rng.choice(avaliacoes, n),
+        "Nota": np.round(rng.uniform(0, 10, n), 1),
+        "Trimestre": rng.integers(1, 4, n),
+    })
+
+
+def _cronometrar(func, repeticoes: int) -> float:
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        func()
+        melhor = min(melhor, time.perf_counter() - t0)
+    return melhor
+
+
+def main():
+    ap = argparse.ArgumentParser(description="calcular_media_por_trimestre: atual × antigo")
+    ap.add_argument("--linhas", type=int, default=500_000)
+    ap.add_argument("--repeticoes", type=int, default=3)
+    args = ap.parse_args()
+
+    df = _gerar_notas(args.linhas)
+    p1, conc = ROTULOS_PADRAO_P1, ROTULOS_PADRAO_CONCLUSIVA
+
+    novo = calcular_media_por_trimestre(df, p1, conc)
+    legado = _calcular_media_legado(df, p1, conc)
+    pd.testing.assert_frame_equal(novo, legado, check_exact=True)
+
+    t_novo = _cronometrar(lambda: calcular_media_por_trimestre(df, p1, conc), args.repeticoes)
+    t_leg = _cronometrar(lambda: _calcular_media_legado(df, p1, conc), args.repeticoes)
+
+    print(f"linhas:             {args.linhas:,}  (grupos de saída: {len(novo):,})")
+    print(f"atual:              {t_novo:.3f} s  ({args.linhas / t_novo:,.0f} linhas/s)")
+    print(f"antigo:             {t_leg:.3f} s  ({args.linhas / t_leg:,.0f} linhas/s)")
+    print(f"ganho:              {t_leg / t_novo:.1f}x")
+    print("resultados iguais:  True")
+
+
+if __name__ == "__main__":
+    main()
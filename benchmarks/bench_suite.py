@@ -0,0 +1,201 @@
+# benchmarks/bench_suite.py — Suíte ponta a ponta sobre exports sintéticos: tempo, vazão e pico de memória por etapa
+# Uso: python -m benchmarks.bench_suite [--escalas turma escola rede] [--repeticoes 3] [--json resultados.json]
+#                                       [--comparar base.json] [--encoding latin-1] [--sep ';'] [--formato csv]
+# Cada etapa roda 'repeticoes' vezes (vale a melhor) e mais uma vez sob tracemalloc para o pico de memória.
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict
+from typing import Callable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.gerador_exports import (
+    ESCALAS, ROTULOS_CONCLUSIVA, ROTULOS_P1, adicionar_argumentos_perfil, gerar_rede, perfil_de_argumentos,
+)
+from gpa.config import ESQUEMA_PADRAO, tabela_gpa_padrao
+from gpa.dados import carregar_todos_processados
+from gpa.filtros import IndiceFiltros
+from gpa.ingestao import ParametrosIngestao, processar_arquivo
+from gpa.io import converter_decimal, leitura_robusta
+from gpa.processamento import aplicar_mapeamento_gpa, calcular_media_por_trimestre, compilar_mapeamento_gpa
+
+VERSAO_FORMATO = 1
+_RENOMEIO = {ESQUEMA_PADRAO["student"]: "Estudante", ESQUEMA_PADRAO["turma"]: "Turma",
+             ESQUEMA_PADRAO["discipline"]: "Disciplina", ESQUEMA_PADRAO["assessment"]: "Avaliacao",
+             ESQUEMA_PADRAO["grade"]: "Nota"}
+
+
+def medir(func: Callable[[], object], repeticoes: int) -> dict:
+    """Melhor tempo de 'repeticoes' execuções e o pico de alocação (tracemalloc) de uma execução extra."""
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        func()
+        melhor = min(melhor, time.perf_counter() - t0)
+    tracemalloc.start()
+    try:
+        func()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"segundos": melhor, "pico_mb": pico / 1e6}
+
+
+def _trimestre(nome: str) -> int:
+    return {"I": 1, "II": 2, "III": 3}[nome.split(" TRIMESTRE")[0].rsplit(" ", 1)[-1]]
+
+
+def _etapas(arquivos: List[tuple], pasta: str, perfil) -> List[tuple]:
+    """(nome da etapa, função sem argumentos, linhas processadas, bytes de entrada) na ordem do pipeline."""
+    p1, conc = list(ROTULOS_P1), list(ROTULOS_CONCLUSIVA)
+    mapa = compilar_mapeamento_gpa(tabela_gpa_padrao())
+    bytes_total = sum(len(b) for _, b in arquivos)
+
+    # Entradas de cada etapa preparadas fora da medição (cada etapa mede só a sua função)
+    brutos = [leitura_robusta(b) for _, b in arquivos]
+    linhas_brutas = sum(len(df) for df in brutos)
+    notas_texto = [df[ESQUEMA_PADRAO["grade"]].map(
+        lambda v: "" if pd.isna(v) else f"{v:.1f}".replace(".", perfil.decimal)) for df in brutos]
+    renomeados = []
+    for (nome, _), df in zip(arquivos, brutos):
+        df = df.rename(columns=_RENOMEIO)
+        df["Nota"] = converter_decimal(df["Nota"])
+        df["Trimestre"] = _trimestre(nome)
+        renomeados.append(df)
+    medias = [calcular_media_por_trimestre(df, p1, conc) for df in renomeados]
+    linhas_medias = sum(len(m) for m in medias)
+
+    params = ParametrosIngestao(
+        coluna_nome=ESQUEMA_PADRAO["student"], coluna_turma=ESQUEMA_PADRAO["turma"],
+        coluna_disc=ESQUEMA_PADRAO["discipline"], coluna_avaliacao=ESQUEMA_PADRAO["assessment"],
+        coluna_nota=ESQUEMA_PADRAO["grade"], rotulos_p1=tuple(p1), rotulos_conclusiva=tuple(conc),
+        trimestre_constante=1, mapa_gpa=mapa, escala="auto", diretorio_saida=pasta,
+    )
+
+    def pipeline():
+        for nome, bruto in arquivos:
+            res = processar_arquivo(nome, bruto, params, "00000000-000000")
+            if not res["ok"]:
+                raise RuntimeError(f"{nome}: {res['erro']}")
+
+    pipeline()  # grava os processados lidos pelas etapas seguintes
+    dados = carregar_todos_processados(pasta)
+    idx = IndiceFiltros(dados)
+
+    def cascata():
+        # Seleção típica do dashboard: uma série, uma turma, um trimestre, todas as disciplinas, 20 estudantes
+        pos = None
+        for dim, prox in (("Serie", "Turma"), ("Turma", "Trimestre"), ("Trimestre", "Disciplina"),
+                          ("Disciplina", "Estudante")):
+            opcoes = idx.valores(dim, pos)
+            pos = idx.filtrar(pos, dim, opcoes if dim == "Disciplina" else opcoes[:1])
+        pos = idx.filtrar(pos, "Estudante", idx.valores("Estudante", pos)[:20])
+        return idx.linhas(pos)
+
+    return [
+        ("leitura_robusta", lambda: [leitura_robusta(b) for _, b in arquivos], linhas_brutas, bytes_total),
+        ("converter_decimal", lambda: [converter_decimal(s) for s in notas_texto], linhas_brutas, None),
+        ("calcular_media_por_trimestre", lambda: [calcular_media_por_trimestre(df, p1, conc) for df in renomeados],
+         linhas_brutas, None),
+        ("aplicar_mapeamento_gpa", lambda: [aplicar_mapeamento_gpa(m, mapa) for m in medias], linhas_medias, None),
+        ("processar_arquivo (pipeline)", pipeline, linhas_brutas, bytes_total),
+        ("carregar_todos_processados", lambda: carregar_todos_processados(pasta), len(dados), None),
+        ("filtros (construção do índice)", lambda: IndiceFiltros(dados), len(dados), None),
+        ("filtros (cascata)", cascata, len(dados), None),
+    ]
+
+
+def rodar_escala(nome_escala: str, perfil, repeticoes: int, semente: int = 0, log=print) -> List[dict]:
+    escala = ESCALAS[nome_escala]
+    t0 = time.perf_counter()
+    arquivos = list(gerar_rede(escala, perfil, semente))
+    log(f"[{nome_escala}] {len(arquivos)} arquivo(s) gerados em {time.perf_counter() - t0:.1f} s")
+    pasta = tempfile.mkdtemp(prefix="gpa_suite_")
+    try:
+        resultados = []
+        for etapa, func, linhas, n_bytes in _etapas(arquivos, pasta, perfil):
+            m = medir(func, repeticoes)
+            m.update({
+                "escala": nome_escala, "etapa": etapa, "arquivos": len(arquivos), "linhas": int(linhas),
+                "linhas_por_s": linhas / m["segundos"] if m["segundos"] else None,
+                "mb_por_s": n_bytes / 1e6 / m["segundos"] if n_bytes and m["segundos"] else None,
+            })
+            resultados.append(m)
+            log(_linha(m))
+        return resultados
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+
+
+def _linha(r: dict, base: Optional[dict] = None) -> str:
+    mbs = f"{r['mb_por_s']:7.1f} MB/s" if r.get("mb_por_s") else " " * 12
+    texto = (f"  {r['etapa']:<32} {r['segundos']:9.4f} s {r['linhas_por_s'] or 0:>14,.0f} linhas/s {mbs}"
+             f" {r['pico_mb']:9.1f} MB pico")
+    if base:
+        texto += f"   {base['segundos'] / r['segundos']:5.2f}x tempo  {base['pico_mb'] / max(r['pico_mb'], 1e-9):5.2f}x memória"
+    return texto
+
+
+def _commit_atual() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              timeout=5, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def ambiente() -> dict:
+    return {"python": platform.python_version(), "pandas": pd.__version__, "numpy": np.__version__,
+            "plataforma": platform.platform(), "cpus": os.cpu_count(), "commit": _commit_atual()}
+
+
+def comparar(atual: List[dict], base: List[dict]) -> None:
+    """Imprime a razão base/atual por (escala, etapa): >1 significa que a execução atual é mais rápida/menor."""
+    por_chave = {(r["escala"], r["etapa"]): r for r in base}
+    print("\nComparação com a base (base ÷ atual):")
+    for r in atual:
+        b = por_chave.get((r["escala"], r["etapa"]))
+        if b is not None:
+            print(f"[{r['escala']}]" + _linha(r, b))
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Suíte ponta a ponta do pipeline e do dashboard")
+    ap.add_argument("--escalas", nargs="+", default=["turma", "escola", "rede"], choices=list(ESCALAS))
+    ap.add_argument("--repeticoes", type=int, default=3)
+    ap.add_argument("--semente", type=int, default=0)
+    ap.add_argument("--json", default=None, help="grava os resultados (legíveis por máquina) neste arquivo")
+    ap.add_argument("--comparar", default=None, help="JSON de uma execução anterior para comparar")
+    adicionar_argumentos_perfil(ap)
+    args = ap.parse_args(argv)
+
+    perfil = perfil_de_argumentos(args)
+    print(f"perfil: {perfil}")
+    resultados = []
+    for nome in args.escalas:
+        resultados.extend(rodar_escala(nome, perfil, args.repeticoes, args.semente))
+
+    saida = {"versao": VERSAO_FORMATO, "quando": time.strftime("%Y-%m-%dT%H:%M:%S"), "ambiente": ambiente(),
+             "parametros": {"perfil": asdict(perfil), "escalas": args.escalas, "repeticoes": args.repeticoes,
+                            "semente": args.semente},
+             "resultados": resultados}
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(saida, fh, ensure_ascii=False, indent=2)
+        print(f"\nresultados gravados em {args.json}")
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as fh:
+            comparar(resultados, json.load(fh)["resultados"])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
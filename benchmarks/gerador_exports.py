@@ -0,0 +1,198 @@
+# benchmarks/gerador_exports.py — Exports escolares sintéticos no formato dos originais (Nome, Turma, DescrMateria, DescrAvaliacao, Nota)
+# Uso: python -m benchmarks.gerador_exports PASTA [--escala escola] [--encoding latin-1] [--sep ';'] [--formato csv]
+# Um arquivo por (escola, ano, série, turma, trimestre), nomeado como os exports reais ("8º A - II TRIMESTRE.csv"),
+# para que a inferência de série/turma/trimestre do app funcione sem ajuste.
+import argparse
+import io
+import os
+from dataclasses import dataclass, replace
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from gpa.config import ESQUEMA_PADRAO
+
+DISCIPLINAS = ["Arte", "Ciências", "Educação Física", "Geografia", "História", "Inglês",
+               "Matemática", "Português", "Redação", "Filosofia", "Espanhol", "Tecnologia",
+               "Música", "Sociologia", "Física", "Química"]
+ROTULOS_P1 = ["P1", "Progressiva I", "Prova 1"]
+ROTULOS_CONCLUSIVA = ["Conclusiva", "CF", "Prova Final"]
+_PRIMEIROS = ["ANA", "JOÃO", "MARIA", "JOSÉ", "LUÍSA", "PEDRO", "JÚLIA", "LUCAS", "BEATRIZ", "GABRIEL",
+              "LETÍCIA", "MATEUS", "CECÍLIA", "RAFAEL", "HELOÍSA", "VINÍCIUS", "LÍVIA", "CAUÃ", "ISADORA", "THIAGO"]
+_SOBRENOMES = ["SILVA", "SANTOS", "OLIVEIRA", "SOUZA", "LIMA", "PEREIRA", "FERREIRA", "COSTA", "RODRIGUES",
+               "ALMEIDA", "NASCIMENTO", "ARAÚJO", "GONÇALVES", "CONCEIÇÃO", "MENDES", "BARBOSA", "RIBEIRO", "CASTRO"]
+_ROMANOS = {1: "I", 2: "II", 3: "III"}
+_LETRAS = "ABCDEFGH"
+
+FORMATO_CSV = "csv"
+FORMATO_XLSX = "xlsx"
+
+
+@dataclass(frozen=True)
+class PerfilExport:
+    """Forma de cada export: tamanho da turma, avaliações e dialeto do arquivo."""
+    alunos: int = 30
+    disciplinas: int = 12
+    avaliacoes_extras: int = 4        # além de P1 e Conclusiva (trabalhos, recuperação...)
+    encoding: str = "latin-1"         # 'latin-1' | 'utf-8' | 'utf-8-sig'
+    sep: str = ";"                    # ';' usa vírgula decimal; ',' usa ponto
+    formato: str = FORMATO_CSV        # 'csv' | 'xlsx'
+    coluna_trimestre: bool = False    # exports reais em geral não trazem; o trimestre vem do nome
+    taxa_ausentes: float = 0.02       # fração de notas em branco
+
+    @property
+    def decimal(self) -> str:
+        return "," if self.sep == ";" else "."
+
+    @property
+    def linhas_por_arquivo(self) -> int:
+        return self.alunos * self.disciplinas * (2 + self.avaliacoes_extras)
+
+
+@dataclass(frozen=True)
+class Escala:
+    escolas: int
+    anos: int
+    series: int
+    turmas: int   # por série
+
+    def arquivos(self) -> int:
+        return self.escolas * self.anos * self.series * self.turmas * 3
+
+
+# De uma turma (3 trimestres) a uma rede de escolas com histórico de vários anos
+ESCALAS = {
+    "turma": Escala(escolas=1, anos=1, series=1, turmas=1),
+    "escola": Escala(escolas=1, anos=1, series=4, turmas=4),
+    "rede": Escala(escolas=10, anos=1, series=4, turmas=4),
+    "rede_multiano": Escala(escolas=10, anos=3, series=4, turmas=4),
+}
+
+
+def _nomes_alunos(rng: np.random.Generator, n: int) -> List[str]:
+    p = rng.choice(_PRIMEIROS, n)
+    s1 = rng.choice(_SOBRENOMES, n)
+    s2 = rng.choice(_SOBRENOMES, n)
+    return [f"{a} {b} {c}" for a, b, c in zip(p, s1, s2)]
+
+
+def gerar_export(serie: int, turma: str, trimestre: int, perfil: PerfilExport = PerfilExport(),
+                 semente=0, alunos: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Um export bruto (uma linha por estudante × disciplina × avaliação), com as colunas de ESQUEMA_PADRAO.
+    'semente' é qualquer entrada aceita por np.random.default_rng (int ou sequência de ints).
+    """
+    rng = np.random.default_rng(semente)
+    alunos = alunos or _nomes_alunos(rng, perfil.alunos)
+    disciplinas = DISCIPLINAS[:perfil.disciplinas]
+    avaliacoes = ([ROTULOS_P1[trimestre % len(ROTULOS_P1)], ROTULOS_CONCLUSIVA[trimestre % len(ROTULOS_CONCLUSIVA)]]
+                  + [f"Trabalho {i}" for i in range(1, perfil.avaliacoes_extras)]
+                  + (["Recuperação"] if perfil.avaliacoes_extras else []))
+    n_al, n_disc, n_av = len(alunos), len(disciplinas), len(avaliacoes)
+    n = n_al * n_disc * n_av
+
+    # Nível do aluno + ruído por avaliação: médias plausíveis, espalhadas por todas as faixas de GPA
+    nivel = np.repeat(rng.normal(7.0, 1.6, n_al), n_disc * n_av)
+    notas = np.clip(np.round(nivel + rng.normal(0, 1.2, n), 1), 0, 10)
+    notas[rng.random(n) < perfil.taxa_ausentes] = np.nan
+
+    esquema = ESQUEMA_PADRAO
+    df = pd.DataFrame({
+        esquema["student"]: np.repeat(alunos, n_disc * n_av),
+        esquema["turma"]: f"{serie}º ANO {turma}",
+        esquema["discipline"]: np.tile(np.repeat(disciplinas, n_av), n_al),
+        esquema["assessment"]: np.tile(avaliacoes, n_al * n_disc),
+        esquema["grade"]: notas,
+    })
+    if perfil.coluna_trimestre:
+        df["Trimestre"] = trimestre
+    return df
+
+
+def serializar_export(df: pd.DataFrame, perfil: PerfilExport = PerfilExport()) -> bytes:
+    """Bytes do arquivo no dialeto do perfil (CSV) ou como planilha (XLSX)."""
+    buffer = io.BytesIO()
+    if perfil.formato == FORMATO_XLSX:
+        df.to_excel(buffer, index=False, engine="openpyxl")
+    else:
+        texto = df.to_csv(index=False, sep=perfil.sep, decimal=perfil.decimal, lineterminator="\r\n")
+        buffer.write(texto.encode(perfil.encoding))
+    return buffer.getvalue()
+
+
+def nome_export(serie: int, turma: str, trimestre: int, perfil: PerfilExport = PerfilExport(),
+                escola: int = 1, ano: int = 2025) -> str:
+    return f"{serie}º {turma} - {_ROMANOS[trimestre]} TRIMESTRE - ESCOLA{escola:02d} {ano}.{perfil.formato}"
+
+
+def gerar_rede(escala: Escala, perfil: PerfilExport = PerfilExport(),
+               semente: int = 0) -> Iterator[Tuple[str, bytes]]:
+    """
+    (nome, bytes) de cada export da escala, em ordem determinística. Os alunos de uma turma
+    são os mesmos nos três trimestres e avançam de série a cada ano (coorte).
+    """
+    ano_final = 2025
+    for escola in range(1, escala.escolas + 1):
+        for ano in range(ano_final - escala.anos + 1, ano_final + 1):
+            for s in range(escala.series):
+                serie = 6 + s
+                for t in range(escala.turmas):
+                    turma = _LETRAS[t % len(_LETRAS)]
+                    coorte = ano - serie
+                    rng = np.random.default_rng([semente, escola, coorte % 10_000, t])
+                    alunos = _nomes_alunos(rng, perfil.alunos)
+                    alunos = [f"{a} {escola:02d}{t}{k:02d}" for k, a in enumerate(alunos)]  # nomes únicos na rede
+                    for tri in (1, 2, 3):
+                        df = gerar_export(serie, turma, tri, perfil,
+                                          semente=[semente, escola, ano, serie, t, tri], alunos=alunos)
+                        yield nome_export(serie, turma, tri, perfil, escola, ano), serializar_export(df, perfil)
+
+
+def gravar_rede(pasta: str, escala: Escala, perfil: PerfilExport = PerfilExport(), semente: int = 0) -> List[str]:
+    os.makedirs(pasta, exist_ok=True)
+    caminhos = []
+    for nome, bruto in gerar_rede(escala, perfil, semente):
+        caminho = os.path.join(pasta, nome)
+        with open(caminho, "wb") as fh:
+            fh.write(bruto)
+        caminhos.append(caminho)
+    return caminhos
+
+
+def perfil_de_argumentos(args) -> PerfilExport:
+    return replace(PerfilExport(), alunos=args.alunos, disciplinas=args.disciplinas,
+                   avaliacoes_extras=args.avaliacoes_extras, encoding=args.encoding,
+                   sep=args.sep, formato=args.formato)
+
+
+def adicionar_argumentos_perfil(ap: argparse.ArgumentParser) -> None:
+    padrao = PerfilExport()
+    ap.add_argument("--alunos", type=int, default=padrao.alunos, help="estudantes por turma")
+    ap.add_argument("--disciplinas", type=int, default=padrao.disciplinas, choices=range(1, len(DISCIPLINAS) + 1),
+                    metavar=f"1..{len(DISCIPLINAS)}")
+    ap.add_argument("--avaliacoes-extras", type=int, default=padrao.avaliacoes_extras,
+                    help="avaliações por disciplina além de P1 e Conclusiva")
+    ap.add_argument("--encoding", default=padrao.encoding, choices=["latin-1", "utf-8", "utf-8-sig"])
+    ap.add_argument("--sep", default=padrao.sep, choices=[";", ","])
+    ap.add_argument("--formato", default=padrao.formato, choices=[FORMATO_CSV, FORMATO_XLSX])
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Gera exports escolares sintéticos")
+    ap.add_argument("pasta")
+    ap.add_argument("--escala", default="escola", choices=list(ESCALAS))
+    ap.add_argument("--semente", type=int, default=0)
+    adicionar_argumentos_perfil(ap)
+    args = ap.parse_args()
+
+    perfil = perfil_de_argumentos(args)
+    escala = ESCALAS[args.escala]
+    caminhos = gravar_rede(args.pasta, escala, perfil, args.semente)
+    total = sum(os.path.getsize(c) for c in caminhos)
+    print(f"{len(caminhos)} arquivo(s), {len(caminhos) * perfil.linhas_por_arquivo:,} linhas, "
+          f"{total / 1e6:.1f} MB em {args.pasta}")
+
+
+if __name__ == "__main__":
+    main()
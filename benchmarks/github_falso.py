@@ -0,0 +1,389 @@
+# benchmarks/github_falso.py — Servidor local que imita a API do GitHub usada pelo app (contents, blobs, trees, commits, refs)
+# Uso em benchmarks/testes manuais:
+#     with GitHubFalso(latencia=0.02) as gh:
+#         cliente = ClienteGitHub("token", gh.owner, gh.repo, base_url=gh.url)
+import os
+import re
+import json
+import time
+import base64
+import random
+import shutil
+import hashlib
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, unquote, urlparse
+
+LIMITE_CONTEUDO_JSON = 1024 * 1024  # acima disso a contents API não embute o conteúdo
+
+
+def sha_blob(conteudo: bytes) -> str:
+    return hashlib.sha1(b"blob %d\0" % len(conteudo) + conteudo).hexdigest()
+
+
+class GitHubFalso:
+    """
+    Repositório em memória + blobs em disco (diretório temporário), servido por HTTP em 127.0.0.1.
+    Árvores são mapas planos caminho → sha do blob. Parâmetros:
+      latencia       segundos de espera por requisição (simula a ida e volta);
+      taxa_erro      probabilidade de responder 502;
+      limite         requisições por janela (X-RateLimit-*); esgotado → 403 até 'janela' segundos depois;
+      secundario_a_cada  a cada N requisições responde 403 com Retry-After (limite secundário).
+    """
+
+    def __init__(self, owner: str = "escola", repo: str = "gpa", branch: str = "main", latencia: float = 0.0,
+                 taxa_erro: float = 0.0, limite: Optional[int] = None, janela: float = 60.0,
+                 secundario_a_cada: Optional[int] = None, retry_after: float = 0.0, semente: int = 0):
+        self.owner, self.repo, self.branch = owner, repo, branch
+        self.latencia, self.taxa_erro = latencia, taxa_erro
+        self.limite, self.janela = limite, janela
+        self.secundario_a_cada, self.retry_after = secundario_a_cada, retry_after
+        self._rng = random.Random(semente)
+        self._lock = threading.RLock()
+        self.dir = tempfile.mkdtemp(prefix="github_falso_")
+        self.arvores: Dict[str, Dict[str, str]] = {}
+        self.commits: Dict[str, dict] = {}
+        self.refs: Dict[str, str] = {}
+        self.requisicoes = 0
+        self.contagem: Dict[str, int] = {}
+        self._janela_inicio = time.time()
+        self._usadas = 0
+        vazia = self._gravar_arvore({})
+        self.refs[branch] = self._gravar_commit(vazia, [], "init")
+        self._servidor = None
+
+    # ---- armazenamento ----
+    def _caminho_blob(self, sha: str) -> str:
+        return os.path.join(self.dir, sha)
+
+    def gravar_blob(self, conteudo: bytes) -> str:
+        sha = sha_blob(conteudo)
+        caminho = self._caminho_blob(sha)
+        if not os.path.exists(caminho):
+            with open(caminho + ".tmp", "wb") as fh:
+                fh.write(conteudo)
+            os.replace(caminho + ".tmp", caminho)
+        return sha
+
+    def ler_blob(self, sha: str) -> Optional[bytes]:
+        try:
+            with open(self._caminho_blob(sha), "rb") as fh:
+                return fh.read()
+        except OSError:
+            return None
+
+    def _gravar_arvore(self, entradas: Dict[str, str]) -> str:
+        sha = hashlib.sha1(json.dumps(sorted(entradas.items())).encode()).hexdigest()
+        self.arvores[sha] = dict(entradas)
+        return sha
+
+    def _gravar_commit(self, arvore: str, pais, mensagem: str) -> str:
+        sha = hashlib.sha1(f"{arvore}{pais}{mensagem}{time.time_ns()}".encode()).hexdigest()
+        self.commits[sha] = {"tree": arvore, "parents": list(pais), "message": mensagem}
+        return sha
+
+    def arquivos(self) -> Dict[str, str]:
+        """Estado atual do branch: caminho → sha."""
+        with self._lock:
+            return dict(self.arvores[self.commits[self.refs[self.branch]]["tree"]])
+
+    def semear(self, arquivos: Dict[str, bytes], mensagem: str = "seed") -> None:
+        """Coloca arquivos no branch diretamente (sem passar pelo HTTP)."""
+        with self._lock:
+            entradas = self.arquivos()
+            for caminho, conteudo in arquivos.items():
+                entradas[caminho] = self.gravar_blob(conteudo)
+            self._avancar(entradas, mensagem)
+
+    def _avancar(self, entradas: Dict[str, str], mensagem: str) -> str:
+        arvore = self._gravar_arvore(entradas)
+        self.refs[self.branch] = self._gravar_commit(arvore, [self.refs[self.branch]], mensagem)
+        return self.refs[self.branch]
+
+    def n_commits(self) -> int:
+        n, sha = 0, self.refs[self.branch]
+        while self.commits[sha]["parents"]:
+            n, sha = n + 1, self.commits[sha]["parents"][0]
+        return n
+
+    # ---- servidor ----
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._servidor.server_port}"
+
+    def iniciar(self) -> "GitHubFalso":
+        falso = self
+
+        class Manipulador(_Manipulador):
+            gh = falso
+
+        self._servidor = ThreadingHTTPServer(("127.0.0.1", 0), Manipulador)
+        self._servidor.daemon_threads = True
+        threading.Thread(target=self._servidor.serve_forever, daemon=True).start()
+        return self
+
+    def parar(self) -> None:
+        if self._servidor is not None:
+            self._servidor.shutdown()
+            self._servidor.server_close()
+            self._servidor = None
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.parar()
+
+    # ---- limites/erros injetados ----
+    def _cabecalhos_limite(self) -> dict:
+        if self.limite is None:
+            return {}
+        return {"X-RateLimit-Limit": str(self.limite),
+                "X-RateLimit-Remaining": str(max(0, self.limite - self._usadas)),
+                "X-RateLimit-Reset": str(int(self._janela_inicio + self.janela))}
+
+    def _falha_injetada(self):
+        """(status, corpo, cabeçalhos) de uma falha simulada, ou None."""
+        with self._lock:
+            self.requisicoes += 1
+            n = self.requisicoes
+            if self.limite is not None:
+                if time.time() >= self._janela_inicio + self.janela:
+                    self._janela_inicio, self._usadas = time.time(), 0
+                if self._usadas >= self.limite:
+                    return 403, {"message": "API rate limit exceeded"}, self._cabecalhos_limite()
+                self._usadas += 1
+            if self.secundario_a_cada and n % self.secundario_a_cada == 0:
+                return 403, {"message": "You have exceeded a secondary rate limit"}, \
+                    {"Retry-After": str(self.retry_after)}
+            if self.taxa_erro and self._rng.random() < self.taxa_erro:
+                return 502, {"message": "Server Error"}, {}
+        return None
+
+
+class _Manipulador(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # cabeçalho e corpo saem em escritas separadas
+    gh: GitHubFalso = None
+
+    def log_message(self, *args):
+        pass
+
+    # ---- utilidades ----
+    def _enviar(self, status: int, corpo=None, cabecalhos: Optional[dict] = None, bruto: Optional[bytes] = None):
+        dados = bruto if bruto is not None else (b"" if corpo is None else json.dumps(corpo).encode("utf-8"))
+        self.send_response(status)
+        for k, v in {**self.gh._cabecalhos_limite(), **(cabecalhos or {})}.items():
+            self.send_header(k, v)
+        self.send_header("Content-Type", "application/octet-stream" if bruto is not None else "application/json")
+        self.send_header("Content-Length", str(len(dados)))
+        self.end_headers()
+        if dados:
+            self.wfile.write(dados)
+
+    def _corpo(self) -> bytes:
+        if "chunked" in (self.headers.get("Transfer-Encoding") or "").lower():
+            partes = []
+            while True:
+                n = int(self.rfile.readline().split(b";")[0].strip() or b"0", 16)
+                if n == 0:
+                    while self.rfile.readline() not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                partes.append(self.rfile.read(n))
+                self.rfile.readline()
+            dados = b"".join(partes)
+        else:
+            n = int(self.headers.get("Content-Length") or 0)
+            dados = self.rfile.read(n) if n else b""
+        if self.headers.get("Content-Encoding") == "gzip":
+            import gzip
+            dados = gzip.decompress(dados)
+        return dados
+
+    def _json(self) -> dict:
+        corpo = self._corpo()
+        return json.loads(corpo) if corpo else {}
+
+    def _despachar(self, metodo: str):
+        gh = self.gh
+        if gh.latencia:
+            time.sleep(gh.latencia)
+        url = urlparse(self.path)
+        prefixo = f"/repos/{gh.owner}/{gh.repo}"
+        if not url.path.startswith(prefixo):
+            self._corpo()
+            return self._enviar(404, {"message": "Not Found"})
+        rota = url.path[len(prefixo):]
+        falha = gh._falha_injetada()
+        if falha:
+            self._corpo()
+            return self._enviar(*falha)
+        for padrao, nome in _ROTAS:
+            m = re.fullmatch(padrao, rota)
+            if m and hasattr(self, f"_{metodo}_{nome}"):
+                with gh._lock:
+                    gh.contagem[f"{metodo} {nome}"] = gh.contagem.get(f"{metodo} {nome}", 0) + 1
+                return getattr(self, f"_{metodo}_{nome}")(unquote(m.group(1)) if m.groups() else None,
+                                                          parse_qs(url.query))
+        self._corpo()
+        return self._enviar(404, {"message": "Not Found"})
+
+    def do_GET(self):
+        self._despachar("get")
+
+    def do_PUT(self):
+        self._despachar("put")
+
+    def do_POST(self):
+        self._despachar("post")
+
+    def do_PATCH(self):
+        self._despachar("patch")
+
+    def do_DELETE(self):
+        self._despachar("delete")
+
+    def _condicional(self, corpo, bruto: Optional[bytes] = None):
+        etag = '"%s"' % hashlib.sha1(bruto if bruto is not None else json.dumps(corpo).encode()).hexdigest()
+        if self.headers.get("If-None-Match") == etag:
+            return self._enviar(304, None, {"ETag": etag})
+        return self._enviar(200, corpo, {"ETag": etag}, bruto=bruto)
+
+    # ---- contents ----
+    def _get_contents(self, caminho, _):
+        gh = self.gh
+        arquivos = gh.arquivos()
+        if caminho in arquivos:
+            sha = arquivos[caminho]
+            conteudo = gh.ler_blob(sha)
+            if "raw" in (self.headers.get("Accept") or ""):
+                return self._condicional(None, bruto=conteudo)
+            grande = len(conteudo) > LIMITE_CONTEUDO_JSON
+            return self._condicional({
+                "name": os.path.basename(caminho), "path": caminho, "sha": sha, "size": len(conteudo),
+                "type": "file", "encoding": "none" if grande else "base64",
+                "content": "" if grande else base64.b64encode(conteudo).decode("ascii"),
+            })
+        prefixo = caminho.rstrip("/") + "/"
+        itens, pastas = [], set()
+        for p, sha in sorted(arquivos.items()):
+            if not p.startswith(prefixo):
+                continue
+            resto = p[len(prefixo):]
+            if "/" in resto:
+                pastas.add(resto.split("/", 1)[0])
+                continue
+            itens.append({"name": resto, "path": p, "sha": sha, "size": os.path.getsize(gh._caminho_blob(sha)),
+                          "type": "file"})
+        itens += [{"name": d, "path": prefixo + d, "sha": None, "size": 0, "type": "dir"} for d in sorted(pastas)]
+        if not itens:
+            return self._enviar(404, {"message": "Not Found"})
+        return self._condicional(itens)
+
+    def _put_contents(self, caminho, _):
+        gh, dados = self.gh, self._json()
+        with gh._lock:
+            arquivos = gh.arquivos()
+            if caminho in arquivos and dados.get("sha") != arquivos[caminho]:
+                return self._enviar(409, {"message": f"{caminho} does not match {dados.get('sha')}"})
+            if caminho not in arquivos and dados.get("sha"):
+                return self._enviar(422, {"message": "sha wasn't supplied correctly"})
+            arquivos[caminho] = gh.gravar_blob(base64.b64decode(dados["content"]))
+            commit = gh._avancar(arquivos, dados.get("message", ""))
+        return self._enviar(201 if "sha" not in dados else 200,
+                            {"content": {"path": caminho, "sha": arquivos[caminho]}, "commit": {"sha": commit}})
+
+    def _delete_contents(self, caminho, _):
+        gh, dados = self.gh, self._json()
+        with gh._lock:
+            arquivos = gh.arquivos()
+            if caminho not in arquivos:
+                return self._enviar(404, {"message": "Not Found"})
+            if dados.get("sha") != arquivos[caminho]:
+                return self._enviar(409, {"message": f"{caminho} does not match {dados.get('sha')}"})
+            del arquivos[caminho]
+            commit = gh._avancar(arquivos, dados.get("message", ""))
+        return self._enviar(200, {"content": None, "commit": {"sha": commit}})
+
+    # ---- git data ----
+    def _post_blobs(self, _, __):
+        dados = self._json()
+        conteudo = dados.get("content", "")
+        bruto = base64.b64decode(conteudo) if dados.get("encoding") == "base64" else conteudo.encode("utf-8")
+        return self._enviar(201, {"sha": self.gh.gravar_blob(bruto)})
+
+    def _get_blob(self, sha, _):
+        conteudo = self.gh.ler_blob(sha)
+        if conteudo is None:
+            return self._enviar(404, {"message": "Not Found"})
+        if "raw" in (self.headers.get("Accept") or ""):
+            return self._enviar(200, bruto=conteudo)
+        return self._enviar(200, {"sha": sha, "size": len(conteudo), "encoding": "base64",
+                                  "content": base64.b64encode(conteudo).decode("ascii")})
+
+    def _post_trees(self, _, __):
+        gh, dados = self.gh, self._json()
+        with gh._lock:
+            base = dados.get("base_tree")
+            if base and base not in gh.arvores:
+                return self._enviar(422, {"message": "base_tree is not a valid tree"})
+            entradas = dict(gh.arvores.get(base, {}))
+            for e in dados.get("tree", []):
+                if e.get("sha") is None:
+                    if e["path"] not in entradas:
+                        return self._enviar(422, {"message": f"path {e['path']} does not exist in base_tree"})
+                    del entradas[e["path"]]
+                elif e["sha"] and gh.ler_blob(e["sha"]) is None:
+                    return self._enviar(422, {"message": f"blob {e['sha']} not found"})
+                else:
+                    entradas[e["path"]] = e["sha"]
+            return self._enviar(201, {"sha": gh._gravar_arvore(entradas)})
+
+    def _post_commits(self, _, __):
+        gh, dados = self.gh, self._json()
+        with gh._lock:
+            if dados.get("tree") not in gh.arvores:
+                return self._enviar(422, {"message": "tree not found"})
+            sha = gh._gravar_commit(dados["tree"], dados.get("parents", []), dados.get("message", ""))
+        return self._enviar(201, {"sha": sha, "tree": {"sha": dados["tree"]}})
+
+    def _get_commit(self, sha, _):
+        c = self.gh.commits.get(sha)
+        if c is None:
+            return self._enviar(404, {"message": "Not Found"})
+        return self._enviar(200, {"sha": sha, "tree": {"sha": c["tree"]},
+                                  "parents": [{"sha": p} for p in c["parents"]], "message": c["message"]})
+
+    def _get_ref(self, branch, _):
+        sha = self.gh.refs.get(branch)
+        if sha is None:
+            return self._enviar(404, {"message": "Not Found"})
+        return self._enviar(200, {"ref": f"refs/heads/{branch}", "object": {"sha": sha, "type": "commit"}})
+
+    def _patch_ref(self, branch, _):
+        gh, dados = self.gh, self._json()
+        with gh._lock:
+            atual = gh.refs.get(branch)
+            novo = gh.commits.get(dados.get("sha"))
+            if atual is None or novo is None:
+                return self._enviar(422, {"message": "Reference does not exist"})
+            if not dados.get("force") and atual not in novo["parents"]:
+                return self._enviar(422, {"message": "Update is not a fast forward"})
+            gh.refs[branch] = dados["sha"]
+        return self._enviar(200, {"ref": f"refs/heads/{branch}", "object": {"sha": dados["sha"], "type": "commit"}})
+
+
+_ROTAS = [
+    (r"/contents/(.+)", "contents"),
+    (r"/git/blobs", "blobs"),
+    (r"/git/blobs/([0-9a-f]+)", "blob"),
+    (r"/git/trees", "trees"),
+    (r"/git/commits", "commits"),
+    (r"/git/commits/([0-9a-f]+)", "commit"),
+    (r"/git/ref/heads/(.+)", "ref"),
+    (r"/git/refs/heads/(.+)", "ref"),
+]
@@ -0,0 +1,7 @@
+# gpa/__main__.py — python -m gpa (ver gpa/cli.py)
+import sys
+
+from gpa.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+# gpa/agregados.py — Agregados de GPA/Média por Série/Turma/Disciplina/Trimestre (soma, contagem, mín., máx.)
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+DIMENSOES_AGREGADO = ["Serie", "Turma", "Disciplina", "Trimestre"]
+METRICAS_AGREGADO = ["GPA", "Media"]
+
+
+def _colunas_metrica(metrica: str) -> List[str]:
+    return [f"{metrica}_soma", f"{metrica}_n", f"{metrica}_min", f"{metrica}_max"]
+
+
+def _validar_grao(grao: Sequence[str]) -> List[str]:
+    grao = list(grao)
+    invalidas = [c for c in grao if c not in DIMENSOES_AGREGADO]
+    if invalidas or not grao:
+        raise ValueError(f"Grão inválido: {grao} (dimensões: {DIMENSOES_AGREGADO})")
+    return grao
+
+
+def _chave(df: pd.DataFrame, coluna: str) -> pd.Series:
+    """Dimensão como objeto (texto) ou Int64 (Trimestre); ausentes viram None/NA."""
+    if coluna not in df.columns:
+        return pd.Series(pd.NA, index=df.index, dtype="Int64" if coluna == "Trimestre" else object)
+    if coluna == "Trimestre":
+        return pd.to_numeric(df[coluna], errors="coerce").round().astype("Int64")
+    s = df[coluna].astype(object)
+    return s.where(s.notna(), None)
+
+
+def _com_medias(agg: pd.DataFrame) -> pd.DataFrame:
+    for m in METRICAS_AGREGADO:
+        n = agg[f"{m}_n"]
+        agg[f"{m}_media"] = (agg[f"{m}_soma"] / n.where(n > 0)).astype("float64")
+    return agg
+
+
+def _vazio(grao: Sequence[str]) -> pd.DataFrame:
+    cols = {c: pd.Series(dtype="Int64" if c == "Trimestre" else object) for c in grao}
+    for m in METRICAS_AGREGADO:
+        cols.update({f"{m}_soma": pd.Series(dtype="float64"), f"{m}_n": pd.Series(dtype="int64"),
+                     f"{m}_min": pd.Series(dtype="float64"), f"{m}_max": pd.Series(dtype="float64")})
+    return _com_medias(pd.DataFrame(cols))
+
+
+def eh_agregado(df: pd.DataFrame) -> bool:
+    return all(c in df.columns for m in METRICAS_AGREGADO for c in _colunas_metrica(m))
+
+
+def agregar_linhas(df: pd.DataFrame, grao: Sequence[str] = DIMENSOES_AGREGADO) -> pd.DataFrame:
+    """Linhas de estudantes → agregado no grão pedido (ausentes nas dimensões formam grupo próprio)."""
+    grao = _validar_grao(grao)
+    if df is None or df.empty:
+        return _vazio(grao)
+    base = pd.DataFrame({c: _chave(df, c) for c in grao})
+    for m in METRICAS_AGREGADO:
+        valores = pd.to_numeric(df[m], errors="coerce") if m in df.columns else pd.Series(np.nan, index=df.index)
+        base[m] = valores.astype("float64")
+    g = base.groupby(grao, dropna=False, sort=True)
+    partes = {}
+    for m in METRICAS_AGREGADO:
+        partes.update({f"{m}_soma": g[m].sum(), f"{m}_n": g[m].count(),
+                       f"{m}_min": g[m].min(), f"{m}_max": g[m].max()})
+    return _com_medias(pd.DataFrame(partes).reset_index())
+
+
+def reagregar(agregado: pd.DataFrame, grao: Sequence[str]) -> pd.DataFrame:
+    """Agregado (grão igual ou mais fino) → grão pedido: soma das somas/contagens, mín. dos mínimos, máx. dos máximos."""
+    grao = _validar_grao(grao)
+    if agregado is None or agregado.empty:
+        return _vazio(grao)
+    g = agregado.groupby(grao, dropna=False, sort=True)
+    partes = {}
+    for m in METRICAS_AGREGADO:
+        partes.update({f"{m}_soma": g[f"{m}_soma"].sum(), f"{m}_n": g[f"{m}_n"].sum(),
+                       f"{m}_min": g[f"{m}_min"].min(), f"{m}_max": g[f"{m}_max"].max()})
+    return _com_medias(pd.DataFrame(partes).reset_index())
+
+
+def filtrar_agregados(agregado: pd.DataFrame, **selecoes) -> pd.DataFrame:
+    """filtrar_agregados(agg, Serie=[...], Turma=[...]) — seleção vazia ou None não restringe."""
+    mascara = np.ones(len(agregado), dtype=bool)
+    for coluna, valores in selecoes.items():
+        if valores and coluna in agregado.columns:
+            if coluna == "Trimestre":
+                valores = [int(v) for v in valores]
+            mascara &= agregado[coluna].isin(list(valores)).to_numpy(dtype=bool, na_value=False)
+    return agregado[mascara]
+
+
+def _rotulos(df: pd.DataFrame) -> pd.Series:
+    """Chave hashável por linha no grão fino (None no lugar de NaN/NA)."""
+    cols = [df[c].astype(object).where(df[c].notna(), None) for c in DIMENSOES_AGREGADO]
+    return pd.Series(list(zip(*cols)), index=df.index, dtype=object)
+
+
+def _concat(frames: List[pd.DataFrame]) -> Optional[pd.DataFrame]:
+    frames = [f for f in frames if not f.empty]
+    return pd.concat(frames, ignore_index=True) if frames else None
+
+
+class AgregadosGPA:
+    """
+    Agregados mantidos arquivo a arquivo: cada processado contribui com um parcial no grão fino
+    (Serie × Turma × Disciplina × Trimestre). atualizar() recebe um lote de inclusões/substituições e
+    remoções e reagrega uma única vez: as linhas do grão fino que o lote não toca ficam como estão, os
+    grupos tocados são refeitos a partir dos parciais. tabela(grao) reagrega o grão fino (com cache).
+    Vive só em memória (ex.: no CarregadorProcessados): num processo novo é refeito a partir dos arquivos.
+    """
+
+    def __init__(self):
+        self._parciais: Dict[str, pd.DataFrame] = {}
+        self._fino = _vazio(DIMENSOES_AGREGADO)
+        self._cache: Dict[tuple, pd.DataFrame] = {}
+        self.versao = 0
+
+    def __len__(self) -> int:
+        return len(self._parciais)
+
+    def adicionar(self, chave: str, df: pd.DataFrame) -> None:
+        """Inclui (ou substitui) o parcial do arquivo 'chave' a partir das suas linhas."""
+        self.atualizar({chave: df})
+
+    def remover(self, chave: str) -> None:
+        self.atualizar(removidos=[chave])
+
+    def atualizar(self, adicionados: Optional[Dict[str, pd.DataFrame]] = None,
+                  removidos: Sequence[str] = ()) -> None:
+        """Aplica um lote de arquivos incluídos/substituídos (chave → linhas) e removidos com uma reagregação."""
+        novos = {chave: agregar_linhas(df) for chave, df in (adicionados or {}).items()}
+        saem = [c for c in dict.fromkeys(list(removidos) + list(novos)) if c in self._parciais]
+        if not novos and not saem:
+            return
+        if saem:
+            # Grupos que os parciais de saída tocavam: refeitos a partir dos parciais que ficam
+            afetados = set().union(*(_rotulos(self._parciais[c]) for c in saem))
+            for c in saem:
+                del self._parciais[c]
+            mantidos = self._fino[~_rotulos(self._fino).isin(afetados)] if not self._fino.empty else self._fino
+            recalculados = [p[_rotulos(p).isin(afetados)] for p in self._parciais.values() if not p.empty]
+            frames = [mantidos] + recalculados
+        else:
+            frames = [self._fino]
+        self._parciais.update(novos)
+        todos = _concat(frames + list(novos.values()))
+        self._fino = reagregar(todos, DIMENSOES_AGREGADO) if todos is not None else _vazio(DIMENSOES_AGREGADO)
+        self._cache.clear()
+        self.versao += 1
+
+    def tabela(self, grao: Sequence[str] = DIMENSOES_AGREGADO) -> pd.DataFrame:
+        """Agregado no grão pedido (qualquer combinação de DIMENSOES_AGREGADO). Não altere o retorno."""
+        grao = _validar_grao(grao)
+        chave = tuple(grao)
+        if chave not in self._cache:
+            self._cache[chave] = self._fino if grao == DIMENSOES_AGREGADO else reagregar(self._fino, grao)
+        return self._cache[chave]
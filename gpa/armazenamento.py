@@ -0,0 +1,209 @@
+# gpa/armazenamento.py — Armazenamento colunar (Parquet) particionado por Serie/Turma/Trimestre
+# Layout (hive): <raiz>/Serie=<v>/Turma=<v>/Trimestre=<v>/processado_<nome>_<ts>.parquet
+# Uso (migração dos CSVs existentes): python -m gpa.armazenamento migrar [--origem ./data] [--destino ./data/parquet]
+import os
+import argparse
+import time
+from typing import List, Optional, Sequence
+from urllib.parse import quote, unquote
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except Exception:
+    pa = None
+    ds = None
+    pq = None
+
+from gpa.config import DIRETORIO_DADOS_PADRAO
+from gpa.dados import ler_processado, tipar_dataset
+
+FORMATO_CSV = "csv"
+FORMATO_PARQUET = "parquet"
+SUBDIRETORIO_PARQUET = "parquet"
+
+COLUNAS_PARTICAO = ["Serie", "Turma", "Trimestre"]
+_NULO_PARTICAO = "__HIVE_DEFAULT_PARTITION__"
+
+# Esquema tipado do resultado de aplicar_mapeamento_gpa (+ Serie)
+_COLUNAS_TEXTO = ["Estudante", "Turma", "Disciplina", "Serie"]
+_COLUNAS_NUMERICAS = ["P1", "Conclusiva", "Media", "MediaPadronizada", "GPA"]
+
+
+def parquet_disponivel() -> bool:
+    return pq is not None
+
+
+def raiz_parquet(diretorio_dados: str = DIRETORIO_DADOS_PADRAO) -> str:
+    return os.path.join(diretorio_dados, SUBDIRETORIO_PARQUET)
+
+
+def _exigir_pyarrow():
+    if pq is None:
+        raise RuntimeError("pyarrow não está instalado — armazenamento Parquet indisponível.")
+
+
+def _particionamento():
+    return ds.partitioning(
+        pa.schema([("Serie", pa.string()), ("Turma", pa.string()), ("Trimestre", pa.int64())]),
+        flavor="hive",
+    )
+
+
+def _tipar(df: pd.DataFrame) -> pd.DataFrame:
+    """Textos como string, Trimestre inteiro (anulável), notas/GPA float64."""
+    out = df.copy()
+    for c in _COLUNAS_TEXTO:
+        if c in out.columns:
+            out[c] = out[c].astype("string")
+    for c in _COLUNAS_NUMERICAS:
+        if c in out.columns:
+            out[c] = pd.to_numeric(out[c], errors="coerce").astype("float64")
+    if "Trimestre" in out.columns:
+        out["Trimestre"] = pd.to_numeric(out["Trimestre"], errors="coerce").astype("Int64")
+    return out
+
+
+def _segmento(coluna: str, valor) -> str:
+    if valor is None or pd.isna(valor) or str(valor).strip() == "":
+        return f"{coluna}={_NULO_PARTICAO}"
+    if coluna == "Trimestre":
+        valor = int(valor)
+    return f"{coluna}={quote(str(valor), safe='')}"
+
+
+def salvar_processado_parquet(df: pd.DataFrame, raiz: str, nome_base: str) -> List[str]:
+    """
+    Grava o DataFrame processado em uma partição por (Serie, Turma, Trimestre).
+    As colunas de partição ficam só no caminho. Retorna os caminhos gravados.
+    """
+    _exigir_pyarrow()
+    tipado = _tipar(df)
+    for c in COLUNAS_PARTICAO:
+        if c not in tipado.columns:
+            tipado[c] = pd.NA
+    caminhos = []
+    for chave, grupo in tipado.groupby(COLUNAS_PARTICAO, dropna=False, sort=True):
+        pasta = os.path.join(raiz, *(_segmento(c, v) for c, v in zip(COLUNAS_PARTICAO, chave)))
+        os.makedirs(pasta, exist_ok=True)
+        caminho = os.path.join(pasta, f"{nome_base}.parquet")
+        tabela = pa.Table.from_pandas(grupo.drop(columns=COLUNAS_PARTICAO), preserve_index=False)
+        pq.write_table(tabela, caminho, compression="zstd")
+        caminhos.append(caminho)
+    return caminhos
+
+
+def listar_particoes(raiz: str) -> pd.DataFrame:
+    """Combinações (Serie, Turma, Trimestre) existentes, lidas só dos nomes das pastas."""
+    linhas = []
+    if os.path.isdir(raiz):
+        for pasta, _, arquivos in os.walk(raiz):
+            if not any(a.endswith(".parquet") for a in arquivos):
+                continue
+            partes = dict(
+                seg.split("=", 1) for seg in os.path.relpath(pasta, raiz).split(os.sep) if "=" in seg
+            )
+            valores = {c: (None if partes.get(c) in (None, _NULO_PARTICAO) else unquote(partes[c]))
+                       for c in COLUNAS_PARTICAO}
+            linhas.append(valores)
+    out = pd.DataFrame(linhas, columns=COLUNAS_PARTICAO).drop_duplicates()
+    out["Serie"] = out["Serie"].fillna("")
+    out["Trimestre"] = pd.to_numeric(out["Trimestre"], errors="coerce").astype("Int64")
+    return out.reset_index(drop=True)
+
+
+def versao_parquet(raiz: str) -> tuple:
+    """Ficha barata do dataset (nº de arquivos, maior mtime, bytes): muda quando algo é gravado/excluído."""
+    n, mtime, tamanho = 0, 0, 0
+    if os.path.isdir(raiz):
+        for pasta, _, arquivos in os.walk(raiz):
+            for a in arquivos:
+                if a.endswith(".parquet"):
+                    st_ = os.stat(os.path.join(pasta, a))
+                    n, mtime, tamanho = n + 1, max(mtime, st_.st_mtime_ns), tamanho + st_.st_size
+    return n, mtime, tamanho
+
+
+def carregar_processados_parquet(
+    raiz: str,
+    series: Optional[Sequence[str]] = None,
+    turmas: Optional[Sequence[str]] = None,
+    trimestres: Optional[Sequence[int]] = None,
+    colunas: Optional[Sequence[str]] = None,
+) -> pd.DataFrame:
+    """
+    Lê o dataset particionado aplicando os filtros nas partições (só as pastas selecionadas são abertas)
+    e projetando apenas 'colunas' (None = todas). Filtros None ou vazios não restringem. Sai tipado (tipar_dataset).
+    """
+    _exigir_pyarrow()
+    if not os.path.isdir(raiz):
+        return pd.DataFrame()
+    dataset = ds.dataset(raiz, format="parquet", partitioning=_particionamento())
+    if not dataset.files:
+        return pd.DataFrame()
+
+    filtro = None
+    for campo, valores in (("Serie", series), ("Turma", turmas), ("Trimestre", trimestres)):
+        # Como no modo CSV, seleção None ou vazia não restringe a coluna
+        valores = [v for v in (valores or ()) if v is not None and not (isinstance(v, float) and np.isnan(v))]
+        if not valores:
+            continue
+        if campo == "Trimestre":
+            valores = [int(v) for v in valores]
+        expr = ds.field(campo).isin(valores)
+        if campo == "Serie" and "" in valores:
+            expr = expr | ds.field(campo).is_null()
+        filtro = expr if filtro is None else (filtro & expr)
+
+    if colunas is not None:
+        colunas = [c for c in colunas if c in dataset.schema.names]
+    out = dataset.to_table(columns=colunas, filter=filtro).to_pandas()
+    if "Serie" in out.columns:
+        out["Serie"] = out["Serie"].fillna("")
+    return tipar_dataset(out)
+
+
+def migrar_csvs_para_parquet(origem: str, destino: Optional[str] = None, log=print) -> int:
+    """
+    Converte os processado_*.csv de 'origem' para o layout particionado. Retorna quantos foram convertidos.
+    Cada CSV passa pela mesma leitura do modo CSV (ler_processado: mojibake, Série derivada da Turma),
+    então partições e textos saem iguais ao que o dashboard mostraria lendo os CSVs.
+    """
+    _exigir_pyarrow()
+    destino = destino or raiz_parquet(origem)
+    nomes = sorted(
+        n for n in os.listdir(origem)
+        if n.startswith("processado_") and n.endswith(".csv") and os.path.isfile(os.path.join(origem, n))
+    ) if os.path.isdir(origem) else []
+    convertidos = 0
+    for nome in nomes:
+        try:
+            df = ler_processado(os.path.join(origem, nome))
+            caminhos = salvar_processado_parquet(df, destino, os.path.splitext(nome)[0])
+            convertidos += 1
+            log(f"{nome}: {len(df)} linha(s) → {len(caminhos)} partição(ões)")
+        except Exception as e:
+            log(f"{nome}: falha na conversão ({e})")
+    return convertidos
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m gpa.armazenamento", description="Armazenamento Parquet do gpa")
+    sub = ap.add_subparsers(dest="comando", required=True)
+    mig = sub.add_parser("migrar", help="converte processado_*.csv em Parquet particionado")
+    mig.add_argument("--origem", default=DIRETORIO_DADOS_PADRAO)
+    mig.add_argument("--destino", default=None, help="padrão: <origem>/parquet")
+    args = ap.parse_args(argv)
+
+    if args.comando == "migrar":
+        t0 = time.perf_counter()
+        n = migrar_csvs_para_parquet(args.origem, args.destino)
+        print(f"{n} arquivo(s) convertido(s) em {time.perf_counter() - t0:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
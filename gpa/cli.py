@@ -0,0 +1,295 @@
+# gpa/cli.py — Linha de comando (python -m gpa): ingestão em lote, sincronização e compactação de ./data, sem Streamlit
+# Os módulos pesados (pandas, pyarrow, requests) só são importados pelo subcomando que precisa deles,
+# para que 'python -m gpa --help' e erros de argumento respondam na hora (cron, scripts).
+import argparse
+import os
+import sys
+import time
+from typing import List, Optional
+
+from gpa.config import (
+    DIRETORIO_DADOS_PADRAO,
+    ESQUEMA_PADRAO,
+    ROTULOS_PADRAO_CONCLUSIVA,
+    ROTULOS_PADRAO_P1,
+)
+
+EXTENSOES_EXPORT = (".csv", ".xlsx", ".xls")
+
+
+class _Cronometro:
+    """Tempo de cada etapa do comando, impresso no fim."""
+
+    def __init__(self):
+        self.etapas = []
+        self._t0 = time.perf_counter()
+
+    def medir(self, nome: str, func, *args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.etapas.append((nome, time.perf_counter() - t0))
+
+    def imprimir(self) -> None:
+        print("\nTempos:")
+        for nome, s in self.etapas:
+            print(f"  {nome:<14} {s:8.2f} s")
+        print(f"  {'total':<14} {time.perf_counter() - self._t0:8.2f} s")
+
+
+def _listar_entradas(entradas: List[str]) -> List[str]:
+    arquivos = []
+    for e in entradas:
+        if os.path.isdir(e):
+            arquivos += sorted(os.path.join(e, f) for f in os.listdir(e)
+                               if f.lower().endswith(EXTENSOES_EXPORT) and os.path.isfile(os.path.join(e, f)))
+        elif os.path.isfile(e):
+            arquivos.append(e)
+        else:
+            print(f"Ignorado (não encontrado): {e}", file=sys.stderr)
+    return arquivos
+
+
+def _rotulos(texto: str) -> tuple:
+    return tuple(s.strip() for s in texto.split(",") if s.strip())
+
+
+def _caminho_repo(caminho: str, args) -> str:
+    """Caminho no repositório: o mesmo relativo a --dados, sob --remoto."""
+    rel = os.path.relpath(caminho, start=args.dados).replace("\\", "/")
+    return f"{args.remoto.strip('/')}/{rel}"
+
+
+def _exigir_github() -> bool:
+    from gpa.github_api import gh_credentials_ok, gh_credentials_summary
+
+    ok, msg = gh_credentials_ok()
+    if not ok:
+        print(f"Credenciais do GitHub ausentes/incompletas: {msg}", file=sys.stderr)
+        return False
+    print(f"GitHub: {gh_credentials_summary()}")
+    return True
+
+
+# -------- Subcomandos --------
+def cmd_ingerir(args, cron: _Cronometro) -> int:
+    arquivos = _listar_entradas(args.entradas)
+    if not arquivos:
+        print("Nenhum export (CSV/XLSX) encontrado.")
+        return 0
+
+    from gpa.config import tabela_gpa_padrao
+    from gpa.ingestao import ParametrosIngestao, processar_lote, trabalhadores_disponiveis
+    from gpa.io import garantir_diretorio
+    from gpa.processamento import compilar_mapeamento_gpa
+
+    if args.tabela_gpa:
+        import pandas as pd
+        tabela = pd.read_csv(args.tabela_gpa)
+    else:
+        tabela = tabela_gpa_padrao()
+    mapa = compilar_mapeamento_gpa(tabela, politica_lacunas=args.lacunas)
+    for aviso in mapa.avisos():
+        print(f"Tabela GPA: {aviso}")
+
+    garantir_diretorio(args.dados)
+    params = ParametrosIngestao(
+        coluna_nome=args.coluna_nome,
+        coluna_turma=args.coluna_turma,
+        coluna_disc=args.coluna_disciplina,
+        coluna_avaliacao=args.coluna_avaliacao,
+        coluna_nota=args.coluna_nota,
+        rotulos_p1=_rotulos(args.rotulos_p1),
+        rotulos_conclusiva=_rotulos(args.rotulos_conclusiva),
+        trimestre_constante=args.trimestre,
+        mapa_gpa=mapa,
+        escala=args.escala,
+        diretorio_saida=args.dados,
+        formato=args.formato,
+        diagnostico=args.diagnostico,
+        diagnostico_memoria=args.diagnostico,
+    )
+
+    def itens():
+        for caminho in arquivos:
+            with open(caminho, "rb") as fh:
+                yield os.path.basename(caminho), fh.read(), None
+
+    n_trab = min(args.trabalhadores or trabalhadores_disponiveis(), len(arquivos))
+    print(f"Processando {len(arquivos)} arquivo(s) com {n_trab} processo(s)...")
+    por_nome = {os.path.basename(c): c for c in arquivos}
+    resultados = []
+
+    def processar():
+        for res in processar_lote(itens(), params, max_trabalhadores=n_trab):
+            resultados.append(res)
+            if res["ok"]:
+                print(f"  ok    {res['nome']} → {', '.join(res['caminhos'])} ({res['linhas']} linhas)")
+            else:
+                print(f"  falha {res['nome']}: {res['erro']}", file=sys.stderr)
+
+    cron.medir("ingestão", processar)
+    ok = [r for r in resultados if r["ok"]]
+    falhas = len(resultados) - len(ok)
+
+    if args.diagnostico:
+        from gpa.diagnostico import gravar_jsonl, resumo
+        registros = [e for r in resultados for e in r["etapas"]]
+        caminho = gravar_jsonl(registros, args.dados, execucao=time.strftime("%Y%m%d-%H%M%S"), origem="cli")
+        print(resumo(registros).to_string(index=False))
+        print(f"Diagnóstico acrescentado a {caminho}")
+
+    if args.github and ok:
+        if not _exigir_github():
+            return 1
+        from gpa.github_api import gh_commit_batch
+        envios = [(c, _caminho_repo(c, args)) for r in ok for c in r["caminhos"]]
+        sucesso, msg = cron.medir("envio GitHub", gh_commit_batch, envios,
+                                  message=f"feat: adiciona {len(envios)} arquivo(s) processado(s) via cli")
+        print(f"GitHub: {'commit ' + msg[:7] if sucesso else 'falha — ' + msg}")
+        falhas += 0 if sucesso else 1
+
+    if args.arquivar:
+        os.makedirs(args.arquivar, exist_ok=True)
+        for r in ok:
+            origem = por_nome.get(r["nome"])
+            if origem:
+                os.replace(origem, os.path.join(args.arquivar, os.path.basename(origem)))
+        print(f"{len(ok)} export(s) movido(s) para {args.arquivar}")
+
+    print(f"{len(ok)} arquivo(s) processado(s), {falhas} falha(s).")
+    return 1 if falhas else 0
+
+
+def cmd_sincronizar(args, cron: _Cronometro) -> int:
+    if not _exigir_github():
+        return 1
+    from gpa.github_api import gh_download_file_to_local, gh_list_dir
+    from gpa.sincronizacao import planejar_sincronizacao, resumo_plano, sincronizar
+
+    ok, itens = cron.medir("listagem", gh_list_dir, args.remoto)
+    if not ok:
+        print(f"Falha ao listar {args.remoto}: {itens}", file=sys.stderr)
+        return 1
+    plano = cron.medir("plano", planejar_sincronizacao, itens, args.dados)
+    r = resumo_plano(plano)
+    prefixo = "[simulação] " if args.simular else ""
+    print(f"{prefixo}{r['novos']} novo(s), {r['alterados']} alterado(s), {r['iguais']} igual(is); "
+          f"{r['bytes_a_baixar'] / 1e6:.2f} MB a baixar")
+    if args.simular:
+        return 0
+    res = cron.medir("download", sincronizar, plano, gh_download_file_to_local, args.downloads)
+    for nome, msg in res["falhas"]:
+        print(f"  falha {nome}: {msg}", file=sys.stderr)
+    print(f"{res['baixados']} baixado(s), {len(res['falhas'])} falha(s).")
+    return 1 if res["falhas"] else 0
+
+
+def cmd_compactar(args, cron: _Cronometro) -> int:
+    from gpa.compactacao import compactar_processados, espelhar_no_github, resumo_compactacao
+
+    relatorio = cron.medir("compactação", compactar_processados, args.dados, simular=args.simular)
+    for r in relatorio:
+        print(f"  {r['grupo']}: {len(r['removidos']) + 1} versões → {os.path.basename(r['mantido'])} "
+              f"({r['linhas_antes']} → {r['linhas_depois']} linhas)")
+    res = resumo_compactacao(relatorio)
+    prefixo = "[simulação] " if args.simular else ""
+    print(f"{prefixo}{res['grupos']} grupo(s), {res['arquivos_removidos']} arquivo(s) removido(s), "
+          f"{res['bytes_recuperados']} bytes recuperados")
+    if args.github and not args.simular and relatorio:
+        if not _exigir_github():
+            return 1
+        from gpa.github_api import gh_commit_batch
+        enviados, excluidos = cron.medir("espelho GitHub", espelhar_no_github, relatorio, gh_commit_batch,
+                                         caminho_repo=lambda c: _caminho_repo(c, args))
+        print(f"GitHub: {enviados} enviado(s), {excluidos} excluído(s)")
+    return 0
+
+
+def cmd_noturno(args, cron: _Cronometro) -> int:
+    """Sincroniza (se --github), ingere as entradas e compacta — a rotina do cron."""
+    codigo = 0
+    if args.github:
+        codigo |= cmd_sincronizar(args, cron)
+    codigo |= cmd_ingerir(args, cron)
+    codigo |= cmd_compactar(args, cron)
+    return codigo
+
+
+# -------- Argumentos --------
+def _args_dados(p: argparse.ArgumentParser) -> None:
+    p.add_argument("--dados", default=DIRETORIO_DADOS_PADRAO, help="pasta dos processados (padrão: ./data)")
+    p.add_argument("--remoto", default="data", help="pasta correspondente no repositório GitHub (padrão: data)")
+    p.add_argument("--credenciais", default=None,
+                   help="TOML com GITHUB_TOKEN, REPO_OWNER, REPO_NAME, DEFAULT_BRANCH (padrão: variáveis de "
+                        "ambiente, $GPA_CREDENCIAIS ou .streamlit/secrets.toml)")
+
+
+def _args_ingestao(p: argparse.ArgumentParser) -> None:
+    p.add_argument("entradas", nargs="+", help="pastas e/ou arquivos de export (CSV/XLSX)")
+    p.add_argument("--formato", default="csv", choices=["csv", "parquet"])
+    p.add_argument("--trimestre", type=int, default=1, choices=[1, 2, 3],
+                   help="usado quando nem o conteúdo nem o nome do arquivo indicam o trimestre")
+    p.add_argument("--escala", default="auto", choices=["auto", "0-10", "0-100"])
+    p.add_argument("--tabela-gpa", default=None, help="CSV com colunas min,max,gpa (padrão: tabela do app)")
+    p.add_argument("--lacunas", default="inferior", choices=["inferior", "nan"],
+                   help="médias entre faixas: faixa inferior ou sem GPA")
+    p.add_argument("--coluna-nome", default=ESQUEMA_PADRAO["student"])
+    p.add_argument("--coluna-turma", default=ESQUEMA_PADRAO["turma"])
+    p.add_argument("--coluna-disciplina", default=ESQUEMA_PADRAO["discipline"])
+    p.add_argument("--coluna-avaliacao", default=ESQUEMA_PADRAO["assessment"])
+    p.add_argument("--coluna-nota", default=ESQUEMA_PADRAO["grade"])
+    p.add_argument("--rotulos-p1", default=", ".join(ROTULOS_PADRAO_P1))
+    p.add_argument("--rotulos-conclusiva", default=", ".join(ROTULOS_PADRAO_CONCLUSIVA))
+    p.add_argument("--trabalhadores", type=int, default=None, help="processos de ingestão (padrão: núcleos)")
+    p.add_argument("--arquivar", default=None, help="move os exports processados com sucesso para esta pasta")
+    p.add_argument("--diagnostico", action="store_true",
+                   help="mede as etapas (tempo/linhas/memória) e acrescenta a <dados>/diagnostico.jsonl")
+
+
+def criar_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(prog="python -m gpa",
+                                 description="Conversor de Notas → GPA em lote (sem Streamlit)")
+    sub = ap.add_subparsers(dest="comando", required=True)
+
+    ing = sub.add_parser("ingerir", help="processa exports e grava os processados")
+    _args_ingestao(ing)
+    _args_dados(ing)
+    ing.add_argument("--github", action="store_true", help="envia os processados ao GitHub em um commit")
+
+    sin = sub.add_parser("sincronizar", help="baixa do GitHub os processados novos ou alterados")
+    _args_dados(sin)
+    sin.add_argument("--simular", action="store_true")
+    sin.add_argument("--downloads", type=int, default=8, help="downloads simultâneos")
+
+    comp = sub.add_parser("compactar", help="consolida versões reenviadas (última vence)")
+    _args_dados(comp)
+    comp.add_argument("--simular", action="store_true")
+    comp.add_argument("--github", action="store_true", help="replica a compactação no GitHub")
+
+    noturno = sub.add_parser("noturno", help="sincronizar (com --github) → ingerir → compactar")
+    _args_ingestao(noturno)
+    _args_dados(noturno)
+    noturno.add_argument("--github", action="store_true", help="sincroniza antes e envia/replica no GitHub")
+    noturno.add_argument("--downloads", type=int, default=8)
+    noturno.set_defaults(simular=False)
+    return ap
+
+
+_COMANDOS = {"ingerir": cmd_ingerir, "sincronizar": cmd_sincronizar, "compactar": cmd_compactar,
+             "noturno": cmd_noturno}
+
+
+def main(argv: Optional[list] = None) -> int:
+    args = criar_parser().parse_args(argv)
+    if args.credenciais:
+        os.environ["GPA_CREDENCIAIS"] = args.credenciais  # lido por gpa.github_api, se e quando for importado
+    cron = _Cronometro()
+    try:
+        codigo = _COMANDOS[args.comando](args, cron)
+    except KeyboardInterrupt:
+        print("Interrompido.", file=sys.stderr)
+        return 130
+    cron.imprimir()
+    return codigo
@@ -0,0 +1,180 @@
+# gpa/compactacao.py — Compactação "última versão vence" de processado_*.csv reenviados
+# Uso: python -m gpa.compactacao [--pasta ./data] [--simular] [--github]
+import os
+import re
+import argparse
+import time
+from typing import List, Optional
+
+import pandas as pd
+
+from gpa.config import DIRETORIO_DADOS_PADRAO
+from gpa.dados import listar_processados_locais
+
+CHAVE_REGISTRO = ["Estudante", "Disciplina", "Trimestre"]
+_RE_NOME = re.compile(r"^processado_(?P<origem>.*)_(?P<ts>\d{8}-\d{6})\.csv$")
+
+
+def origem_e_timestamp(caminho: str) -> tuple:
+    """('8º A - I TRIMESTRE', '20250925-185308') a partir de processado_<origem>_<ts>.csv; ts '' se ausente."""
+    nome = os.path.basename(caminho)
+    m = _RE_NOME.match(nome)
+    if m:
+        return m.group("origem"), m.group("ts")
+    return os.path.splitext(nome)[0][len("processado_"):], ""
+
+
+def _valor_dominante(df: pd.DataFrame, coluna: str):
+    if coluna not in df.columns:
+        return None
+    s = df[coluna].dropna()
+    return None if s.empty else s.mode().iloc[0]
+
+
+def _chave_logica(caminho: str, df: pd.DataFrame) -> tuple:
+    origem, _ = origem_e_timestamp(caminho)
+    return (
+        _valor_dominante(df, "Serie"),
+        _valor_dominante(df, "Turma"),
+        _valor_dominante(df, "Trimestre"),
+        origem,
+    )
+
+
+def _chaves(df: pd.DataFrame, colunas: List[str]) -> pd.Series:
+    """Chave hashável por linha (None no lugar de NaN, para casar ausentes entre arquivos)."""
+    cols = df.reindex(columns=colunas).astype(object)
+    return pd.Series(list(zip(*(cols[c].where(cols[c].notna(), None) for c in colunas))), index=df.index, dtype=object)
+
+
+def _sem_chaves_mais_novas(frames: List[pd.DataFrame], colunas: List[str]) -> List[pd.DataFrame]:
+    """
+    frames do mais antigo ao mais novo → o mais novo inteiro e, dos anteriores, só as linhas cuja chave
+    não aparece em nenhuma versão mais nova (chaves repetidas dentro de um mesmo arquivo ficam como estão).
+    """
+    vistas, saida = set(), []
+    for df in reversed(frames):
+        chaves = _chaves(df, colunas)
+        saida.append(df[~chaves.isin(vistas)] if vistas else df)
+        vistas.update(chaves)
+    return saida[::-1]
+
+
+def compactar_processados(pasta: str, simular: bool = False) -> List[dict]:
+    """
+    Agrupa os processados por (Serie, Turma, Trimestre, nome de origem) e, em grupos com mais de uma
+    versão, mantém o arquivo mais novo inteiro e, das versões anteriores, só as linhas cuja chave
+    (Estudante, Disciplina, Trimestre) não aparece numa versão mais nova.
+    O consolidado sobrescreve o arquivo mais novo do grupo; os demais são removidos.
+    Com simular=True nada é gravado. Retorna um relatório por grupo compactado:
+      {'grupo', 'mantido', 'removidos', 'linhas_antes', 'linhas_depois', 'bytes_antes', 'bytes_depois'}
+    """
+    grupos = {}
+    for caminho in listar_processados_locais(pasta):
+        try:
+            df = pd.read_csv(caminho)
+        except Exception:
+            continue  # ilegível: fica de fora da compactação
+        _, ts = origem_e_timestamp(caminho)
+        versao = (ts, os.path.getmtime(caminho), caminho)
+        grupos.setdefault(_chave_logica(caminho, df), []).append((versao, caminho, df))
+
+    relatorio = []
+    for chave, versoes in grupos.items():
+        if len(versoes) < 2:
+            continue
+        versoes.sort(key=lambda v: v[0])  # mais antiga → mais nova
+        caminhos = [c for _, c, _ in versoes]
+        mantido = caminhos[-1]
+
+        frames = [df for _, _, df in versoes]
+        todas = pd.concat(frames, ignore_index=True)
+        chave_reg = [c for c in CHAVE_REGISTRO if c in todas.columns] or list(todas.columns)
+        consolidado = pd.concat(_sem_chaves_mais_novas(frames, chave_reg), ignore_index=True)
+        bytes_antes = sum(os.path.getsize(c) for c in caminhos)
+
+        if simular:
+            bytes_depois = len(consolidado.to_csv(index=False).encode("utf-8-sig"))
+        else:
+            tmp = mantido + ".tmp"
+            consolidado.to_csv(tmp, index=False, encoding="utf-8-sig")
+            os.replace(tmp, mantido)
+            for c in caminhos[:-1]:
+                os.remove(c)
+            bytes_depois = os.path.getsize(mantido)
+
+        relatorio.append({
+            "grupo": " / ".join("" if v is None else str(v) for v in chave),
+            "mantido": mantido,
+            "removidos": caminhos[:-1],
+            "linhas_antes": len(todas),
+            "linhas_depois": len(consolidado),
+            "bytes_antes": bytes_antes,
+            "bytes_depois": bytes_depois,
+        })
+    return relatorio
+
+
+def resumo_compactacao(relatorio: List[dict]) -> dict:
+    return {
+        "grupos": len(relatorio),
+        "arquivos_removidos": sum(len(r["removidos"]) for r in relatorio),
+        "linhas_recuperadas": sum(r["linhas_antes"] - r["linhas_depois"] for r in relatorio),
+        "bytes_recuperados": sum(r["bytes_antes"] - r["bytes_depois"] for r in relatorio),
+    }
+
+
+def _caminho_relativo(caminho: str) -> str:
+    return os.path.relpath(caminho, start=".").replace("\\", "/")
+
+
+def espelhar_no_github(relatorio: List[dict], commit_batch, caminho_repo=_caminho_relativo, log=print) -> tuple:
+    """
+    Replica a compactação no repositório num único commit: envia os consolidados e exclui as versões
+    removidas juntos (tudo ou nada — o repositório nunca fica meio compactado).
+    'commit_batch(envios, exclusoes, message)' segue gpa.github_api.gh_commit_batch (retorna (ok, msg));
+    'caminho_repo(local)' dá o caminho no repositório (padrão: relativo ao diretório atual).
+    Retorna (enviados, excluidos).
+    """
+    envios = [(r["mantido"], caminho_repo(r["mantido"])) for r in relatorio]
+    exclusoes = [caminho_repo(c) for r in relatorio for c in r["removidos"]]
+    if not envios and not exclusoes:
+        return 0, 0
+    ok, msg = commit_batch(envios, exclusoes,
+                           message=f"chore: compacta {len(envios)} grupo(s), remove {len(exclusoes)} versão(ões)")
+    if not ok:
+        log(f"Falha ao replicar a compactação no GitHub: {msg}")
+        return 0, 0
+    return len(envios), len(exclusoes)
+
+
+def main(argv: Optional[list] = None):
+    ap = argparse.ArgumentParser(prog="python -m gpa.compactacao", description="Compacta processados reenviados")
+    ap.add_argument("--pasta", default=DIRETORIO_DADOS_PADRAO)
+    ap.add_argument("--simular", action="store_true", help="só mostra o que seria feito")
+    ap.add_argument("--github", action="store_true", help="replica no GitHub (requer credenciais)")
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    relatorio = compactar_processados(args.pasta, simular=args.simular)
+    for r in relatorio:
+        print(f"{r['grupo']}: {len(r['removidos']) + 1} versões → {os.path.basename(r['mantido'])} "
+              f"({r['linhas_antes']} → {r['linhas_depois']} linhas)")
+    res = resumo_compactacao(relatorio)
+    prefixo = "[simulação] " if args.simular else ""
+    print(f"{prefixo}{res['grupos']} grupo(s), {res['arquivos_removidos']} arquivo(s) removido(s), "
+          f"{res['linhas_recuperadas']} linha(s) e {res['bytes_recuperados']} bytes recuperados "
+          f"em {time.perf_counter() - t0:.2f} s")
+
+    if args.github and not args.simular and relatorio:
+        from gpa.github_api import gh_commit_batch, gh_credentials_ok
+        ok, err = gh_credentials_ok()
+        if not ok:
+            print(f"GitHub não configurado: {err}")
+            return
+        enviados, excluidos = espelhar_no_github(relatorio, gh_commit_batch)
+        print(f"GitHub: {enviados} consolidado(s) enviado(s), {excluidos} versão(ões) excluída(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,9 @@
-import pandas as pd
+from typing import TYPE_CHECKING
 
+if TYPE_CHECKING:
+    import pandas as pd
+
+# pandas só é importado por tabela_gpa_padrao(): os demais módulos leem as constantes sem custo de import
 DIRETORIO_DADOS_PADRAO = "./data"
 
 # Padrões de mapeamento (pode ajustar na UI do app)
@@ -16,8 +20,10 @@ ESQUEMA_PADRAO = {
 ROTULOS_PADRAO_P1 = ["P1", "Progressiva I", "Prova 1"]
 ROTULOS_PADRAO_CONCLUSIVA = ["Conclusiva", "CF", "Prova Final"]
 
-def tabela_gpa_padrao() -> pd.DataFrame:
+def tabela_gpa_padrao() -> "pd.DataFrame":
     """Tabela padrão de Média→GPA (faixas inclusivas [min, max])."""
+    import pandas as pd
+
     dados = [
         {"min": 9.0, "max": 10.0, "gpa": 4.0},
         {"min": 8.5, "max": 8.9, "gpa": 3.7},
@@ -36,3 +42,11 @@ def tabela_gpa_padrao() -> pd.DataFrame:
         .sort_values(["min", "max"])
         .reset_index(drop=True)
     )
+
+# Orçamento de dados por gráfico (linhas/bytes JSON enviados ao navegador); acima disso agrega no servidor
+LIMITE_LINHAS_GRAFICO = 5_000
+LIMITE_BYTES_GRAFICO = 1_000_000
+
+# Teto do cache de uploads já lidos (gpa.io.CacheLeituras). Vale por sessão do Streamlit: com N usuários
+# simultâneos o pior caso é N × este valor
+LIMITE_CACHE_LEITURAS_BYTES = 64 * 1024 * 1024
@@ -0,0 +1,267 @@
+# gpa/dados.py — Carga dos processado_*.csv de ./data com manifesto e cache por arquivo
+import io
+import os
+import threading
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+
+from gpa.agregados import AgregadosGPA
+from gpa.filtros import IndiceFiltros
+from gpa.io import hash_conteudo
+from gpa.texto import extrair_serie_de_texto_turma, normalizar_textos_df
+
+COLUNAS_ESSENCIAIS = ["Estudante", "Turma", "Disciplina", "Trimestre", "P1", "Conclusiva", "Media", "GPA"]
+
+# Esquema compacto do dataset em memória (dashboard)
+COLUNAS_CATEGORICAS = ["Serie", "Turma", "Disciplina", "Estudante"]
+COLUNAS_FLOAT32 = ["P1", "Conclusiva", "Media", "MediaPadronizada", "GPA"]
+
+
+def listar_arquivos(pasta: str):
+    if not os.path.isdir(pasta):
+        return []
+    full = [os.path.join(pasta, f) for f in os.listdir(pasta)]
+    return sorted([p for p in full if os.path.isfile(p)])
+
+
+def listar_processados_locais(pasta: str):
+    return [
+        p for p in listar_arquivos(pasta)
+        if os.path.basename(p).startswith("processado_") and p.endswith(".csv")
+    ]
+
+
+def versao_processados(pasta: str) -> tuple:
+    """Ficha barata de ./data (nº de processados, maior mtime, bytes): muda quando algo é gravado/excluído."""
+    n, mtime, tamanho = 0, 0, 0
+    for p in listar_processados_locais(pasta):
+        try:
+            st_ = os.stat(p)
+        except OSError:
+            continue
+        n, mtime, tamanho = n + 1, max(mtime, st_.st_mtime_ns), tamanho + st_.st_size
+    return n, mtime, tamanho
+
+
+def normalizar_processado(df: pd.DataFrame) -> pd.DataFrame:
+    """Colunas essenciais, MediaPadronizada, Série derivada da Turma e correção de mojibake."""
+    out = df
+
+    # Garante colunas essenciais
+    for c in COLUNAS_ESSENCIAIS:
+        if c not in out.columns:
+            out[c] = pd.NA
+
+    # Deriva MediaPadronizada se ausente
+    if "MediaPadronizada" not in out.columns:
+        out["MediaPadronizada"] = out["Media"].apply(lambda x: (x/10.0) if pd.notna(x) and x > 10 else x)
+
+    # Série: se não existir ou vier vazia, derivar de Turma
+    if "Serie" not in out.columns:
+        out["Serie"] = out["Turma"].astype(str).apply(lambda t: extrair_serie_de_texto_turma(t) or "")
+    else:
+        mask_vazia = out["Serie"].isna() | (out["Serie"].astype(str).str.strip() == "")
+        out.loc[mask_vazia, "Serie"] = out.loc[mask_vazia, "Turma"].astype(str).apply(
+            lambda t: extrair_serie_de_texto_turma(t) or ""
+        )
+
+    # Corrige mojibake em textos
+    return normalizar_textos_df(out)
+
+
+def ler_processado(fonte) -> pd.DataFrame:
+    """processado_*.csv (caminho ou buffer) → DataFrame normalizado (normalizar_processado), ainda sem tipar."""
+    return normalizar_processado(pd.read_csv(fonte))
+
+
+def tipar_dataset(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Dimensões como category (categorias ordenadas), Trimestre int8 (Int8 se houver ausentes)
+    e notas/GPA float32. Colunas fora do esquema ficam como estão.
+    """
+    out = df.copy(deep=False)
+    for c in COLUNAS_CATEGORICAS:
+        if c in out.columns and not isinstance(out[c].dtype, pd.CategoricalDtype):
+            valores = out[c].astype(object).where(out[c].notna(), None)
+            out[c] = pd.Categorical(valores, categories=sorted(set(valores.dropna())))
+    for c in COLUNAS_FLOAT32:
+        if c in out.columns:
+            out[c] = pd.to_numeric(out[c], errors="coerce").astype("float32")
+    if "Trimestre" in out.columns:
+        tri = pd.to_numeric(out["Trimestre"], errors="coerce")
+        if tri.notna().all() and tri.between(-128, 127).all() and (tri % 1 == 0).all():
+            out["Trimestre"] = tri.astype("int8")
+        else:
+            out["Trimestre"] = tri.round().astype("Int8") if tri.dropna().between(-128, 127).all() else tri
+    return out
+
+
+def concatenar_tipado(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """Concatena preservando as categorias: cada coluna categórica recebe a união ordenada das categorias."""
+    frames = [f for f in frames if f is not None and not f.empty]
+    if not frames:
+        return pd.DataFrame()
+    for c in COLUNAS_CATEGORICAS:
+        if all(c in f.columns and isinstance(f[c].dtype, pd.CategoricalDtype) for f in frames):
+            todas = sorted(set().union(*(f[c].cat.categories for f in frames)))
+            frames = [f if list(f[c].cat.categories) == todas else f.assign(**{c: f[c].cat.set_categories(todas)})
+                      for f in frames]
+    out = pd.concat(frames, ignore_index=True)
+    return tipar_dataset(out)  # só converte o que a concatenação desfez (ex.: Int8 + int8)
+
+
+def floats_para_exibicao(df: pd.DataFrame, casas: int = 4) -> pd.DataFrame:
+    """float32 → float64 arredondado (evita 7.199999809 em tabelas/exportações)."""
+    cols = [c for c in df.columns if df[c].dtype == "float32"]
+    if not cols:
+        return df
+    return df.astype({c: "float64" for c in cols}).round({c: casas for c in cols})
+
+
+def relatorio_memoria(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Memória por coluna (bytes) e estimativa do mesmo dado como object/float64/int64,
+    calculada sem materializar a versão não tipada.
+    """
+    linhas = []
+    n = len(df)
+    for c in df.columns:
+        serie = df[c]
+        atual = int(serie.memory_usage(index=False, deep=True))
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            contagem = np.bincount(serie.cat.codes[serie.cat.codes >= 0], minlength=len(serie.cat.categories))
+            tamanhos = np.array([len(str(v).encode("utf-8")) + 49 for v in serie.cat.categories], dtype="int64")
+            como_texto = n * 8 + int(contagem @ tamanhos) if len(tamanhos) else n * 8
+        elif serie.dtype == "float32" or str(serie.dtype) in ("int8", "Int8"):
+            como_texto = n * 8
+        else:
+            como_texto = atual
+        linhas.append({"coluna": c, "tipo": str(serie.dtype), "bytes": atual, "bytes_sem_tipagem": como_texto})
+    return pd.DataFrame(linhas, columns=["coluna", "tipo", "bytes", "bytes_sem_tipagem"])
+
+
+@dataclass(frozen=True)
+class InstantaneoProcessados:
+    """Dataset, índice dos filtros e agregados de uma mesma versão da pasta (não altere os DataFrames)."""
+    dados: pd.DataFrame
+    indice: IndiceFiltros
+    agregados: pd.DataFrame
+    versao: int
+    erros: tuple
+
+
+class CarregadorProcessados:
+    """
+    Mantém os processado_*.csv de uma pasta carregados, normalizados e tipados (tipar_dataset), arquivo a arquivo.
+    - Manifesto: caminho → (tamanho, mtime, hash do conteúdo).
+    - atualizar(): lista a pasta; relê só arquivos novos ou alterados (tamanho/mtime e depois hash),
+      descarta os excluídos e refaz o concatenado em memória (só acrescenta se houve apenas inclusões).
+    - dados(): devolve o concatenado; só toca o disco se o carregador foi invalidado.
+    - indice(): IndiceFiltros do concatenado, reconstruído só quando ele muda.
+    - agregados(): AgregadosGPA atualizado junto com o manifesto (uma reagregação por atualizar());
+      fica só em memória — a primeira carga de um processo refaz os agregados a partir dos arquivos.
+    - instantaneo(): os três acima, consistentes entre si, para compartilhar entre sessões/threads.
+    """
+
+    def __init__(self, pasta: str):
+        self.pasta = pasta
+        self.manifesto: Dict[str, dict] = {}
+        self.erros: List[str] = []
+        self.versao = 0
+        self._frames: Dict[str, pd.DataFrame] = {}
+        self._dados: Optional[pd.DataFrame] = None
+        self._sujo = True
+        self._indice: Optional[IndiceFiltros] = None
+        self._agregados = AgregadosGPA()
+        self._lock = threading.RLock()
+
+    def invalidar(self) -> None:
+        """Marca para reescanear a pasta na próxima chamada de dados() (ex.: após gravar/excluir/sincronizar)."""
+        self._sujo = True
+
+    def dados(self) -> pd.DataFrame:
+        if self._sujo or self._dados is None:
+            self.atualizar()
+        return self._dados
+
+    def indice(self) -> IndiceFiltros:
+        dados = self.dados()
+        if self._indice is None or self._indice.df is not dados:
+            self._indice = IndiceFiltros(dados)
+        return self._indice
+
+    def agregados(self) -> AgregadosGPA:
+        self.dados()
+        return self._agregados
+
+    def instantaneo(self) -> InstantaneoProcessados:
+        """Reescaneia a pasta e devolve dados, índice e agregados de uma só versão (atômico entre threads)."""
+        with self._lock:
+            self.invalidar()
+            dados = self.dados()
+            return InstantaneoProcessados(dados, self.indice(), self._agregados.tabela(), self.versao,
+                                          tuple(self.erros))
+
+    def atualizar(self) -> dict:
+        """Sincroniza com o disco. Retorna {'novos', 'alterados', 'removidos', 'inalterados'}."""
+        with self._lock:
+            self.erros = []
+            caminhos = listar_processados_locais(self.pasta)
+            novos, alterados, inalterados = [], [], 0
+            descartados = []  # falharam na releitura: saem dos agregados junto com os removidos
+            for p in caminhos:
+                try:
+                    st_ = os.stat(p)
+                except OSError:
+                    continue
+                antigo = self.manifesto.get(p)
+                if antigo and antigo["tamanho"] == st_.st_size and antigo["mtime"] == st_.st_mtime_ns:
+                    inalterados += 1
+                    continue
+                try:
+                    with open(p, "rb") as fh:
+                        bruto = fh.read()
+                except OSError as e:
+                    self.erros.append(f"Falha ao ler {os.path.basename(p)}: {e}")
+                    continue
+                h = hash_conteudo(bruto)
+                entrada = {"tamanho": st_.st_size, "mtime": st_.st_mtime_ns, "hash": h}
+                if antigo and antigo["hash"] == h and p in self._frames:
+                    self.manifesto[p] = entrada  # só o mtime mudou (ex.: touch/cópia)
+                    inalterados += 1
+                    continue
+                try:
+                    frame = tipar_dataset(ler_processado(io.BytesIO(bruto)))
+                except Exception as e:
+                    self.erros.append(f"Falha ao ler {os.path.basename(p)}: {e}")
+                    self.manifesto.pop(p, None)
+                    self._frames.pop(p, None)
+                    descartados.append(p)
+                    continue
+                self.manifesto[p] = entrada
+                self._frames[p] = frame
+                (alterados if antigo else novos).append(p)
+
+            atuais = set(caminhos)
+            removidos = [p for p in list(self._frames) if p not in atuais]
+            for p in removidos:
+                self._frames.pop(p, None)
+                self.manifesto.pop(p, None)
+            self._agregados.atualizar({p: self._frames[p] for p in novos + alterados}, descartados + removidos)
+
+            if novos and not (alterados or removidos) and self._dados is not None and not self._dados.empty:
+                self._dados = concatenar_tipado([self._dados] + [self._frames[p] for p in novos])
+            elif novos or alterados or removidos or self._dados is None:
+                self._dados = concatenar_tipado([self._frames[p] for p in sorted(self._frames)])
+            if novos or alterados or removidos:
+                self.versao += 1
+            self._sujo = False
+            return {"novos": len(novos), "alterados": len(alterados),
+                    "removidos": len(removidos), "inalterados": inalterados}
+
+
+def carregar_todos_processados(pasta: str) -> pd.DataFrame:
+    """Carga única (sem cache entre chamadas) de todos os processados da pasta, já tipada."""
+    return CarregadorProcessados(pasta).dados()
@@ -0,0 +1,252 @@
+# gpa/diagnostico.py — Medição leve por etapa (tempo, linhas, pico de memória) e registro em JSONL
+# Uso:
+#     with etapa("leitura", arquivo=nome) as e:
+#         df = ...
+#         e.anotar(linhas=len(df))
+# Desativado (padrão), etapa() devolve um contexto nulo compartilhado: o custo é uma leitura de contextvar.
+# Cada coleta vale para o contexto que a abriu (contextvars): sessões/threads diferentes não se misturam.
+# Threads de um pool não herdam o contexto — envolva a função com no_contexto(); processos do pool de
+# ingestão abrem a própria coleta (processar_arquivo) e devolvem as etapas no resultado.
+import os
+import json
+import time
+import functools
+import threading
+import contextvars
+import tracemalloc
+from contextlib import contextmanager
+from typing import List, Optional
+
+from gpa.config import DIRETORIO_DADOS_PADRAO
+
+ARQUIVO_DIAGNOSTICO = "diagnostico.jsonl"
+
+
+class _Coleta:
+    """Destino das etapas de um bloco coletar(): lista de registros e se mede tempo/memória."""
+
+    __slots__ = ("registros", "ligada", "memoria", "thread")
+
+    def __init__(self, ligada: bool, memoria: bool):
+        self.registros: list = []
+        self.ligada = ligada
+        self.memoria = memoria
+        self.thread = threading.get_ident()  # só a thread que abriu mede memória (tracemalloc é do processo)
+
+
+_coleta_atual: contextvars.ContextVar = contextvars.ContextVar("gpa_diagnostico_coleta", default=None)
+_local = threading.local()           # pilha de etapas abertas por thread (aninhamento e pico de memória)
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_usuarios = 0
+_iniciou_tracemalloc = False
+
+
+def _reservar_tracemalloc() -> None:
+    global _tracemalloc_usuarios, _iniciou_tracemalloc
+    with _tracemalloc_lock:
+        _tracemalloc_usuarios += 1
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _iniciou_tracemalloc = True
+
+
+def _liberar_tracemalloc() -> None:
+    global _tracemalloc_usuarios, _iniciou_tracemalloc
+    with _tracemalloc_lock:
+        _tracemalloc_usuarios -= 1
+        if _tracemalloc_usuarios == 0 and _iniciou_tracemalloc:
+            tracemalloc.stop()
+            _iniciou_tracemalloc = False
+
+
+def _coleta_ligada() -> Optional[_Coleta]:
+    c = _coleta_atual.get()
+    return c if c is not None and c.ligada else None
+
+
+def ativo() -> bool:
+    """Se a medição está ligada no contexto atual."""
+    return _coleta_ligada() is not None
+
+
+def mede_memoria() -> bool:
+    c = _coleta_ligada()
+    return c is not None and c.memoria
+
+
+class _EtapaNula:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def anotar(self, **atributos) -> None:
+        pass
+
+
+_NULA = _EtapaNula()
+
+
+class Etapa:
+    """Uma etapa medida: tempo de parede, linhas, pico de alocação (se tracemalloc ativo) e atributos livres."""
+
+    __slots__ = ("nome", "arquivo", "atributos", "_coleta", "_inicio", "_base", "_pico", "_pai")
+
+    def __init__(self, nome: str, arquivo: Optional[str] = None, _coleta: Optional[_Coleta] = None, **atributos):
+        self.nome = nome
+        self.arquivo = arquivo
+        self.atributos = atributos
+        self._coleta = _coleta or _coleta_atual.get()
+
+    def anotar(self, **atributos) -> None:
+        self.atributos.update(atributos)
+
+    def __enter__(self):
+        pilha = getattr(_local, "pilha", None)
+        if pilha is None:
+            pilha = _local.pilha = []
+        self._pai = pilha[-1].nome if pilha else None
+        if self.arquivo is None and pilha:
+            self.arquivo = pilha[-1].arquivo  # etapas internas herdam o arquivo da externa
+        self._base = self._pico = None
+        c = self._coleta
+        if c is not None and c.memoria and c.thread == threading.get_ident() and tracemalloc.is_tracing():
+            atual, pico = tracemalloc.get_traced_memory()
+            for aberta in pilha:  # o reset abaixo zera o pico: preserva o das etapas externas
+                if aberta._pico is not None:
+                    aberta._pico = max(aberta._pico, pico)
+            tracemalloc.reset_peak()
+            self._base = self._pico = atual
+        pilha.append(self)
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo_exc, exc, tb):
+        segundos = time.perf_counter() - self._inicio
+        pilha = _local.pilha
+        if pilha and pilha[-1] is self:
+            pilha.pop()
+        registro = {"etapa": self.nome, "arquivo": self.arquivo, "segundos": round(segundos, 6),
+                    "linhas": self.atributos.pop("linhas", None), "pico_bytes": None,
+                    "pai": self._pai, "ok": tipo_exc is None, "inicio": time.time() - segundos}
+        if self._base is not None and tracemalloc.is_tracing():
+            pico = max(self._pico, tracemalloc.get_traced_memory()[1])
+            registro["pico_bytes"] = max(0, pico - self._base)
+            for aberta in pilha:
+                if aberta._pico is not None:
+                    aberta._pico = max(aberta._pico, pico)
+        if self.atributos:
+            registro.update(self.atributos)
+        if self._coleta is not None:
+            self._coleta.registros.append(registro)
+        return False
+
+
+def etapa(nome: str, arquivo: Optional[str] = None, **atributos):
+    """Contexto que mede a etapa 'nome' (ou nada, se o diagnóstico estiver desligado neste contexto)."""
+    c = _coleta_ligada()
+    if c is None:
+        return _NULA
+    return Etapa(nome, arquivo, _coleta=c, **atributos)
+
+
+def _tamanho(obj) -> Optional[int]:
+    if isinstance(obj, tuple) and obj:
+        obj = obj[0]
+    try:
+        return len(obj)
+    except TypeError:
+        return None
+
+
+def medido(nome: str, entrada: bool = False):
+    """
+    Decorador: mede cada chamada como a etapa 'nome', com linhas = len(resultado)
+    (e linhas_entrada = len(1º argumento) se entrada=True). Desligado, chama a função direto.
+    """
+    def decorar(func):
+        @functools.wraps(func)
+        def medida(*args, **kwargs):
+            c = _coleta_ligada()
+            if c is None:
+                return func(*args, **kwargs)
+            with Etapa(nome, _coleta=c) as e:
+                if entrada and args:
+                    e.anotar(linhas_entrada=_tamanho(args[0]))
+                resultado = func(*args, **kwargs)
+                e.anotar(linhas=_tamanho(resultado))
+            return resultado
+        return medida
+    return decorar
+
+
+def no_contexto(func):
+    """Envolve 'func' para rodar com a coleta de quem chamou (para pool.submit/map de ThreadPoolExecutor)."""
+    contexto = contextvars.copy_context()
+
+    @functools.wraps(func)
+    def rodar(*args, **kwargs):
+        return contexto.copy().run(func, *args, **kwargs)
+    return rodar
+
+
+@contextmanager
+def coletar(ligar: Optional[bool] = None, memoria: bool = True):
+    """
+    Junta numa lista as etapas concluídas dentro do bloco, neste contexto (thread/sessão) e nas funções
+    envolvidas com no_contexto(). ligar=True/False liga/desliga a medição no bloco; None herda do bloco externo.
+    Blocos aninhados recebem as etapas do seu trecho (o externo não as vê).
+    """
+    externa = _coleta_atual.get()
+    if ligar is None:
+        ligada = externa is not None and externa.ligada
+        memoria = ligada and externa.memoria
+    else:
+        ligada = bool(ligar)
+    coleta = _Coleta(ligada, ligada and memoria)
+    if coleta.memoria:
+        _reservar_tracemalloc()
+    token = _coleta_atual.set(coleta)
+    try:
+        yield coleta.registros
+    finally:
+        _coleta_atual.reset(token)
+        if coleta.memoria:
+            _liberar_tracemalloc()
+
+
+def caminho_log(diretorio: str = DIRETORIO_DADOS_PADRAO) -> str:
+    return os.path.join(diretorio, ARQUIVO_DIAGNOSTICO)
+
+
+def gravar_jsonl(registros: List[dict], diretorio: str = DIRETORIO_DADOS_PADRAO, **contexto) -> Optional[str]:
+    """Acrescenta os registros (uma linha JSON cada, com 'contexto' repetido) ao log de ./data."""
+    if not registros:
+        return None
+    os.makedirs(diretorio, exist_ok=True)
+    caminho = caminho_log(diretorio)
+    with open(caminho, "a", encoding="utf-8") as fh:
+        for r in registros:
+            fh.write(json.dumps({**contexto, **r}, ensure_ascii=False, default=str) + "\n")
+    return caminho
+
+
+def resumo(registros: List[dict]):
+    """DataFrame por etapa: chamadas, tempo total/máximo, linhas e maior pico (MB)."""
+    import pandas as pd
+
+    cols = ["etapa", "chamadas", "segundos", "segundos_max", "linhas", "pico_mb"]
+    if not registros:
+        return pd.DataFrame(columns=cols)
+    df = pd.DataFrame(registros)
+    out = df.groupby("etapa", sort=False).agg(
+        chamadas=("segundos", "size"),
+        segundos=("segundos", "sum"),
+        segundos_max=("segundos", "max"),
+        linhas=("linhas", lambda s: s.dropna().sum() if s.notna().any() else None),
+        pico_mb=("pico_bytes", lambda s: s.dropna().max() / 1e6 if s.notna().any() else None),
+    ).reset_index()
+    return out.sort_values("segundos", ascending=False)[cols].reset_index(drop=True)
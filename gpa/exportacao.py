@@ -0,0 +1,214 @@
+# gpa/exportacao.py — Exportação em blocos (CSV, CSV.gz, XLSX write-only, Parquet; ZIP dividido por turma/estudante)
+# A tabela nunca é copiada inteira: cada bloco de linhas é selecionado, formatado e gravado antes do próximo.
+import io
+import os
+import re
+import gzip
+import zipfile
+from typing import BinaryIO, Iterator, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except Exception:
+    pa = None
+    pq = None
+
+from gpa.dados import floats_para_exibicao
+
+FORMATO_CSV = "csv"
+FORMATO_CSV_GZ = "csv.gz"
+FORMATO_XLSX = "xlsx"
+FORMATO_PARQUET = "parquet"
+FORMATOS_EXPORTACAO = {
+    FORMATO_CSV: ("CSV", "text/csv"),
+    FORMATO_CSV_GZ: ("CSV compactado (gzip)", "application/gzip"),
+    FORMATO_XLSX: ("Excel (XLSX)", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    FORMATO_PARQUET: ("Parquet", "application/vnd.apache.parquet"),
+}
+MIME_ZIP = "application/zip"
+
+DIVISAO_NENHUMA = None
+DIVISAO_TURMA = "turma"
+DIVISAO_ESTUDANTE = "estudante"
+_COLUNAS_DIVISAO = {DIVISAO_TURMA: ["Serie", "Turma"], DIVISAO_ESTUDANTE: ["Serie", "Turma", "Estudante"]}
+
+TAMANHO_BLOCO = 50_000
+_LINHAS_MAX_XLSX = 1_048_575  # limite do Excel menos o cabeçalho
+
+
+def formatos_disponiveis() -> list:
+    return [f for f in FORMATOS_EXPORTACAO if f != FORMATO_PARQUET or pq is not None]
+
+
+def nome_arquivo(base: str, formato: str, divisao: Optional[str] = None) -> str:
+    return f"{base}.zip" if divisao else f"{base}.{formato}"
+
+
+def mime_exportacao(formato: str, divisao: Optional[str] = None) -> str:
+    return MIME_ZIP if divisao else FORMATOS_EXPORTACAO[formato][1]
+
+
+def _blocos(df: pd.DataFrame, posicoes: Optional[np.ndarray], colunas: Optional[Sequence[str]],
+            tamanho_bloco: int) -> Iterator[pd.DataFrame]:
+    """Blocos prontos para gravar (só as colunas pedidas, float32 → float64 arredondado)."""
+    n = len(df) if posicoes is None else len(posicoes)
+    for ini in range(0, n, tamanho_bloco):
+        if posicoes is None:
+            bloco = df.iloc[ini:ini + tamanho_bloco]
+        else:
+            bloco = df.take(posicoes[ini:ini + tamanho_bloco])
+        if colunas is not None:
+            bloco = bloco.reindex(columns=list(colunas))
+        yield floats_para_exibicao(bloco)
+
+
+def _vazio(df: pd.DataFrame, colunas: Optional[Sequence[str]]) -> pd.DataFrame:
+    return df.iloc[:0] if colunas is None else df.iloc[:0].reindex(columns=list(colunas))
+
+
+def _gravar_csv(blocos, destino: BinaryIO, vazio: pd.DataFrame) -> None:
+    texto = io.TextIOWrapper(destino, encoding="utf-8-sig", newline="")
+    try:
+        primeiro = True
+        for bloco in blocos:
+            bloco.to_csv(texto, index=False, header=primeiro)
+            primeiro = False
+        if primeiro:
+            vazio.to_csv(texto, index=False)
+        texto.flush()
+    finally:
+        texto.detach()  # não fecha o destino
+
+
+def _gravar_csv_gz(blocos, destino: BinaryIO, vazio: pd.DataFrame) -> None:
+    with gzip.GzipFile(fileobj=destino, mode="wb", compresslevel=6) as gz:
+        _gravar_csv(blocos, gz, vazio)
+
+
+def _valor_xlsx(v):
+    if v is None or v is pd.NA or (isinstance(v, float) and np.isnan(v)):
+        return None
+    return v.item() if isinstance(v, np.generic) else v
+
+
+def _gravar_xlsx(blocos, destino: BinaryIO, vazio: pd.DataFrame) -> None:
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    cabecalho = [str(c) for c in vazio.columns]
+    ws, linhas_na_aba, n_abas = None, 0, 0
+
+    def nova_aba():
+        nonlocal ws, linhas_na_aba, n_abas
+        n_abas += 1
+        ws = wb.create_sheet(title="dados" if n_abas == 1 else f"dados_{n_abas}")
+        ws.append(cabecalho)
+        linhas_na_aba = 0
+
+    nova_aba()
+    for bloco in blocos:
+        for linha in bloco.itertuples(index=False, name=None):
+            if linhas_na_aba >= _LINHAS_MAX_XLSX:
+                nova_aba()
+            ws.append([_valor_xlsx(v) for v in linha])
+            linhas_na_aba += 1
+    wb.save(destino)
+
+
+def _tabela_arrow(bloco: pd.DataFrame, esquema=None):
+    # Categorias viram texto: os blocos compartilham o esquema mesmo com dicionários diferentes
+    bloco = bloco.astype({c: "string" for c in bloco.columns if isinstance(bloco[c].dtype, pd.CategoricalDtype)})
+    return pa.Table.from_pandas(bloco, schema=esquema, preserve_index=False)
+
+
+def _gravar_parquet(blocos, destino: BinaryIO, vazio: pd.DataFrame) -> None:
+    if pq is None:
+        raise RuntimeError("pyarrow não está instalado — exportação Parquet indisponível.")
+    esquema = _tabela_arrow(vazio).schema
+    with pq.ParquetWriter(destino, esquema, compression="zstd") as escritor:
+        for bloco in blocos:
+            escritor.write_table(_tabela_arrow(bloco, esquema))
+
+
+_ESCRITORES = {
+    FORMATO_CSV: _gravar_csv,
+    FORMATO_CSV_GZ: _gravar_csv_gz,
+    FORMATO_XLSX: _gravar_xlsx,
+    FORMATO_PARQUET: _gravar_parquet,
+}
+
+
+def _nome_seguro(partes) -> str:
+    texto = " - ".join("" if p is None or (isinstance(p, float) and np.isnan(p)) else str(p) for p in partes)
+    texto = re.sub(r"[^\w\-. ºª]+", "_", texto).strip(" ._")
+    return texto or "sem_nome"
+
+
+def exportar(
+    df: pd.DataFrame,
+    destino: Union[str, BinaryIO],
+    formato: str = FORMATO_CSV,
+    divisao: Optional[str] = None,
+    posicoes: Optional[np.ndarray] = None,
+    colunas: Optional[Sequence[str]] = None,
+    tamanho_bloco: int = TAMANHO_BLOCO,
+) -> int:
+    """
+    Grava df (ou só as linhas 'posicoes', nessa ordem) em 'destino' (caminho ou arquivo binário), em blocos.
+    divisao='turma'/'estudante' gera um ZIP com um arquivo por grupo no formato pedido.
+    Retorna o número de linhas exportadas.
+    """
+    if formato not in _ESCRITORES:
+        raise ValueError(f"Formato não suportado: {formato}")
+    if divisao is not None and divisao not in _COLUNAS_DIVISAO:
+        raise ValueError(f"Divisão não suportada: {divisao}")
+    if isinstance(destino, str):
+        with open(destino, "wb") as fh:
+            return exportar(df, fh, formato, divisao, posicoes, colunas, tamanho_bloco)
+
+    posicoes = None if posicoes is None else np.asarray(posicoes, dtype=np.int64)
+    n = len(df) if posicoes is None else len(posicoes)
+    vazio = _vazio(df, colunas)
+    gravar = _ESCRITORES[formato]
+
+    if divisao is None:
+        gravar(_blocos(df, posicoes, colunas, tamanho_bloco), destino, vazio)
+        return n
+
+    chaves = [c for c in _COLUNAS_DIVISAO[divisao] if c in df.columns]
+    ordem = np.arange(len(df), dtype=np.int64) if posicoes is None else posicoes
+    # Grupos como arrays de posições (preservam a ordem de 'ordem'); sem copiar linhas
+    grupos = (df[chaves].take(ordem).reset_index(drop=True)
+              .groupby(chaves, dropna=False, observed=True, sort=True).indices) if chaves else {(): np.arange(n)}
+    extensao = FORMATO_CSV if formato == FORMATO_CSV_GZ else formato
+    usados = set()
+    with zipfile.ZipFile(destino, "w", compression=zipfile.ZIP_DEFLATED, allowZip64=True) as zf:
+        for chave, idx in grupos.items():
+            chave = chave if isinstance(chave, tuple) else (chave,)
+            nome = _nome_seguro(chave)
+            base, k = nome, 2
+            while nome in usados:
+                nome, k = f"{base} ({k})", k + 1
+            usados.add(nome)
+            escrever = _gravar_csv if formato == FORMATO_CSV_GZ else gravar  # o ZIP já comprime
+            with zf.open(f"{nome}.{extensao}", "w", force_zip64=True) as entrada:
+                escrever(_blocos(df, ordem[idx], colunas, tamanho_bloco), entrada, vazio)
+    return n
+
+
+def exportar_para_bytes(df: pd.DataFrame, formato: str = FORMATO_CSV, **kwargs) -> bytes:
+    buffer = io.BytesIO()
+    exportar(df, buffer, formato, **kwargs)
+    return buffer.getvalue()
+
+
+def remover_arquivo(caminho: Optional[str]) -> None:
+    if caminho and os.path.exists(caminho):
+        try:
+            os.remove(caminho)
+        except OSError:
+            pass
@@ -0,0 +1,81 @@
+# gpa/filtros.py — Índice dos filtros em cascata do dashboard (Série → Turma → Trimestre → Disciplina → Estudante)
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+DIMENSOES_FILTRO = ("Serie", "Turma", "Trimestre", "Disciplina", "Estudante")
+
+
+class _Dimensao:
+    """Códigos por linha + posições das linhas ordenadas por valor (uma fatia contígua por valor)."""
+
+    def __init__(self, serie: pd.Series):
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            codigos = serie.cat.codes.to_numpy()
+            categorias = serie.cat.categories
+        else:
+            codigos, categorias = pd.factorize(serie, sort=True)
+        self.categorias = list(categorias)
+        self.codigo_de = {v: i for i, v in enumerate(self.categorias)}
+        k = len(self.categorias)
+        # -1 (ausente) vira k: fica no fim da ordenação e nunca é selecionado
+        self.codigos = np.where(codigos < 0, k, codigos).astype(np.int32)
+        self.ordem = np.argsort(self.codigos, kind="stable").astype(np.int64)
+        self.inicios = np.searchsorted(self.codigos[self.ordem], np.arange(k + 1))
+        self.presentes = np.diff(self.inicios) > 0
+
+    def codigos_de(self, valores: Sequence) -> np.ndarray:
+        return np.array(sorted({self.codigo_de[v] for v in valores if v in self.codigo_de}), dtype=np.int64)
+
+
+class IndiceFiltros:
+    """
+    Índice construído uma vez por versão do dataset. As seleções são encadeadas sobre arrays ordenados
+    de posições de linha (None = todas as linhas), sem criar DataFrames intermediários:
+        pos = idx.filtrar(None, "Serie", serie_sel)
+        turmas = idx.valores("Turma", pos)
+        pos = idx.filtrar(pos, "Turma", turma_sel)
+        ...
+        view = idx.linhas(pos)
+    Seleção vazia não restringe (mesma regra do filtro final do dashboard).
+    """
+
+    def __init__(self, df: pd.DataFrame, dimensoes: Sequence[str] = DIMENSOES_FILTRO):
+        self.df = df
+        self.dimensoes: Dict[str, _Dimensao] = {d: _Dimensao(df[d]) for d in dimensoes if d in df.columns}
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def filtrar(self, posicoes: Optional[np.ndarray], dimensao: str, valores: Sequence) -> Optional[np.ndarray]:
+        if not valores or dimensao not in self.dimensoes:
+            return posicoes
+        dim = self.dimensoes[dimensao]
+        cods = dim.codigos_de(valores)
+        if posicoes is None:
+            # Primeiro filtro: junta as fatias dos valores escolhidos (custo proporcional às linhas selecionadas)
+            if len(cods) == 0:
+                return np.empty(0, dtype=np.int64)
+            fatias = [dim.ordem[dim.inicios[c]:dim.inicios[c + 1]] for c in cods]
+            return np.sort(np.concatenate(fatias))
+        escolhido = np.zeros(len(dim.categorias) + 1, dtype=bool)
+        escolhido[cods] = True
+        return posicoes[escolhido[dim.codigos[posicoes]]]
+
+    def valores(self, dimensao: str, posicoes: Optional[np.ndarray] = None) -> List:
+        """Valores distintos (não ausentes), em ordem, presentes nas linhas selecionadas."""
+        if dimensao not in self.dimensoes:
+            return []
+        dim = self.dimensoes[dimensao]
+        if posicoes is None:
+            presentes = dim.presentes
+        else:
+            presentes = np.bincount(dim.codigos[posicoes], minlength=len(dim.categorias) + 1)[:-1] > 0
+        return [v for v, p in zip(dim.categorias, presentes) if p]
+
+    def linhas(self, posicoes: Optional[np.ndarray]) -> pd.DataFrame:
+        """DataFrame das linhas selecionadas (uma única cópia via take)."""
+        if posicoes is None:
+            return self.df
+        return self.df.take(posicoes)
@@ -1,19 +1,83 @@
 # gpa/github_api.py — utilitários GitHub (listar, baixar, enviar e excluir arquivos)
 import os
+import sys
 import json
+import time
 import base64
+import random
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Sequence, Tuple
 import requests
+from requests.adapters import HTTPAdapter
 from urllib.parse import quote
-import streamlit as st
+
+try:
+    import tomllib
+except Exception:
+    try:
+        import tomli as tomllib
+    except Exception:
+        tomllib = None
+
+from gpa.diagnostico import etapa, medido, no_contexto
+
+API_GITHUB = "https://api.github.com"
 
 # -------- Secrets helpers --------
+# Ordem: st.secrets (só se o app Streamlit já carregou o streamlit) → variáveis de ambiente → arquivo TOML
+# (mesmo formato do secrets.toml: chaves planas ou bloco [github]). O arquivo vem de definir_arquivo_credenciais(),
+# da variável GPA_CREDENCIAIS ou, por padrão, de .streamlit/secrets.toml.
+ARQUIVO_CREDENCIAIS_PADRAO = os.path.join(".streamlit", "secrets.toml")
+_arquivo_credenciais: Optional[str] = None
+_cache_arquivo = {}
+
+
+def definir_arquivo_credenciais(caminho: Optional[str]) -> None:
+    global _arquivo_credenciais
+    _arquivo_credenciais = caminho
+
+
+def _buscar(segredos, name):
+    if name in segredos:
+        return segredos[name]
+    github = segredos.get("github") if hasattr(segredos, "get") else None
+    if github is not None and name in github:
+        return github[name]
+    return None
+
+
+def _segredos_arquivo() -> dict:
+    caminho = _arquivo_credenciais or os.environ.get("GPA_CREDENCIAIS") or ARQUIVO_CREDENCIAIS_PADRAO
+    if tomllib is None or not os.path.isfile(caminho):
+        return {}
+    mtime = os.path.getmtime(caminho)
+    em_cache = _cache_arquivo.get(caminho)
+    if em_cache is None or em_cache[0] != mtime:
+        try:
+            with open(caminho, "rb") as fh:
+                em_cache = (mtime, tomllib.load(fh))
+        except (OSError, ValueError):
+            em_cache = (mtime, {})
+        _cache_arquivo[caminho] = em_cache
+    return em_cache[1]
+
+
 def _get_secret(name, default=None):
-    # Suporta chaves planas ou bloco [github] em secrets.toml
-    if name in st.secrets:
-        return st.secrets.get(name, default)
-    if "github" in st.secrets and name in st.secrets["github"]:
-        return st.secrets["github"].get(name, default)
-    return default
+    st = sys.modules.get("streamlit")
+    if st is not None:
+        try:
+            valor = _buscar(st.secrets, name)
+        except Exception:  # sem secrets.toml o st.secrets levanta ao ser lido
+            valor = None
+        if valor is not None:
+            return valor
+    valor = os.environ.get(name)
+    if valor:
+        return valor
+    valor = _buscar(_segredos_arquivo(), name)
+    return default if valor is None else valor
 
 def gh_credentials_ok():
     token = _get_secret("GITHUB_TOKEN")
@@ -33,77 +97,452 @@ def gh_credentials_summary():
         return "repositório não configurado"
     return f"{owner}/{repo}@{branch}"
 
-def _headers():
-    token = _get_secret("GITHUB_TOKEN")
-    return {
-        "Authorization": f"token {token}",
-        "Accept": "application/vnd.github+json",
-        "X-GitHub-Api-Version": "2022-11-28",
-    }
-
 def _repo_info():
     owner = _get_secret("REPO_OWNER")
     repo  = _get_secret("REPO_NAME")
     branch = _get_secret("DEFAULT_BRANCH", "main")
     return owner, repo, branch
 
+
+# -------- Corpos em fluxo (arquivos grandes sem carregar tudo em memória) --------
+_BLOCO_TRANSFERENCIA = 3 * 64 * 1024  # múltiplo de 3: base64 por bloco sem padding intermediário
+
+
+class _CorpoJSONBase64:
+    """
+    Corpo JSON '<prefixo>"<base64 do arquivo>"<sufixo>' lido em blocos. Tem len() (Content-Length
+    conhecido, sem chunked), então requests o envia aos pedaços sem montar a string inteira.
+    """
+
+    def __init__(self, prefixo: bytes, caminho: str, sufixo: bytes):
+        self._prefixo, self._caminho, self._sufixo = prefixo, caminho, sufixo
+        self._tamanho = len(prefixo) + 4 * (-(-os.path.getsize(caminho) // 3)) + len(sufixo)
+        self._pedacos = self._gerar()
+        self._buffer = b""
+
+    def __len__(self) -> int:
+        return self._tamanho
+
+    def _gerar(self):
+        yield self._prefixo
+        with open(self._caminho, "rb") as fh:
+            for bloco in iter(lambda: fh.read(_BLOCO_TRANSFERENCIA), b""):
+                yield base64.b64encode(bloco)
+        yield self._sufixo
+
+    def read(self, n: int = -1) -> bytes:
+        while n < 0 or len(self._buffer) < n:
+            try:
+                self._buffer += next(self._pedacos)
+            except StopIteration:
+                break
+        if n < 0:
+            n = len(self._buffer)
+        out, self._buffer = self._buffer[:n], self._buffer[n:]
+        return out
+
+
+def _corpo_base64(campos_antes: dict, caminho: str, campos_depois: dict, chave: str = "content"):
+    """Fábrica de _CorpoJSONBase64 para {**campos_antes, chave: base64(arquivo), **campos_depois}."""
+    antes = json.dumps(campos_antes)[:-1]
+    prefixo = (antes + (", " if campos_antes else "") + json.dumps(chave) + ': "').encode("utf-8")
+    depois = json.dumps(campos_depois)[1:]
+    sufixo = ('"' + (", " + depois if campos_depois else "}")).encode("utf-8")
+    return lambda: _CorpoJSONBase64(prefixo, caminho, sufixo)
+
+
+def _comprimir_em_fluxo(corpo, nivel: int = 6):
+    """Gera o corpo comprimido com gzip em blocos (Transfer-Encoding: chunked)."""
+    import zlib
+    comp = zlib.compressobj(nivel, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for bloco in iter(lambda: corpo.read(_BLOCO_TRANSFERENCIA), b""):
+        saida = comp.compress(bloco)
+        if saida:
+            yield saida
+    yield comp.flush()
+
+
+# -------- Cliente HTTP (sessão com pool, novas tentativas, limite de requisições, ETag) --------
+class ErroGitHub(Exception):
+    """Falha que não adianta repetir (ex.: limite de requisições esgotado por tempo demais)."""
+
+
+_CAMPOS_METADADOS = ("name", "path", "type", "sha", "size")
+
+
+def _metadados(dados):
+    """Resposta da contents API → só name/path/type/sha/size (arquivo ou listagem); o cache de ETag guarda isto."""
+    if isinstance(dados, list):
+        return [_metadados(it) for it in dados]
+    if isinstance(dados, dict):
+        return {c: dados.get(c) for c in _CAMPOS_METADADOS}
+    return dados
+
+
+class ClienteGitHub:
+    """
+    Cliente do repositório com uma requests.Session (conexões reaproveitadas) e:
+    - novas tentativas com backoff exponencial + jitter em erros de rede, 5xx, 429 e 403 de limite secundário
+      (respeita Retry-After e X-RateLimit-Reset);
+    - orçamento de requisições: lê X-RateLimit-*; com 'reserva' ou menos restantes espera o reset
+      (até 'espera_max' segundos) antes de seguir;
+    - GETs condicionais (If-None-Match) para listagens e SHAs: 304 reaproveita a resposta em cache
+      (só os metadados de cada item, nunca o base64 de 'content');
+    - transferências em fluxo: downloads pelo media type raw gravados em blocos (sem o limite de 1 MB
+      do JSON da contents API) e uploads com o base64 gerado aos pedaços; comprimir=True envia o corpo
+      com Content-Encoding: gzip (só para servidores que aceitam corpo comprimido).
+    base_url permite apontar para um servidor local de testes.
+    """
+
+    STATUS_REPETIVEIS = (429, 500, 502, 503, 504)
+
+    def __init__(self, token: str, owner: str, repo: str, branch: str = "main", base_url: str = API_GITHUB,
+                 tentativas: int = 4, backoff: float = 0.5, backoff_max: float = 30.0, espera_max: float = 60.0,
+                 reserva: int = 10, timeout=(5, 30), conexoes: int = 16, itens_cache_etag: int = 512,
+                 sessao: Optional[requests.Session] = None, dormir=time.sleep, comprimir: bool = False):
+        self.owner, self.repo, self.branch = owner, repo, branch
+        self.base_url = base_url.rstrip("/")
+        self.tentativas, self.backoff, self.backoff_max = max(1, tentativas), backoff, backoff_max
+        self.espera_max, self.reserva, self.timeout = espera_max, reserva, timeout
+        self._dormir = dormir
+        self.comprimir = comprimir
+        self.sessao = sessao or requests.Session()
+        adaptador = HTTPAdapter(pool_connections=conexoes, pool_maxsize=conexoes)
+        self.sessao.mount("https://", adaptador)
+        self.sessao.mount("http://", adaptador)
+        self.sessao.headers.update({
+            "Authorization": f"token {token}",
+            "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": "2022-11-28",
+        })
+        self._etags: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._itens_cache_etag = itens_cache_etag
+        self._lock = threading.Lock()
+        # Estado do limite (última resposta) e contadores
+        self.limite: Optional[int] = None
+        self.restante: Optional[int] = None
+        self.reset_em: Optional[float] = None
+        self.requisicoes = 0
+        self.repeticoes = 0
+        self.respostas_304 = 0
+
+    # ---- infraestrutura ----
+    def url_repo(self, caminho: str = "") -> str:
+        return f"{self.base_url}/repos/{self.owner}/{self.repo}{caminho}"
+
+    def url_conteudo(self, path_rel: str) -> str:
+        return self.url_repo(f"/contents/{quote(path_rel)}")
+
+    def _registrar_limite(self, r: requests.Response) -> None:
+        h = r.headers
+        try:
+            with self._lock:
+                if "X-RateLimit-Limit" in h:
+                    self.limite = int(h["X-RateLimit-Limit"])
+                if "X-RateLimit-Remaining" in h:
+                    self.restante = int(h["X-RateLimit-Remaining"])
+                if "X-RateLimit-Reset" in h:
+                    self.reset_em = float(h["X-RateLimit-Reset"])
+        except ValueError:
+            pass
+
+    def _aguardar_orcamento(self) -> None:
+        with self._lock:
+            restante, reset_em = self.restante, self.reset_em
+        if restante is None or restante > self.reserva or reset_em is None:
+            return
+        espera = reset_em - time.time()
+        if espera <= 0:
+            return
+        if espera > self.espera_max:
+            raise ErroGitHub(
+                f"Limite de requisições do GitHub quase esgotado ({restante} restantes); "
+                f"renova às {time.strftime('%H:%M:%S', time.localtime(reset_em))}."
+            )
+        self._dormir(espera)
+        with self._lock:
+            self.restante = None  # só volta a valer com a próxima resposta
+
+    def _espera_repeticao(self, r: Optional[requests.Response], tentativa: int) -> Optional[float]:
+        """Segundos até a próxima tentativa, ou None se a resposta não deve ser repetida."""
+        base = min(self.backoff_max, self.backoff * (2 ** tentativa)) * random.uniform(0.5, 1.0)
+        if r is None:
+            return base  # erro de rede/timeout
+        limite_secundario = r.status_code == 403 and (
+            "Retry-After" in r.headers or r.headers.get("X-RateLimit-Remaining") == "0"
+            or "rate limit" in r.text.lower()
+        )
+        if r.status_code not in self.STATUS_REPETIVEIS and not limite_secundario:
+            return None
+        if "Retry-After" in r.headers:
+            try:
+                return float(r.headers["Retry-After"])
+            except ValueError:
+                return base
+        if r.headers.get("X-RateLimit-Remaining") == "0" and "X-RateLimit-Reset" in r.headers:
+            try:
+                return max(0.0, float(r.headers["X-RateLimit-Reset"]) - time.time()) + 1.0
+            except ValueError:
+                return base
+        return base
+
+    def requisitar(self, metodo: str, url: str, corpo=None, **kwargs) -> requests.Response:
+        """
+        Requisição com orçamento de limite e novas tentativas. Erros de rede esgotados propagam.
+        'corpo' é uma fábrica de corpo em fluxo (chamada de novo a cada tentativa).
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        for tentativa in range(self.tentativas):
+            self._aguardar_orcamento()
+            if corpo is not None:
+                dados = corpo()
+                headers = dict(kwargs.pop("headers", None) or {}, **{"Content-Type": "application/json"})
+                if self.comprimir:
+                    dados = _comprimir_em_fluxo(dados)
+                    headers["Content-Encoding"] = "gzip"
+                kwargs.update(data=dados, headers=headers)
+            try:
+                r = self.sessao.request(metodo, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if tentativa + 1 >= self.tentativas:
+                    raise
+                r = None
+            with self._lock:
+                self.requisicoes += 1
+            if r is not None:
+                self._registrar_limite(r)
+            espera = self._espera_repeticao(r, tentativa)
+            if espera is None or tentativa + 1 >= self.tentativas:
+                return r
+            if r is not None and espera > self.espera_max:
+                return r  # melhor devolver o erro do que travar a sessão
+            with self._lock:
+                self.repeticoes += 1
+            if r is not None:
+                r.close()
+            self._dormir(espera)
+        return r
+
+    def get_condicional(self, url: str, params: Optional[dict] = None, resumir=None):
+        """
+        GET com If-None-Match. Retorna (status, json|None, texto); 304 vira 200 com o corpo em cache.
+        resumir(json) → o que é guardado e devolvido (ex.: só os metadados, sem o base64 de 'content').
+        """
+        chave = (url, tuple(sorted((params or {}).items())), resumir)
+        with self._lock:
+            em_cache = self._etags.get(chave)
+        headers = {"If-None-Match": em_cache[0]} if em_cache else {}
+        r = self.requisitar("GET", url, params=params, headers=headers)
+        if r.status_code == 304 and em_cache:
+            with self._lock:
+                self.respostas_304 += 1
+                self._etags.move_to_end(chave)
+            return 200, em_cache[1], ""
+        if r.status_code != 200:
+            return r.status_code, None, r.text
+        try:
+            dados = r.json()
+        except ValueError as e:
+            return r.status_code, None, f"Resposta inválida: {e}"
+        if resumir is not None:
+            dados = resumir(dados)
+        etag = r.headers.get("ETag")
+        if etag:
+            with self._lock:
+                self._etags[chave] = (etag, dados)
+                self._etags.move_to_end(chave)
+                while len(self._etags) > self._itens_cache_etag:
+                    self._etags.popitem(last=False)
+        return 200, dados, ""
+
+    # ---- operações (mesmo contrato (ok, msg) das funções gh_*) ----
+    def sha_arquivo(self, path_rel: str):
+        status, dados, texto = self.get_condicional(self.url_conteudo(path_rel), {"ref": self.branch}, _metadados)
+        if status == 200:
+            try:
+                return dados.get("sha"), None
+            except Exception as e:
+                return None, f"Erro parseando resposta SHA: {e}"
+        elif status == 404:
+            return None, "Arquivo não encontrado no repositório"
+        return None, f"Falha ao obter SHA ({status}): {texto}"
+
+    def listar(self, path_rel: str):
+        status, items, texto = self.get_condicional(self.url_conteudo(path_rel), {"ref": self.branch}, _metadados)
+        if status == 200:
+            return True, [dict(it) for it in (items if isinstance(items, list) else [items])]
+        elif status == 404:
+            return False, f"Diretório {path_rel} não encontrado"
+        return False, f"Falha ao listar ({status}): {texto}"
+
+    def _baixar_em_fluxo(self, url: str, local_path: str, params: Optional[dict] = None):
+        """GET raw gravado em blocos num .part e renomeado no fim (memória constante)."""
+        with etapa("github.download", arquivo=local_path) as medicao:
+            r = self.requisitar("GET", url, params=params, stream=True,
+                                headers={"Accept": "application/vnd.github.raw"})
+            with r:
+                if r.status_code != 200:
+                    return False, f"Falha ao obter conteúdo ({r.status_code}): {r.text}"
+                os.makedirs(os.path.dirname(local_path) or ".", exist_ok=True)
+                parcial = local_path + ".part"
+                try:
+                    with open(parcial, "wb") as f:
+                        for bloco in r.iter_content(chunk_size=_BLOCO_TRANSFERENCIA):
+                            f.write(bloco)
+                        medicao.anotar(bytes=f.tell())
+                    os.replace(parcial, local_path)
+                except (OSError, requests.RequestException) as e:
+                    if os.path.exists(parcial):
+                        os.remove(parcial)
+                    return False, f"Falha ao gravar {local_path}: {e}"
+        return True, "OK"
+
+    def baixar(self, path_rel: str, local_path: str):
+        return self._baixar_em_fluxo(self.url_conteudo(path_rel), local_path, {"ref": self.branch})
+
+    def baixar_blob(self, sha: str, local_path: str):
+        """Download pelo SHA (blobs API, até 100 MB), útil quando a listagem já trouxe o SHA."""
+        return self._baixar_em_fluxo(self.url_repo(f"/git/blobs/{sha}"), local_path)
+
+    def enviar(self, local_path: str, path_rel: str = None, message: str = None):
+        if not os.path.isfile(local_path):
+            return False, f"Arquivo local não encontrado: {local_path}"
+        if path_rel is None:
+            path_rel = local_path.replace("\\", "/").lstrip("./")
+
+        sha, _ = self.sha_arquivo(path_rel)  # se existir, faz update
+        campos = {"message": message or f"chore: add/update {path_rel} via app", "branch": self.branch}
+        if sha:
+            campos["sha"] = sha
+
+        with etapa("github.envio", arquivo=path_rel, bytes=os.path.getsize(local_path)):
+            r = self.requisitar("PUT", self.url_conteudo(path_rel), corpo=_corpo_base64(campos, local_path, {}))
+        if r.status_code in (200, 201):
+            return True, "OK"
+        return False, f"Falha ao enviar ({r.status_code}): {r.text}"
+
+    def excluir(self, path_rel: str, message: str = None):
+        sha, err_sha = self.sha_arquivo(path_rel)
+        if not sha:
+            return False, f"Não foi possível obter SHA: {err_sha}"
+        payload = {"message": message or f"chore: remove {path_rel} via app", "sha": sha, "branch": self.branch}
+        r = self.requisitar("DELETE", self.url_conteudo(path_rel), data=json.dumps(payload))
+        if r.status_code in (200, 204):
+            return True, "OK"
+        return False, f"Falha ao deletar ({r.status_code}): {r.text}"
+
+    # ---- Git Data API: vários arquivos num único commit ----
+    def criar_blob(self, local_path: str) -> str:
+        corpo = _corpo_base64({}, local_path, {"encoding": "base64"})
+        with etapa("github.blob", arquivo=local_path, bytes=os.path.getsize(local_path)):
+            r = self.requisitar("POST", self.url_repo("/git/blobs"), corpo=corpo)
+        if r.status_code != 201:
+            raise ErroGitHub(f"Falha ao criar blob de {local_path} ({r.status_code}): {r.text}")
+        return r.json()["sha"]
+
+    def _cabeca(self) -> Tuple[str, str]:
+        """(sha do commit, sha da árvore) da ponta do branch."""
+        r = self.requisitar("GET", self.url_repo(f"/git/ref/heads/{quote(self.branch)}"))
+        if r.status_code != 200:
+            raise ErroGitHub(f"Falha ao ler o branch {self.branch} ({r.status_code}): {r.text}")
+        sha_commit = r.json()["object"]["sha"]
+        r = self.requisitar("GET", self.url_repo(f"/git/commits/{sha_commit}"))
+        if r.status_code != 200:
+            raise ErroGitHub(f"Falha ao ler o commit {sha_commit} ({r.status_code}): {r.text}")
+        return sha_commit, r.json()["tree"]["sha"]
+
+    def _criar_arvore(self, base: str, blobs: dict, exclusoes: Sequence[str]):
+        entradas = [{"path": p, "mode": "100644", "type": "blob", "sha": sha} for p, sha in blobs.items()]
+        entradas += [{"path": p, "mode": "100644", "type": "blob", "sha": None} for p in exclusoes]
+        return self.requisitar("POST", self.url_repo("/git/trees"),
+                               data=json.dumps({"base_tree": base, "tree": entradas}))
+
+    @medido("github.commit_lote")
+    def commit_em_lote(self, envios: Sequence[Tuple[str, str]] = (), exclusoes: Sequence[str] = (),
+                       message: str = None, max_trabalhadores: int = 8, tentativas_ref: int = 3):
+        """
+        Envia (local_path, path_rel) e exclui path_rel num único commit: blobs em paralelo, uma árvore
+        sobre a do branch, um commit e o avanço do ref (sem force). Se o branch andar no meio do caminho
+        (ref não é fast-forward), refaz árvore e commit sobre a nova ponta, reaproveitando os blobs.
+        Retorna (ok, sha do commit | mensagem de erro).
+        """
+        envios, exclusoes = list(envios), list(dict.fromkeys(exclusoes))
+        if not envios and not exclusoes:
+            return True, "Nada a enviar"
+        for local_path, _ in envios:
+            if not os.path.isfile(local_path):
+                return False, f"Arquivo local não encontrado: {local_path}"
+        message = message or f"chore: {len(envios)} arquivo(s) enviado(s), {len(exclusoes)} removido(s) via app"
+
+        with etapa("github.blobs", arquivos=len(envios)), \
+                ThreadPoolExecutor(max_workers=max(1, min(max_trabalhadores, len(envios) or 1))) as pool:
+            shas = list(pool.map(no_contexto(self.criar_blob), [local for local, _ in envios]))
+        blobs = {path_rel: sha for (_, path_rel), sha in zip(envios, shas)}
+
+        for _ in range(max(1, tentativas_ref)):
+            sha_pai, sha_arvore = self._cabeca()
+            r = self._criar_arvore(sha_arvore, blobs, exclusoes)
+            if r.status_code == 422 and exclusoes:
+                # Exclusão de caminho que não existe mais no branch: descarta esses caminhos e tenta de novo
+                exclusoes = [p for p in exclusoes if self.sha_arquivo(p)[0]]
+                r = self._criar_arvore(sha_arvore, blobs, exclusoes)
+            if r.status_code != 201:
+                return False, f"Falha ao criar árvore ({r.status_code}): {r.text}"
+            if r.json()["sha"] == sha_arvore:
+                return True, sha_pai  # nada mudou (conteúdo idêntico / caminhos já ausentes)
+            r = self.requisitar("POST", self.url_repo("/git/commits"), data=json.dumps(
+                {"message": message, "tree": r.json()["sha"], "parents": [sha_pai]}))
+            if r.status_code != 201:
+                return False, f"Falha ao criar commit ({r.status_code}): {r.text}"
+            sha_commit = r.json()["sha"]
+            r = self.requisitar("PATCH", self.url_repo(f"/git/refs/heads/{quote(self.branch)}"),
+                                data=json.dumps({"sha": sha_commit, "force": False}))
+            if r.status_code == 200:
+                return True, sha_commit
+            if r.status_code not in (409, 422):
+                return False, f"Falha ao atualizar o branch ({r.status_code}): {r.text}"
+            # 409/422: o branch andou desde a leitura — repete sobre a nova ponta
+        return False, f"O branch {self.branch} mudou durante o envio {tentativas_ref} vez(es); tente novamente."
+
+
+_CLIENTES = {}
+_CLIENTES_LOCK = threading.Lock()
+
+def gh_cliente() -> ClienteGitHub:
+    """Cliente compartilhado para as credenciais atuais (um pool de conexões por repositório/token)."""
+    token = _get_secret("GITHUB_TOKEN")
+    owner, repo, branch = _repo_info()
+    base_url = _get_secret("GITHUB_API_URL", API_GITHUB)
+    chave = (token, owner, repo, branch, base_url)
+    with _CLIENTES_LOCK:
+        if chave not in _CLIENTES:
+            _CLIENTES[chave] = ClienteGitHub(token, owner, repo, branch, base_url=base_url)
+        return _CLIENTES[chave]
+
+def _falha_requisicao(e: Exception):
+    return False, f"Falha de comunicação com o GitHub: {e}"
+
+
 # -------- Listar / SHA / Download / Upload / Delete --------
 def _get_file_sha(path_rel: str):
-    owner, repo, branch = _repo_info()
-    url = f"https://api.github.com/repos/{owner}/{repo}/contents/{quote(path_rel)}"
-    r = requests.get(url, headers=_headers(), params={"ref": branch}, timeout=20)
-    if r.status_code == 200:
-        try:
-            return r.json().get("sha"), None
-        except Exception as e:
-            return None, f"Erro parseando resposta SHA: {e}"
-    elif r.status_code == 404:
-        return None, "Arquivo não encontrado no repositório"
-    else:
-        return None, f"Falha ao obter SHA ({r.status_code}): {r.text}"
+    try:
+        return gh_cliente().sha_arquivo(path_rel)
+    except (requests.RequestException, ErroGitHub) as e:
+        return None, str(e)
 
 def gh_list_dir(path_rel: str):
     """Lista itens (arquivos/pastas) em um diretório do repo."""
-    owner, repo, branch = _repo_info()
-    url = f"https://api.github.com/repos/{owner}/{repo}/contents/{quote(path_rel)}"
-    r = requests.get(url, headers=_headers(), params={"ref": branch}, timeout=20)
-    if r.status_code == 200:
-        items = r.json()
-        if isinstance(items, dict):
-            items = [items]
-        out = []
-        for it in items:
-            out.append({
-                "name": it.get("name"),
-                "path": it.get("path"),
-                "type": it.get("type"),
-                "sha": it.get("sha"),
-                "size": it.get("size"),
-            })
-        return True, out
-    elif r.status_code == 404:
-        return False, f"Diretório {path_rel} não encontrado"
-    return False, f"Falha ao listar ({r.status_code}): {r.text}"
+    try:
+        return gh_cliente().listar(path_rel)
+    except (requests.RequestException, ErroGitHub) as e:
+        return _falha_requisicao(e)
 
 def gh_download_file_to_local(path_rel: str, local_path: str):
-    """Baixa um arquivo (base64) do repo para o caminho local."""
-    owner, repo, branch = _repo_info()
-    url = f"https://api.github.com/repos/{owner}/{repo}/contents/{quote(path_rel)}"
-    r = requests.get(url, headers=_headers(), params={"ref": branch}, timeout=30)
-    if r.status_code != 200:
-        return False, f"Falha ao obter conteúdo ({r.status_code}): {r.text}"
-    data = r.json()
-    if data.get("encoding") != "base64":
-        return False, "Conteúdo não está em base64"
-    content_b64 = data.get("content", "")
+    """Baixa um arquivo do repo para o caminho local (media type raw, gravado em blocos)."""
     try:
-        raw = base64.b64decode(content_b64)
-    except Exception as e:
-        return False, f"Erro ao decodificar base64: {e}"
-    os.makedirs(os.path.dirname(local_path), exist_ok=True)
-    with open(local_path, "wb") as f:
-        f.write(raw)
-    return True, "OK"
+        return gh_cliente().baixar(path_rel, local_path)
+    except (requests.RequestException, ErroGitHub) as e:
+        return _falha_requisicao(e)
 
 def gh_upload_file_from_local(local_path: str, path_rel: str = None, message: str = None):
     """Envia/atualiza um arquivo local para o repo (PUT contents API)."""
@@ -112,41 +551,27 @@ def gh_upload_file_from_local(local_path: str, path_rel: str = None, message: st
     ok, err = gh_credentials_ok()
     if not ok:
         return False, err
-    owner, repo, branch = _repo_info()
-    if path_rel is None:
-        path_rel = local_path.replace("\\", "/").lstrip("./")
-    url = f"https://api.github.com/repos/{owner}/{repo}/contents/{quote(path_rel)}"
-
-    with open(local_path, "rb") as f:
-        raw = f.read()
-    content_b64 = base64.b64encode(raw).decode("utf-8")
-
-    sha, _ = _get_file_sha(path_rel)  # se existir, faz update
-    payload = {
-        "message": message or f"chore: add/update {path_rel} via app",
-        "content": content_b64,
-        "branch": branch,
-    }
-    if sha:
-        payload["sha"] = sha
-
-    r = requests.put(url, headers=_headers(), data=json.dumps(payload), timeout=30)
-    if r.status_code in (200, 201):
-        return True, "OK"
-    return False, f"Falha ao enviar ({r.status_code}): {r.text}"
+    try:
+        return gh_cliente().enviar(local_path, path_rel, message)
+    except (requests.RequestException, ErroGitHub) as e:
+        return _falha_requisicao(e)
 
 def gh_delete_file_from_repo(path_rel: str, message: str = None):
     """Exclui arquivo versionado no GitHub."""
     ok, err = gh_credentials_ok()
     if not ok:
         return False, err
-    owner, repo, branch = _repo_info()
-    sha, err_sha = _get_file_sha(path_rel)
-    if not sha:
-        return False, f"Não foi possível obter SHA: {err_sha}"
-    url = f"https://api.github.com/repos/{owner}/{repo}/contents/{quote(path_rel)}"
-    payload = {"message": message or f"chore: remove {path_rel} via app", "sha": sha, "branch": branch}
-    r = requests.delete(url, headers=_headers(), data=json.dumps(payload), timeout=20)
-    if r.status_code in (200, 204):
-        return True, "OK"
-    return False, f"Falha ao deletar ({r.status_code}): {r.text}"
+    try:
+        return gh_cliente().excluir(path_rel, message)
+    except (requests.RequestException, ErroGitHub) as e:
+        return _falha_requisicao(e)
+
+def gh_commit_batch(envios: List[Tuple[str, str]] = (), exclusoes: List[str] = (), message: str = None):
+    """Envia [(local_path, path_rel)] e exclui [path_rel] num único commit (Git Data API)."""
+    ok, err = gh_credentials_ok()
+    if not ok:
+        return False, err
+    try:
+        return gh_cliente().commit_em_lote(envios, exclusoes, message)
+    except (requests.RequestException, ErroGitHub) as e:
+        return _falha_requisicao(e)
@@ -1,32 +1,105 @@
 import altair as alt
 import pandas as pd
 
-def grafico_tendencia_gpa_por_disciplina_turma(df: pd.DataFrame, disciplinas, turmas):
-    """Linha por turma (facet por disciplina), GPA médio por trimestre."""
-    dados = df[df["Disciplina"].isin(disciplinas) & df["Turma"].isin(turmas)].copy()
-    grp = (
-        dados
-        .groupby(["Disciplina", "Turma", "Trimestre"], dropna=False)["GPA"]
-        .mean()
-        .reset_index()
+from gpa.agregados import agregar_linhas, eh_agregado, reagregar
+from gpa.config import LIMITE_BYTES_GRAFICO, LIMITE_LINHAS_GRAFICO
+
+GRAO_DISCIPLINA_TURMA = ["Disciplina", "Turma", "Trimestre"]
+QUANTIS_FAIXA = (0.25, 0.75)
+_AMOSTRA_BYTES = 200
+
+def _projetar(df: pd.DataFrame, colunas) -> pd.DataFrame:
+    """Só as colunas codificadas; float32 → float64 arredondado (JSON menor e sem 3.700000047)."""
+    out = df[[c for c in colunas if c in df.columns]]
+    floats = [c for c in out.columns if out[c].dtype.kind == "f"]
+    return out.astype({c: "float64" for c in floats}).round({c: 4 for c in floats}) if floats else out
+
+def estimar_bytes_json(df: pd.DataFrame) -> int:
+    """Tamanho aproximado dos dados embutidos na especificação Vega-Lite (registros JSON), por amostragem."""
+    if df.empty:
+        return 0
+    amostra = df.head(_AMOSTRA_BYTES)
+    tamanho = len(amostra.to_json(orient="records", force_ascii=False).encode("utf-8"))
+    return int(tamanho * len(df) / len(amostra))
+
+def dentro_do_orcamento(dados: pd.DataFrame, limite_linhas=None, limite_bytes=None) -> bool:
+    limite_linhas = LIMITE_LINHAS_GRAFICO if limite_linhas is None else limite_linhas
+    limite_bytes = LIMITE_BYTES_GRAFICO if limite_bytes is None else limite_bytes
+    return len(dados) <= limite_linhas and estimar_bytes_json(dados) <= limite_bytes
+
+def _faixa_mediana(dados: pd.DataFrame, grupo, titulo_y: str):
+    """Mediana (linha) + faixa entre quantis (área) por grupo, calculadas aqui e não no navegador."""
+    q_inf, q_sup = QUANTIS_FAIXA
+    g = dados.groupby(grupo, dropna=False, observed=True)
+    agg = pd.DataFrame({
+        "Mediana": g["GPA"].median(),
+        "Q_inf": g["GPA"].quantile(q_inf),
+        "Q_sup": g["GPA"].quantile(q_sup),
+        "Estudantes": g["Estudante"].nunique(),
+    }).reset_index()
+    agg = _projetar(agg, list(agg.columns))
+    x = alt.X("Trimestre:O", title="Trimestre")
+    faixa = alt.Chart().mark_area(opacity=0.25).encode(
+        x=x,
+        y=alt.Y("Q_inf:Q", title=titulo_y),
+        y2="Q_sup:Q",
+    )
+    linha = alt.Chart().mark_line(point=True).encode(
+        x=x,
+        y="Mediana:Q",
+        tooltip=["Disciplina", "Trimestre", "Estudantes",
+                 alt.Tooltip("Mediana:Q", title="GPA mediano", format=".2f"),
+                 alt.Tooltip("Q_inf:Q", title=f"P{int(q_inf * 100)}", format=".2f"),
+                 alt.Tooltip("Q_sup:Q", title=f"P{int(q_sup * 100)}", format=".2f")],
     )
+    return alt.layer(faixa, linha, data=agg).properties(height=400)
+
+def grafico_tendencia_gpa_por_disciplina_turma(df: pd.DataFrame, disciplinas, turmas):
+    """
+    Linha por turma (facet por disciplina), GPA médio por trimestre.
+    df: agregados (gpa.agregados) em grão que contenha Disciplina/Turma/Trimestre ou linhas de estudantes.
+    """
+    dados = df[df["Disciplina"].isin(disciplinas) & df["Turma"].isin(turmas)]
+    if eh_agregado(dados):
+        grp = reagregar(dados, GRAO_DISCIPLINA_TURMA)
+    else:
+        grp = agregar_linhas(dados, GRAO_DISCIPLINA_TURMA)
+    grp = _projetar(grp.rename(columns={"GPA_media": "GPA"}),
+                    GRAO_DISCIPLINA_TURMA + ["GPA", "GPA_n", "GPA_min", "GPA_max"])
     linha = alt.Chart(grp).mark_line(point=True).encode(
         x=alt.X("Trimestre:O", title="Trimestre"),
         y=alt.Y("GPA:Q", title="GPA médio"),
         color=alt.Color("Turma:N", title="Turma"),
-        tooltip=["Disciplina", "Turma", "Trimestre", "GPA"],
+        tooltip=["Disciplina", "Turma", "Trimestre", alt.Tooltip("GPA:Q", format=".2f"),
+                 alt.Tooltip("GPA_n:Q", title="Registros"),
+                 alt.Tooltip("GPA_min:Q", title="GPA mín.", format=".2f"),
+                 alt.Tooltip("GPA_max:Q", title="GPA máx.", format=".2f")],
     ).properties(height=400)
     facet = linha.facet(column=alt.Column("Disciplina:N", title="Disciplina"))
     return facet.resolve_scale(y="independent")
 
-def grafico_tendencia_gpa_por_estudante_disciplina(df: pd.DataFrame, disciplinas, estudantes):
-    """Linha por estudante (facet por disciplina), GPA por trimestre."""
-    dados = df[df["Disciplina"].isin(disciplinas) & df["Estudante"].isin(estudantes)].copy()
+def grafico_tendencia_gpa_por_estudante_disciplina(df: pd.DataFrame, disciplinas, estudantes,
+                                                   limite_linhas=None, limite_bytes=None):
+    """
+    Linha por estudante (facet por disciplina), GPA por trimestre.
+    Acima do orçamento (linhas ou bytes JSON) vira mediana + faixa P25–P75 por disciplina, com aviso no título.
+    """
+    cols = ["Estudante", "Disciplina", "Trimestre", "GPA"]
+    dados = _projetar(df[df["Disciplina"].isin(disciplinas) & df["Estudante"].isin(estudantes)], cols)
+    if not dentro_do_orcamento(dados, limite_linhas, limite_bytes):
+        n_est = dados["Estudante"].nunique()
+        aviso = (f"{n_est} estudantes ({len(dados):,} pontos) excedem o limite do gráfico: "
+                 f"mostrando a mediana por disciplina e a faixa P25–P75.")
+        camadas = _faixa_mediana(dados, ["Disciplina", "Trimestre"], "GPA (mediana e P25–P75)")
+        facet = camadas.facet(column=alt.Column("Disciplina:N", title="Disciplina"))
+        return facet.resolve_scale(y="independent").properties(
+            title=alt.TitleParams("Tendência agregada", subtitle=[aviso], anchor="start")
+        )
     linha = alt.Chart(dados).mark_line(point=True).encode(
         x=alt.X("Trimestre:O", title="Trimestre"),
         y=alt.Y("GPA:Q", title="GPA"),
         color=alt.Color("Estudante:N", title="Estudante"),
-        tooltip=["Estudante", "Disciplina", "Trimestre", "GPA"],
+        tooltip=["Estudante", "Disciplina", "Trimestre", alt.Tooltip("GPA:Q", format=".2f")],
     ).properties(height=400)
     facet = linha.facet(column=alt.Column("Disciplina:N", title="Disciplina"))
     return facet.resolve_scale(y="independent")
@@ -36,7 +109,8 @@ def grafico_gpa_individual_estudante_disciplinas(df: pd.DataFrame, estudante: st
     Um estudante, várias disciplinas: linhas coloridas por disciplina, GPA vs Trimestre.
     Requer colunas: Estudante, Disciplina, Trimestre, GPA (e opcional Turma para tooltip).
     """
-    dados = df[(df["Estudante"] == estudante) & (df["Disciplina"].isin(disciplinas))].copy()
+    cols = ["Estudante", "Turma", "Disciplina", "Trimestre", "GPA"]
+    dados = _projetar(df[(df["Estudante"] == estudante) & (df["Disciplina"].isin(disciplinas))], cols)
     if dados.empty:
         return alt.Chart(pd.DataFrame({"msg": ["Sem dados para os filtros atuais."]})) \
                  .mark_text(size=16).encode(text="msg")
@@ -44,6 +118,6 @@ def grafico_gpa_individual_estudante_disciplinas(df: pd.DataFrame, estudante: st
         x=alt.X("Trimestre:O", title="Trimestre"),
         y=alt.Y("GPA:Q", title="GPA"),
         color=alt.Color("Disciplina:N", title="Disciplina"),
-        tooltip=["Estudante", "Turma", "Disciplina", "Trimestre", "GPA"],
+        tooltip=["Estudante", "Turma", "Disciplina", "Trimestre", alt.Tooltip("GPA:Q", format=".2f")],
     ).properties(height=420)
     return chart
@@ -0,0 +1,179 @@
+# gpa/ingestao.py — Pipeline por arquivo (export bruto → processado gravado) e execução em lote paralela
+import os
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional, Tuple
+
+from gpa.diagnostico import coletar, etapa
+from gpa.armazenamento import FORMATO_PARQUET, raiz_parquet, salvar_processado_parquet
+from gpa.io import Dialeto, converter_decimal, leitura_robusta
+from gpa.processamento import MapeamentoGPA, aplicar_mapeamento_gpa, calcular_media_por_trimestre
+from gpa.texto import inferir_serie_turma_trimestre, normalizar_textos_df
+
+
+@dataclass(frozen=True)
+class ParametrosIngestao:
+    """Tudo que o pipeline precisa além do arquivo (picklable para rodar em outro processo)."""
+    coluna_nome: str
+    coluna_turma: str
+    coluna_disc: str
+    coluna_avaliacao: str
+    coluna_nota: str
+    rotulos_p1: Tuple[str, ...]
+    rotulos_conclusiva: Tuple[str, ...]
+    trimestre_constante: int
+    mapa_gpa: MapeamentoGPA
+    escala: str
+    diretorio_saida: str
+    formato: str = "csv"
+    diagnostico: bool = False          # mede as etapas (gpa.diagnostico) e devolve em 'etapas'
+    diagnostico_memoria: bool = True
+
+
+def _resultado(nome: str, ok: bool, **extra) -> dict:
+    out = {"nome": nome, "ok": ok, "erro": None, "caminhos": [], "dialeto": None, "linhas": 0, "etapas": []}
+    out.update(extra)
+    return out
+
+
+def processar_arquivo(nome: str, bruto: bytes, params: ParametrosIngestao, ts: str,
+                      dialeto: Optional[Dialeto] = None) -> dict:
+    """
+    Processa um export: leitura, decimal, renomeio, mojibake, inferência, médias, GPA e gravação.
+    Não usa Streamlit nem estado global; erros viram {'ok': False, 'erro': ...}.
+    Retorna {'nome', 'ok', 'erro', 'caminhos', 'dialeto', 'linhas', 'etapas'}
+    ('etapas': medições de gpa.diagnostico quando params.diagnostico, inclusive vindas de outro processo).
+    """
+    with coletar(ligar=params.diagnostico, memoria=params.diagnostico_memoria) as etapas:
+        with etapa("arquivo", arquivo=nome, bytes=len(bruto)) as e:
+            res = _processar_arquivo(nome, bruto, params, ts, dialeto)
+            e.anotar(linhas=res["linhas"], ok_arquivo=res["ok"])
+    res["etapas"] = etapas
+    return res
+
+
+def _processar_arquivo(nome: str, bruto: bytes, params: ParametrosIngestao, ts: str,
+                       dialeto: Optional[Dialeto] = None) -> dict:
+    try:
+        df, dialeto_f = leitura_robusta(bruto, dialeto=dialeto, retornar_dialeto=True)
+    except Exception as e:
+        return _resultado(nome, False, erro=f"Falha ao ler: {e}")
+
+    # Normalização de nota
+    if params.coluna_nota in df.columns:
+        df[params.coluna_nota] = converter_decimal(df[params.coluna_nota])
+
+    # Renomear colunas principais
+    try:
+        df = df.rename(
+            columns={
+                params.coluna_nome: "Estudante",
+                params.coluna_turma: "Turma",
+                params.coluna_disc: "Disciplina",
+                params.coluna_avaliacao: "Avaliacao",
+                params.coluna_nota: "Nota",
+            }
+        )[
+            ["Estudante", "Turma", "Disciplina", "Avaliacao", "Nota"] + (["Trimestre"] if "Trimestre" in df.columns else [])
+        ]
+    except Exception as e:
+        return _resultado(nome, False, erro=f"Falha ao padronizar colunas: {e}", dialeto=dialeto_f)
+
+    try:
+        with etapa("textos_e_inferencia") as e:
+            # Corrige mojibake nos textos
+            df = normalizar_textos_df(df)
+
+            # Inferência de Série/Turma/Trimestre
+            serie_final, turma_final, tri_final = inferir_serie_turma_trimestre(
+                df, col_turma="Turma", fname=nome, trimestre_ui=params.trimestre_constante
+            )
+            e.anotar(linhas=len(df))
+
+        # Completa Turma se necessário
+        if ("Turma" not in df.columns) or df["Turma"].isna().all() or (df["Turma"].astype(str).str.strip() == "").all():
+            if turma_final:
+                df["Turma"] = turma_final
+
+        # Define/ajusta Trimestre
+        if "Trimestre" not in df.columns or df["Trimestre"].isna().all():
+            df["Trimestre"] = tri_final if tri_final in (1, 2, 3) else params.trimestre_constante
+
+        # 1) Média por trimestre = (P1 + Conclusiva)/2
+        medias = calcular_media_por_trimestre(
+            df,
+            rotulos_p1=list(params.rotulos_p1),
+            rotulos_conclusiva=list(params.rotulos_conclusiva),
+        )
+
+        # 2) Inserir Serie e normalizar textos
+        medias["Serie"] = serie_final if serie_final else ""
+        medias = normalizar_textos_df(medias)
+
+        # 3) Aplicar mapeamento Média → GPA
+        gpa_df = aplicar_mapeamento_gpa(medias, params.mapa_gpa, escala=params.escala)
+    except Exception as e:
+        return _resultado(nome, False, erro=f"Falha ao processar: {e}", dialeto=dialeto_f)
+
+    # 4) Persistir dados
+    nome_base = os.path.splitext(nome)[0]
+    try:
+        with etapa("gravacao", formato=params.formato, linhas=len(gpa_df)):
+            if params.formato == FORMATO_PARQUET:
+                caminhos = salvar_processado_parquet(
+                    gpa_df, raiz_parquet(params.diretorio_saida), f"processado_{nome_base}_{ts}"
+                )
+            else:
+                caminho = os.path.join(params.diretorio_saida, f"processado_{nome_base}_{ts}.csv")
+                gpa_df.to_csv(caminho, index=False, encoding="utf-8-sig")
+                caminhos = [caminho]
+    except Exception as e:
+        return _resultado(nome, False, erro=f"Falha ao salvar: {e}", dialeto=dialeto_f)
+
+    return _resultado(nome, True, caminhos=caminhos, dialeto=dialeto_f, linhas=len(gpa_df))
+
+
+def trabalhadores_disponiveis() -> int:
+    """Núcleos que este processo pode usar (respeita affinity/cgroups quando o SO informa)."""
+    try:
+        return max(1, len(os.sched_getaffinity(0)))
+    except AttributeError:
+        return max(1, os.cpu_count() or 1)
+
+
+def processar_lote(
+    itens: Iterable[Tuple[str, bytes, Optional[Dialeto]]],
+    params: ParametrosIngestao,
+    max_trabalhadores: Optional[int] = None,
+) -> Iterator[dict]:
+    """
+    Processa (nome, bytes, dialeto) em um pool de processos e devolve os resultados à medida que terminam.
+    Com um único arquivo ou um trabalhador roda no próprio processo. Se o pool quebrar,
+    os arquivos pendentes são processados em série. O carimbo de tempo é fixado na submissão.
+    """
+    itens = list(itens)
+    n = min(max_trabalhadores or trabalhadores_disponiveis(), len(itens))
+    if n <= 1:
+        for nome, bruto, dialeto in itens:
+            yield processar_arquivo(nome, bruto, params, time.strftime("%Y%m%d-%H%M%S"), dialeto)
+        return
+
+    # 'spawn': o processo do Streamlit tem threads, e fork copiaria locks em estado arbitrário
+    contexto = multiprocessing.get_context("spawn")
+    pendentes = {}
+    try:
+        with ProcessPoolExecutor(max_workers=n, mp_context=contexto) as pool:
+            for nome, bruto, dialeto in itens:
+                ts = time.strftime("%Y%m%d-%H%M%S")
+                fut = pool.submit(processar_arquivo, nome, bruto, params, ts, dialeto)
+                pendentes[fut] = (nome, bruto, dialeto, ts)
+            for fut in as_completed(pendentes):
+                res = fut.result()
+                pendentes.pop(fut)
+                yield res
+    except BrokenProcessPool:
+        for nome, bruto, dialeto, ts in pendentes.values():
+            yield processar_arquivo(nome, bruto, params, ts, dialeto)
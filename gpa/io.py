@@ -1,39 +1,227 @@
 # gpa/io.py — Leitura robusta de CSV/XLSX com detecção de encoding e delimitador
 import os
 import io
+import re
+import csv
+import codecs
+import hashlib
+import threading
 import pandas as pd
+from collections import OrderedDict
+from dataclasses import dataclass, replace
 from typing import Optional
 
+from gpa.config import LIMITE_CACHE_LEITURAS_BYTES
+from gpa.diagnostico import medido
+
 try:
     import chardet
+    from chardet.universaldetector import UniversalDetector
 except Exception:
     chardet = None
+    UniversalDetector = None
+
+# Detecção de encoding: orçamento de bytes analisados e tamanho dos blocos entregues ao chardet
+LIMITE_DETECCAO_BYTES = 64 * 1024
+BLOCO_DETECCAO_BYTES = 16 * 1024
+_MAX_CACHE_CODIFICACAO = 512
+_cache_codificacao: "OrderedDict[tuple, str]" = OrderedDict()
+_cache_codificacao_lock = threading.Lock()
 
 
 def garantir_diretorio(caminho: str) -> None:
     os.makedirs(caminho, exist_ok=True)
 
 
-def _detectar_codificacao(bruto: bytes) -> str:
-    """Tenta detectar encoding com chardet; se falhar, retorna 'utf-8'."""
-    if chardet is None:
+def hash_conteudo(bruto: bytes) -> str:
+    """Hash curto e rápido do conteúdo (chave de caches por arquivo)."""
+    return hashlib.blake2b(bruto, digest_size=16).hexdigest()
+
+
+def _prefixo_utf8_valido(bruto: bytes) -> bool:
+    """True se os bytes decodificam como UTF-8 (um caractere multibyte cortado no fim é aceito)."""
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(bruto, final=False)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+
+def _detectar_codificacao(bruto: bytes, limite_bytes: Optional[int] = None) -> str:
+    """
+    Detecta o encoding olhando no máximo 'limite_bytes' (padrão LIMITE_DETECCAO_BYTES):
+      - aceita UTF-8 de imediato se o trecho for UTF-8 válido;
+      - senão alimenta o UniversalDetector do chardet em blocos até ele ter confiança.
+    O resultado é memorizado pelo hash do conteúdo; se falhar, retorna 'utf-8'.
+    """
+    limite = LIMITE_DETECCAO_BYTES if limite_bytes is None else limite_bytes
+    chave = (hash_conteudo(bruto), limite)
+    with _cache_codificacao_lock:
+        if chave in _cache_codificacao:
+            _cache_codificacao.move_to_end(chave)
+            return _cache_codificacao[chave]
+
+    trecho = bruto[:limite]
+    enc = "utf-8"
+    if not _prefixo_utf8_valido(trecho) and UniversalDetector is not None:
+        try:
+            detector = UniversalDetector()
+            for i in range(0, len(trecho), BLOCO_DETECCAO_BYTES):
+                detector.feed(trecho[i:i + BLOCO_DETECCAO_BYTES])
+                if detector.done:
+                    break
+            detector.close()
+            enc = (detector.result or {}).get("encoding") or "utf-8"
+        except Exception:
+            enc = "utf-8"
+
+    with _cache_codificacao_lock:
+        _cache_codificacao[chave] = enc
+        while len(_cache_codificacao) > _MAX_CACHE_CODIFICACAO:
+            _cache_codificacao.popitem(last=False)
+    return enc
+
+
+# -------- Dialeto (sniffing por amostra) --------
+AMOSTRA_DIALETO_BYTES = 64 * 1024
+_SEPARADORES = (";", ",", "\t", "|")
+_ASSINATURAS_EXCEL = (b"PK\x03\x04", b"\xd0\xcf\x11\xe0")  # xlsx (zip) / xls (OLE2)
+_RE_NUMERO = re.compile(r"^\s*-?\d+(?:[.,]\d+)?\s*$")
+_RE_DECIMAL_VIRGULA = re.compile(r"^\s*-?\d+,\d+\s*$")
+_RE_DECIMAL_PONTO = re.compile(r"^\s*-?\d+\.\d+\s*$")
+
+
+@dataclass(frozen=True)
+class Dialeto:
+    """Como um arquivo foi (ou deve ser) lido; devolvido por leitura_robusta e reutilizável."""
+    formato: str = "csv"             # 'csv' | 'excel'
+    encoding: Optional[str] = None
+    sep: Optional[str] = None
+    decimal: str = "."
+    header: Optional[int] = 0
+    engine: Optional[str] = None
+    origem: str = "amostra"          # 'amostra' | 'informado' | 'matriz' | 'ignore' | 'excel'
+
+    def descricao(self) -> str:
+        if self.formato == "excel":
+            return "Excel (openpyxl)"
+        sep = {"\t": "TAB", None: "auto"}.get(self.sep, self.sep)
+        cab = "sim" if self.header == 0 else "não"
+        return (f"CSV · encoding {self.encoding} · separador '{sep}' · decimal '{self.decimal}' "
+                f"· cabeçalho {cab} · via {self.origem}")
+
+    def opcoes_read_csv(self) -> dict:
+        return {
+            "sep": self.sep,
+            "encoding": self.encoding,
+            "decimal": self.decimal,
+            "header": self.header,
+            "engine": self.engine or ("c" if self.sep else "python"),
+        }
+
+
+def _parece_excel(bruto: bytes) -> bool:
+    return bruto[:4] in _ASSINATURAS_EXCEL
+
+
+def _amostra_linhas(bruto: bytes, limite: int) -> bytes:
+    """Primeiros 'limite' bytes, cortados na última quebra de linha (não parte caracteres multibyte)."""
+    if len(bruto) <= limite:
+        return bruto
+    corte = bruto.rfind(b"\n", 0, limite)
+    return bruto[: corte + 1] if corte > 0 else bruto[:limite]
+
+
+def _escolher_encoding(amostra: bytes) -> str:
+    """Mesma prioridade da matriz: UTF-8 (com/sem BOM), detectado, latin-1."""
+    if amostra.startswith(b"\xef\xbb\xbf"):
+        return "utf-8-sig"
+    try:
+        amostra.decode("utf-8")
         return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    enc = _detectar_codificacao(amostra)
     try:
-        res = chardet.detect(bruto) or {}
-        enc = res.get("encoding")
-        if enc:
-            return enc
+        amostra.decode(enc)
+        return enc
+    except (LookupError, UnicodeDecodeError):
+        return "latin-1"
+
+
+def _escolher_separador(linhas: list) -> Optional[str]:
+    """Separador cujo número de campos por linha é mais constante (e ≥ 2); empate segue a ordem de _SEPARADORES."""
+    melhor, melhor_nota = None, (0.0, 0)
+    for sep in _SEPARADORES:
+        try:
+            contagens = [len(r) for r in csv.reader(linhas, delimiter=sep) if r]
+        except csv.Error:
+            continue
+        if not contagens:
+            continue
+        moda = max(set(contagens), key=contagens.count)
+        if moda < 2:
+            continue
+        nota = (contagens.count(moda) / len(contagens), moda)
+        if nota > melhor_nota:
+            melhor, melhor_nota = sep, nota
+    return melhor
+
+
+def _escolher_decimal_e_cabecalho(linhas: list, sep: str) -> tuple:
+    linhas_csv = [r for r in csv.reader(linhas, delimiter=sep) if r]
+    if not linhas_csv:
+        return ".", 0
+    primeira, dados = linhas_csv[0], linhas_csv[1:]
+
+    virgula = sum(1 for r in dados for v in r if _RE_DECIMAL_VIRGULA.match(v))
+    ponto = sum(1 for r in dados for v in r if _RE_DECIMAL_PONTO.match(v))
+    decimal = "," if sep != "," and virgula > ponto else "."
+
+    # Sem cabeçalho só quando a 1ª linha é numérica em todas as colunas numéricas dos dados
+    colunas_numericas = [
+        i for i in range(len(primeira))
+        if dados and all(i < len(r) and _RE_NUMERO.match(r[i]) for r in dados)
+    ]
+    sem_cabecalho = bool(colunas_numericas) and all(_RE_NUMERO.match(primeira[i]) for i in colunas_numericas)
+    return decimal, (None if sem_cabecalho else 0)
+
+
+def detectar_dialeto(bruto: bytes, limite_bytes: int = AMOSTRA_DIALETO_BYTES) -> Optional[Dialeto]:
+    """
+    Escolhe encoding, separador, decimal e cabeçalho a partir de uma amostra do início do arquivo.
+    Retorna None se a amostra não parecer um CSV com ≥2 colunas.
+    """
+    if not bruto:
+        return None
+    if _parece_excel(bruto):
+        return Dialeto(formato="excel", origem="excel")
+    amostra = _amostra_linhas(bruto, limite_bytes)
+    encoding = _escolher_encoding(amostra)
+    texto = amostra.decode(encoding, errors="replace")
+    linhas = texto.splitlines()[:200]
+    sep = _escolher_separador(linhas)
+    if sep is None:
+        return None
+    decimal, header = _escolher_decimal_e_cabecalho(linhas, sep)
+    return Dialeto(encoding=encoding, sep=sep, decimal=decimal, header=header, engine="c")
+
+
+def _ler_csv_com_dialeto(bruto: bytes, dialeto: Dialeto, nrows: Optional[int] = None) -> Optional[pd.DataFrame]:
+    try:
+        df = pd.read_csv(io.BytesIO(bruto), nrows=nrows, **dialeto.opcoes_read_csv())
     except Exception:
-        pass
-    return "utf-8"
+        return None
+    return df if df.shape[1] >= 2 else None
 
 
-def _try_read_csv_from_bytes(bruto: bytes, nrows: Optional[int] = None) -> Optional[pd.DataFrame]:
+def _try_read_csv_from_bytes(bruto: bytes, nrows: Optional[int] = None) -> tuple:
     """
-    Tenta ler CSV a partir de bytes usando:
+    Matriz completa (fallback quando a amostra não resolve). Tenta ler CSV a partir de bytes usando:
       - múltiplos encodings: UTF-8/UTF-8-SIG (prioridade), detectado, latin-1, cp1252
       - múltiplos separadores: ';', ',', '\\t', e auto (sep=None)
     Último recurso: encoding_errors='ignore' para não quebrar por caracteres inválidos.
+    Retorna (df, dialeto) ou (None, None).
     """
     enc_detect = _detectar_codificacao(bruto)
     enc_candidates = []
@@ -57,7 +245,7 @@ def _try_read_csv_from_bytes(bruto: bytes, nrows: Optional[int] = None) -> Optio
                 )
                 # Heurística mínima: pelo menos 2 colunas
                 if df.shape[1] >= 2:
-                    return df
+                    return df, Dialeto(encoding=enc, sep=sep, engine="python", origem="matriz")
             except Exception:
                 continue
 
@@ -71,44 +259,80 @@ def _try_read_csv_from_bytes(bruto: bytes, nrows: Optional[int] = None) -> Optio
             encoding="utf-8",
             encoding_errors="ignore",  # pandas >= 1.4
         )
-        return df
+        return df, Dialeto(encoding="utf-8", sep=None, engine="python", origem="ignore")
     except Exception:
-        return None
+        return None, None
 
 
-def leitura_robusta(arquivo_ou_buffer, nrows: Optional[int] = None) -> pd.DataFrame:
+def _capturar_bytes(arquivo_ou_buffer) -> Optional[bytes]:
+    """Bytes de um buffer/file-like, bytes ou caminho de arquivo; None se não for possível."""
+    try:
+        if hasattr(arquivo_ou_buffer, "read"):
+            return arquivo_ou_buffer.read()
+        if isinstance(arquivo_ou_buffer, (bytes, bytearray)):
+            return bytes(arquivo_ou_buffer)
+        if isinstance(arquivo_ou_buffer, (str, os.PathLike)) and os.path.isfile(arquivo_ou_buffer):
+            with open(arquivo_ou_buffer, "rb") as fh:
+                return fh.read()
+    except Exception:
+        pass
+    return None
+
+
+@medido("leitura")
+def leitura_robusta(
+    arquivo_ou_buffer,
+    nrows: Optional[int] = None,
+    dialeto: Optional[Dialeto] = None,
+    retornar_dialeto: bool = False,
+):
     """
     Lê CSV/XLS/XLSX com tratamento de encoding e delimitador.
-    - Se for CSV: tenta múltiplos encodings e separadores; último recurso ignora erros.
+    - Se for CSV: detecta o dialeto numa amostra do início e faz uma única leitura (engine C);
+      a matriz encodings × separadores fica como fallback; último recurso ignora erros.
     - Se for Excel: tenta via openpyxl.
+    - 'dialeto': reaproveita um dialeto já detectado (pula o sniffing).
+    - 'retornar_dialeto=True': retorna (df, dialeto) para exibir/reusar.
     - Mantém compatibilidade com nrows para pré-visualização.
     """
-    bruto = None
-    # Captura bytes se for um buffer/file-like
-    try:
-        if hasattr(arquivo_ou_buffer, "read"):
-            bruto = arquivo_ou_buffer.read()
-        elif isinstance(arquivo_ou_buffer, (bytes, bytearray)):
-            bruto = bytes(arquivo_ou_buffer)
-    except Exception:
-        bruto = None
+    def _retorno(df, d):
+        return (df, d) if retornar_dialeto else df
+
+    bruto = _capturar_bytes(arquivo_ou_buffer)
 
-    # 1) Se temos bytes, tentar como CSV primeiro
+    # 1) Se temos bytes: dialeto informado → dialeto da amostra → matriz completa
     if bruto is not None:
-        df_csv = _try_read_csv_from_bytes(bruto, nrows=nrows)
-        if df_csv is not None:
-            return df_csv
+        excel = _parece_excel(bruto)
+        if not excel:
+            # Dialeto informado primeiro: o sniffing só roda se não houver um ou se ele falhar
+            if dialeto is not None and dialeto.formato == "csv":
+                d = replace(dialeto, origem="informado")
+                df_csv = _ler_csv_com_dialeto(bruto, d, nrows=nrows)
+                if df_csv is not None:
+                    return _retorno(df_csv, d)
+            detectado = detectar_dialeto(bruto)
+            if detectado is not None and detectado.formato == "csv":
+                df_csv = _ler_csv_com_dialeto(bruto, detectado, nrows=nrows)
+                if df_csv is not None:
+                    return _retorno(df_csv, detectado)
+
+            df_csv, d = _try_read_csv_from_bytes(bruto, nrows=nrows)
+            if df_csv is not None:
+                return _retorno(df_csv, d)
 
         # 2) Tentar Excel a partir dos bytes
         try:
-            return pd.read_excel(io.BytesIO(bruto), nrows=nrows, engine="openpyxl")
+            return _retorno(
+                pd.read_excel(io.BytesIO(bruto), nrows=nrows, engine="openpyxl"),
+                Dialeto(formato="excel", origem="excel"),
+            )
         except Exception:
             pass
 
-        # 3) Último fallback CSV com ignore (caso extremo)
-        df_ignore = _try_read_csv_from_bytes(bruto, nrows=nrows)
+        # 3) Último fallback CSV com ignore (caso extremo, ex.: assinatura de Excel num arquivo corrompido)
+        df_ignore, d = _try_read_csv_from_bytes(bruto, nrows=nrows)
         if df_ignore is not None:
-            return df_ignore
+            return _retorno(df_ignore, d)
 
         raise ValueError("Não foi possível ler o arquivo (CSV/Excel) — verifique encoding e formato.")
 
@@ -120,17 +344,20 @@ def leitura_robusta(arquivo_ou_buffer, nrows: Optional[int] = None) -> pd.DataFr
             try:
                 df = pd.read_csv(arquivo_ou_buffer, sep=sep, nrows=nrows, encoding=enc, engine="python")
                 if df.shape[1] >= 2:
-                    return df
+                    return _retorno(df, Dialeto(encoding=enc, sep=sep, engine="python", origem="matriz"))
             except Exception:
                 continue
 
     try:
-        return pd.read_excel(arquivo_ou_buffer, nrows=nrows, engine="openpyxl")
+        return _retorno(
+            pd.read_excel(arquivo_ou_buffer, nrows=nrows, engine="openpyxl"),
+            Dialeto(formato="excel", origem="excel"),
+        )
     except Exception:
         pass
 
     try:
-        return pd.read_csv(
+        df = pd.read_csv(
             arquivo_ou_buffer,
             sep=None,
             nrows=nrows,
@@ -138,15 +365,94 @@ def leitura_robusta(arquivo_ou_buffer, nrows: Optional[int] = None) -> pd.DataFr
             encoding="utf-8",
             encoding_errors="ignore",
         )
+        return _retorno(df, Dialeto(encoding="utf-8", sep=None, engine="python", origem="ignore"))
     except Exception as e:
         raise ValueError(f"Não foi possível ler o arquivo. Último erro: {e}")
 
 
+# -------- Cache de leituras (por conteúdo) --------
+
+
+class CacheLeituras:
+    """
+    LRU de arquivos já lidos, chaveado por (hash do conteúdo, dialeto informado), com teto de memória.
+    - Uma leitura parcial (nrows) fica guardada e é promovida a leitura completa quando pedida.
+    - Pedidos de nrows são atendidos como fatia da leitura completa (ou parcial maior) já em cache.
+    - Sempre devolve cópias: quem chama pode alterar o DataFrame sem corromper o cache.
+    Pensado para viver em st.session_state (um por sessão).
+    """
+
+    def __init__(self, limite_bytes: int = LIMITE_CACHE_LEITURAS_BYTES):
+        self.limite_bytes = limite_bytes
+        self._itens: "OrderedDict[tuple, dict]" = OrderedDict()
+        self.acertos = 0
+        self.leituras = 0
+
+    @staticmethod
+    def _bytes_do_arquivo(arquivo_ou_buffer) -> Optional[bytes]:
+        if hasattr(arquivo_ou_buffer, "getvalue"):
+            return arquivo_ou_buffer.getvalue()
+        if hasattr(arquivo_ou_buffer, "seek"):
+            try:
+                arquivo_ou_buffer.seek(0)
+            except Exception:
+                pass
+        return _capturar_bytes(arquivo_ou_buffer)
+
+    def ler(self, arquivo_ou_buffer, nrows: Optional[int] = None, dialeto: Optional[Dialeto] = None) -> tuple:
+        """Como leitura_robusta(..., retornar_dialeto=True), mas sem reler conteúdos já vistos."""
+        bruto = self._bytes_do_arquivo(arquivo_ou_buffer)
+        if bruto is None:
+            return leitura_robusta(arquivo_ou_buffer, nrows=nrows, dialeto=dialeto, retornar_dialeto=True)
+
+        chave = (hash_conteudo(bruto), dialeto)
+        item = self._itens.get(chave)
+        if item is not None and (item["nrows"] is None or (nrows is not None and nrows <= item["nrows"])):
+            self._itens.move_to_end(chave)
+            self.acertos += 1
+            df = item["df"] if nrows is None else item["df"].head(nrows)
+            return df.copy(), item["dialeto"]
+
+        # Promoção: reaproveita o dialeto da leitura parcial e pula o sniffing
+        dialeto_leitura = item["dialeto"] if item is not None else dialeto
+        df, d = leitura_robusta(bruto, nrows=nrows, dialeto=dialeto_leitura, retornar_dialeto=True)
+        self.leituras += 1
+        self._guardar(chave, {"df": df, "dialeto": d, "nrows": nrows,
+                              "bytes": int(df.memory_usage(index=True, deep=True).sum())})
+        return df.copy(), d
+
+    def dialeto_em_cache(self, bruto: bytes) -> Optional[Dialeto]:
+        """Dialeto já detectado para este conteúdo (para repassar a quem vai ler em outro processo)."""
+        item = self._itens.get((hash_conteudo(bruto), None))
+        return item["dialeto"] if item is not None else None
+
+    def _guardar(self, chave: tuple, item: dict) -> None:
+        self._itens.pop(chave, None)
+        if item["bytes"] > self.limite_bytes:
+            return  # maior que o teto inteiro: não guarda
+        self._itens[chave] = item
+        while self.bytes_em_uso() > self.limite_bytes:
+            self._itens.popitem(last=False)
+
+    def bytes_em_uso(self) -> int:
+        return sum(it["bytes"] for it in self._itens.values())
+
+    def __len__(self) -> int:
+        return len(self._itens)
+
+    def limpar(self) -> None:
+        self._itens.clear()
+
+
+@medido("conversao_decimal")
 def converter_decimal(serie: pd.Series) -> pd.Series:
     """
     Converte strings com vírgula decimal para float.
     Remove separador de milhar e troca vírgula por ponto.
+    Colunas já numéricas (ex.: lidas com decimal=',' ou de Excel) são apenas convertidas para float.
     """
+    if pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+        return serie.astype("float64")
     s = serie.astype(str).str.strip()
     s = s.str.replace("\u00a0", " ")
     s = s.str.replace(".", "", regex=False)      # remove milhares (ponto)
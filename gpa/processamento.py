@@ -1,7 +1,53 @@
+import re
 import pandas as pd
 import numpy as np
-from typing import List
+from typing import Callable, List, Optional, Union
 
+from gpa.diagnostico import medido
+
+# Política para médias que caem entre duas faixas (ex.: 8.95 entre [8.5, 8.9] e [9.0, 10.0])
+POLITICA_LACUNA_INFERIOR = "inferior"  # usa a faixa imediatamente abaixo (trunca a média)
+POLITICA_LACUNA_NAN = "nan"            # comportamento antigo: sem GPA
+POLITICAS_LACUNA = (POLITICA_LACUNA_INFERIOR, POLITICA_LACUNA_NAN)
+
+_TIPOS_AVALIACAO = ("Conclusiva", "P1")  # ordem alfabética = ordem das colunas do unstack antigo
+_COD_TIPO = {"Conclusiva": 0, "P1": 1, "Outro": 2}
+
+
+def _compilar_rotulos(rotulos: List[str]) -> Optional[re.Pattern]:
+    """Uma única alternação (case-insensitive, 'contém') para uma lista de rótulos."""
+    if not rotulos:
+        return None
+    return re.compile("|".join(re.escape(str(lbl).lower()) for lbl in rotulos))
+
+
+def classificador_avaliacao(rotulos_p1: List[str], rotulos_conclusiva: List[str]) -> Callable[[object], str]:
+    """Retorna função avaliação → 'P1' | 'Conclusiva' | 'Outro' (P1 tem prioridade)."""
+    padrao_p1 = _compilar_rotulos(rotulos_p1)
+    padrao_conc = _compilar_rotulos(rotulos_conclusiva)
+
+    def classificar(av) -> str:
+        s = str(av).strip().lower()
+        if padrao_p1 is not None and padrao_p1.search(s):
+            return "P1"
+        if padrao_conc is not None and padrao_conc.search(s):
+            return "Conclusiva"
+        return "Outro"
+
+    return classificar
+
+
+def _codigos_ordenados(col: pd.Series) -> tuple:
+    """Códigos inteiros em ordem de classificação; ausentes vão para o fim (como groupby dropna=False)."""
+    codigos, uniques = pd.factorize(col, sort=True)
+    n = len(uniques)
+    if (codigos < 0).any():
+        codigos = np.where(codigos < 0, n, codigos)
+        n += 1
+    return codigos.astype("int64"), n
+
+
+@medido("media_trimestre", entrada=True)
 def calcular_media_por_trimestre(
     df: pd.DataFrame,
     rotulos_p1: List[str],
@@ -11,30 +57,46 @@ def calcular_media_por_trimestre(
     Calcula Média por (Estudante, Turma, Disciplina, Trimestre) como (P1+Conclusiva)/2.
     df deve conter: Estudante, Turma, Disciplina, Avaliacao, Nota, Trimestre
     rotulos_*: listas de strings para identificar 'P1' e 'Conclusiva' (case-insensitive, contém)
+    A classificação roda uma vez por rótulo distinto e o agrupamento usa códigos inteiros.
     """
-    trab = df.copy()
-
-    def classificar(av: str) -> str:
-        s = str(av).strip().lower()
-        if any(lbl.lower() in s for lbl in rotulos_p1):
-            return "P1"
-        if any(lbl.lower() in s for lbl in rotulos_conclusiva):
-            return "Conclusiva"
-        return "Outro"
+    chaves = ["Estudante", "Turma", "Disciplina", "Trimestre"]
+    classificar = classificador_avaliacao(rotulos_p1, rotulos_conclusiva)
 
-    trab["_tipo"] = trab["Avaliacao"].apply(classificar)
+    # Classifica cada avaliação distinta uma vez e propaga pelos códigos
+    cod_av, uniques_av = pd.factorize(df["Avaliacao"])
+    tipo_por_cod = np.array([_COD_TIPO[classificar(v)] for v in uniques_av] + [_COD_TIPO["Outro"]], dtype="int8")
+    tipo = tipo_por_cod[cod_av]  # código -1 (ausente) cai na última posição
+    if (cod_av < 0).any():
+        ausentes = cod_av < 0
+        tipo[ausentes] = [_COD_TIPO[classificar(v)] for v in df["Avaliacao"].to_numpy()[ausentes]]
 
     # Manter apenas P1 e Conclusiva
-    trab = trab[trab["_tipo"].isin(["P1", "Conclusiva"])]
+    manter = tipo < _COD_TIPO["Outro"]
+    trab = df.loc[manter, chaves + ["Nota"]]
+    tipo = tipo[manter].astype("int64")
+
+    # Chave de grupo inteira (ordem lexicográfica das 4 chaves preservada)
+    grupo = np.zeros(len(trab), dtype="int64")
+    for c in chaves:
+        codigos, n = _codigos_ordenados(trab[c])
+        grupo, _ = pd.factorize(grupo * n + codigos, sort=True)
 
     # Em caso de duplicatas, tira média por tipo
-    agg = (
-        trab
-        .groupby(["Estudante", "Turma", "Disciplina", "Trimestre", "_tipo"], dropna=False)["Nota"]
-        .mean()
-        .unstack("_tipo")
-        .reset_index()
-    )
+    chave_tipo = grupo.astype("int64") * len(_TIPOS_AVALIACAO) + tipo
+    medias = pd.Series(trab["Nota"].to_numpy(), copy=False).groupby(chave_tipo).mean()
+    gid = medias.index.to_numpy() // len(_TIPOS_AVALIACAO)
+    tid = medias.index.to_numpy() % len(_TIPOS_AVALIACAO)
+
+    grupos, primeira_linha = np.unique(grupo, return_index=True)
+    pos = np.searchsorted(grupos, gid)
+    agg = pd.DataFrame({c: trab[c].iloc[primeira_linha].reset_index(drop=True) for c in chaves})
+    for t, nome in enumerate(_TIPOS_AVALIACAO):
+        sel = tid == t
+        if sel.any():
+            valores = np.full(len(grupos), np.nan)
+            valores[pos[sel]] = medias.to_numpy()[sel]
+            agg[nome] = valores
+    agg.columns.name = "_tipo"
 
     agg["P1"] = agg.get("P1")
     agg["Conclusiva"] = agg.get("Conclusiva")
@@ -42,14 +104,109 @@ def calcular_media_por_trimestre(
 
     return agg[["Estudante", "Turma", "Disciplina", "Trimestre", "P1", "Conclusiva", "Media"]]
 
-def aplicar_mapeamento_gpa(df_medias: pd.DataFrame, tabela_map: pd.DataFrame, escala: str = "auto") -> pd.DataFrame:
+class MapeamentoGPA:
+    """
+    Tabela Média→GPA compilada em segmentos disjuntos e ordenados.
+    Construída uma vez por tabela; rotula uma Series inteira com um único np.searchsorted.
+    - Faixas sobrepostas: vale a primeira em ordem (min, max), como no mapeamento por linha.
+    - Lacunas entre faixas: resolvidas por 'politica_lacunas' ('inferior' ou 'nan').
+    - Valores abaixo da menor faixa ou acima da maior ficam sem GPA (NaN).
+    Após a construção, 'sobreposicoes', 'lacunas' e 'descartadas' descrevem os problemas da tabela.
+    """
+
+    def __init__(self, tabela_map: pd.DataFrame, politica_lacunas: str = POLITICA_LACUNA_INFERIOR):
+        if politica_lacunas not in POLITICAS_LACUNA:
+            raise ValueError(f"Política de lacunas inválida: {politica_lacunas!r} (use {POLITICAS_LACUNA})")
+        self.politica_lacunas = politica_lacunas
+        self.sobreposicoes = []  # [(faixa_a, faixa_b)] como tuplas (min, max)
+        self.lacunas = []        # [(max_anterior, min_seguinte)]
+        self.descartadas = []    # faixas sem min/max válidos ou com min > max
+
+        mapa = tabela_map[["min", "max", "gpa"]].apply(pd.to_numeric, errors="coerce")
+        mapa = mapa.sort_values(["min", "max"]).reset_index(drop=True)
+
+        inicios, fins, gpas = [], [], []
+        cobertura = -np.inf  # maior 'max' já coberto
+        anterior = None
+        for lo, hi, gpa in mapa.itertuples(index=False, name=None):
+            if pd.isna(lo) or pd.isna(hi) or lo > hi:
+                self.descartadas.append((lo, hi))
+                continue
+            if anterior is not None:
+                if lo <= cobertura:
+                    self.sobreposicoes.append((anterior, (lo, hi)))
+                else:
+                    self.lacunas.append((cobertura, lo))
+            inicio = lo if lo > cobertura else np.nextafter(cobertura, np.inf)
+            if inicio <= hi:
+                inicios.append(inicio)
+                fins.append(hi)
+                gpas.append(gpa)
+            if hi > cobertura:
+                cobertura = hi
+                anterior = (lo, hi)
+
+        self._inicios = np.asarray(inicios, dtype="float64")
+        self._fins = np.asarray(fins, dtype="float64")
+        self._gpas = np.asarray(gpas, dtype="float64")
+
+    def __len__(self) -> int:
+        return len(self._inicios)
+
+    def avisos(self) -> List[str]:
+        """Mensagens legíveis sobre faixas sobrepostas, lacunas e linhas descartadas."""
+        msgs = []
+        for a, b in self.sobreposicoes:
+            msgs.append(f"Faixas sobrepostas: [{a[0]}, {a[1]}] e [{b[0]}, {b[1]}] (vale a primeira)")
+        for hi, lo in self.lacunas:
+            destino = "faixa inferior" if self.politica_lacunas == POLITICA_LACUNA_INFERIOR else "sem GPA"
+            msgs.append(f"Lacuna entre {hi} e {lo} ({destino})")
+        for lo, hi in self.descartadas:
+            msgs.append(f"Faixa ignorada (min/max inválidos): [{lo}, {hi}]")
+        return msgs
+
+    def mapear(self, medias: pd.Series) -> pd.Series:
+        """Retorna a Series de GPA (float) alinhada ao índice de 'medias'."""
+        x = pd.to_numeric(medias, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+        out = np.full(x.shape, np.nan)
+        if len(self._inicios) == 0:
+            return pd.Series(out, index=medias.index, name="GPA")
+
+        idx = np.searchsorted(self._inicios, x, side="right") - 1
+        validos = (idx >= 0) & ~np.isnan(x)
+        idx_ok = np.where(validos, idx, 0)
+        dentro = validos & (x <= self._fins[idx_ok])
+        if self.politica_lacunas == POLITICA_LACUNA_INFERIOR:
+            # Acima do fim do segmento, mas ainda antes do próximo: lacuna → faixa inferior
+            dentro |= validos & (idx < len(self._inicios) - 1)
+        out[dentro] = self._gpas[idx_ok[dentro]]
+        return pd.Series(out, index=medias.index, name="GPA")
+
+
+def compilar_mapeamento_gpa(tabela_map: pd.DataFrame, politica_lacunas: str = POLITICA_LACUNA_INFERIOR) -> MapeamentoGPA:
+    """Compila a tabela (colunas min, max, gpa) para uso repetido em aplicar_mapeamento_gpa."""
+    return MapeamentoGPA(tabela_map, politica_lacunas=politica_lacunas)
+
+
+@medido("mapeamento_gpa")
+def aplicar_mapeamento_gpa(
+    df_medias: pd.DataFrame,
+    tabela_map: Union[pd.DataFrame, MapeamentoGPA],
+    escala: str = "auto",
+    politica_lacunas: str = POLITICA_LACUNA_INFERIOR,
+) -> pd.DataFrame:
     """
     Aplica tabela de Média→GPA (faixas inclusivas [min, max]).
-    - tabela_map deve ter colunas: min, max, gpa
+    - tabela_map: DataFrame com colunas min, max, gpa, ou um MapeamentoGPA já compilado
+      (neste caso 'politica_lacunas' é ignorada e vale a do objeto)
     - 'escala' pode ser: 'auto', '0-10', '0-100'
     - Se '0-100' (ou detectar >10 em 'auto'), cria 'MediaPadronizada' = Media/10 para mapear no range 0–10.
+    - 'politica_lacunas': 'inferior' (média entre faixas recebe a faixa abaixo) ou 'nan'
     """
-    mapa = tabela_map.sort_values(["min", "max"]).reset_index(drop=True)
+    if isinstance(tabela_map, MapeamentoGPA):
+        mapa = tabela_map
+    else:
+        mapa = compilar_mapeamento_gpa(tabela_map, politica_lacunas=politica_lacunas)
 
     out = df_medias.copy()
 
@@ -66,13 +223,5 @@ def aplicar_mapeamento_gpa(df_medias: pd.DataFrame, tabela_map: pd.DataFrame, es
     else:
         out["MediaPadronizada"] = out["Media"]
 
-    def media_para_gpa(x: float):
-        if pd.isna(x):
-            return np.nan
-        linha = mapa[(mapa["min"] <= x) & (x <= mapa["max"])].head(1)
-        if not linha.empty:
-            return float(linha.iloc[0]["gpa"])
-        return np.nan
-
-    out["GPA"] = out["MediaPadronizada"].apply(media_para_gpa)
+    out["GPA"] = mapa.mapear(out["MediaPadronizada"])
     return out
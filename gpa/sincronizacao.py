@@ -0,0 +1,118 @@
+# gpa/sincronizacao.py — Sincronização GitHub → ./data por SHA de blob (só baixa o que difere), em paralelo
+import os
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional
+
+from gpa.diagnostico import no_contexto
+
+ACAO_NOVO = "novo"
+ACAO_ALTERADO = "alterado"
+ACAO_IGUAL = "igual"
+_BLOCO_HASH = 1 << 20
+
+# caminho → (tamanho, mtime_ns, sha): evita re-hashear arquivos locais que não mudaram entre sincronizações
+_CACHE_SHA: Dict[str, tuple] = {}
+_CACHE_LOCK = threading.Lock()
+
+
+def git_blob_sha(caminho: str) -> str:
+    """SHA-1 do objeto blob do git (o mesmo 'sha' da contents API), lido em blocos."""
+    st_ = os.stat(caminho)
+    with _CACHE_LOCK:
+        em_cache = _CACHE_SHA.get(caminho)
+    if em_cache and em_cache[:2] == (st_.st_size, st_.st_mtime_ns):
+        return em_cache[2]
+    h = hashlib.sha1(b"blob %d\0" % st_.st_size)
+    with open(caminho, "rb") as fh:
+        for bloco in iter(lambda: fh.read(_BLOCO_HASH), b""):
+            h.update(bloco)
+    sha = h.hexdigest()
+    with _CACHE_LOCK:
+        _CACHE_SHA[caminho] = (st_.st_size, st_.st_mtime_ns, sha)
+    return sha
+
+
+def eh_processado_remoto(item: dict) -> bool:
+    nome = item.get("name") or ""
+    return item.get("type") == "file" and nome.startswith("processado_") and nome.endswith(".csv")
+
+
+def planejar_sincronizacao(itens_remotos: List[dict], pasta_local: str,
+                           filtro: Callable[[dict], bool] = eh_processado_remoto) -> List[dict]:
+    """
+    Compara os itens de gh_list_dir com a pasta local. Retorna um plano por arquivo:
+      {'nome', 'path', 'local', 'acao' ('novo'|'alterado'|'igual'), 'sha', 'tamanho'}
+    """
+    plano = []
+    for it in itens_remotos:
+        if not filtro(it):
+            continue
+        local = os.path.join(pasta_local, it["name"])
+        if not os.path.isfile(local):
+            acao = ACAO_NOVO
+        elif it.get("sha") and git_blob_sha(local) == it["sha"]:
+            acao = ACAO_IGUAL
+        else:
+            acao = ACAO_ALTERADO
+        plano.append({"nome": it["name"], "path": it.get("path") or it["name"], "local": local,
+                      "acao": acao, "sha": it.get("sha"), "tamanho": it.get("size") or 0})
+    return plano
+
+
+def resumo_plano(plano: List[dict]) -> dict:
+    pendentes = [p for p in plano if p["acao"] != ACAO_IGUAL]
+    return {
+        "novos": sum(p["acao"] == ACAO_NOVO for p in plano),
+        "alterados": sum(p["acao"] == ACAO_ALTERADO for p in plano),
+        "iguais": sum(p["acao"] == ACAO_IGUAL for p in plano),
+        "bytes_a_baixar": sum(p["tamanho"] for p in pendentes),
+    }
+
+
+def _baixar_um(item: dict, baixar) -> tuple:
+    tmp = f"{item['local']}.sync-{threading.get_ident()}.tmp"
+    try:
+        ok, msg = baixar(item["path"], tmp)
+        if not ok:
+            return False, msg
+        if item.get("sha") and git_blob_sha(tmp) != item["sha"]:
+            return False, "conteúdo baixado não confere com o SHA remoto"
+        os.replace(tmp, item["local"])
+        return True, "OK"
+    except Exception as e:
+        return False, str(e)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        with _CACHE_LOCK:
+            _CACHE_SHA.pop(tmp, None)
+
+
+def sincronizar(plano: List[dict], baixar, max_trabalhadores: int = 8,
+                progresso: Optional[Callable[[int, int, dict, bool, str], None]] = None) -> dict:
+    """
+    Baixa os itens 'novo'/'alterado' do plano num pool de threads limitado.
+    'baixar(path_rel, local_path)' segue gpa.github_api (retorna (ok, msg)); cada arquivo vai para um .tmp
+    conferido pelo SHA e só então substitui o local. progresso(feitos, total, item, ok, msg) a cada arquivo.
+    Retorna {'baixados', 'falhas': [(nome, msg)], 'iguais'}.
+    """
+    pendentes = [p for p in plano if p["acao"] != ACAO_IGUAL]
+    out = {"baixados": 0, "falhas": [], "iguais": len(plano) - len(pendentes)}
+    if not pendentes:
+        return out
+    os.makedirs(os.path.dirname(pendentes[0]["local"]) or ".", exist_ok=True)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_trabalhadores, len(pendentes)))) as pool:
+        baixar_um = no_contexto(_baixar_um)  # as threads do pool medem na coleta de quem chamou
+        futuros = {pool.submit(baixar_um, p, baixar): p for p in pendentes}
+        for feitos, fut in enumerate(as_completed(futuros), start=1):
+            item = futuros[fut]
+            ok, msg = fut.result()
+            if ok:
+                out["baixados"] += 1
+            else:
+                out["falhas"].append((item["nome"], msg))
+            if progresso:
+                progresso(feitos, len(pendentes), item, ok, msg)
+    return out
@@ -0,0 +1,78 @@
+# gpa/tabela.py — Tabela filtrada do dashboard: ordenação preguiçosa, paginação e exportação sob demanda
+import hashlib
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from gpa.dados import floats_para_exibicao
+from gpa.exportacao import FORMATO_CSV, exportar_para_bytes
+
+COLUNAS_TABELA = ["Serie", "Turma", "Estudante", "Disciplina", "Trimestre", "P1", "Conclusiva", "Media", "GPA"]
+ORDEM_TABELA = ["Serie", "Turma", "Estudante", "Disciplina", "Trimestre"]
+TAMANHOS_PAGINA = [50, 100, 250, 500, 1000]
+
+
+def assinatura_filtros(versao, selecoes: dict) -> str:
+    """Chave estável de (versão dos dados, seleções de cada filtro)."""
+    partes = [repr(versao)] + [f"{k}={sorted(map(str, v or []))!r}" for k, v in sorted(selecoes.items())]
+    return hashlib.blake2b("\x1f".join(partes).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _codigos_ordenacao(serie: pd.Series) -> np.ndarray:
+    """Códigos inteiros com a mesma ordem de sort_values (categorias na ordem delas, ausentes por último)."""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        codigos = serie.cat.codes.to_numpy().astype(np.int64)
+        n = len(serie.cat.categories)
+    else:
+        codigos, uniques = pd.factorize(serie, sort=True)
+        codigos = codigos.astype(np.int64)
+        n = len(uniques)
+    return np.where(codigos < 0, n, codigos)
+
+
+class TabelaPaginada:
+    """
+    Visão da tabela filtrada. A ordem das linhas (np.lexsort sobre códigos) é calculada na primeira
+    página pedida; cada página materializa só as suas linhas. O CSV é gerado uma vez, quando pedido.
+    """
+
+    def __init__(self, df: pd.DataFrame, assinatura: str = "",
+                 colunas: Sequence[str] = COLUNAS_TABELA, ordem: Sequence[str] = ORDEM_TABELA):
+        self.df = df
+        self.assinatura = assinatura
+        self.colunas = list(colunas)
+        self.ordem_colunas = [c for c in ordem if c in df.columns]
+        self._ordem: Optional[np.ndarray] = None
+        self._csv: Optional[bytes] = None
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def ordem(self) -> np.ndarray:
+        if self._ordem is None:
+            if self.ordem_colunas and len(self.df):
+                # lexsort: a última chave é a primária
+                chaves = [_codigos_ordenacao(self.df[c]) for c in reversed(self.ordem_colunas)]
+                self._ordem = np.lexsort(chaves)
+            else:
+                self._ordem = np.arange(len(self.df))
+        return self._ordem
+
+    def total_paginas(self, tamanho: int) -> int:
+        return max(1, -(-len(self) // max(1, tamanho)))
+
+    def pagina(self, numero: int, tamanho: int) -> pd.DataFrame:
+        """Página 'numero' (1-based) já ordenada e pronta para exibição."""
+        numero = min(max(1, numero), self.total_paginas(tamanho))
+        pos = self.ordem()[(numero - 1) * tamanho:numero * tamanho]
+        return floats_para_exibicao(self.df.take(pos).reindex(columns=self.colunas))
+
+    def csv_gerado(self) -> Optional[bytes]:
+        return self._csv
+
+    def exportar_csv(self) -> bytes:
+        """Tabela inteira ordenada em CSV (UTF-8 com BOM); gerado uma única vez por assinatura."""
+        if self._csv is None:
+            self._csv = exportar_para_bytes(self.df, FORMATO_CSV, posicoes=self.ordem(), colunas=self.colunas)
+        return self._csv
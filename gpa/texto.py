@@ -0,0 +1,155 @@
+# gpa/texto.py — Normalização de textos (mojibake) e inferência de Série/Turma/Trimestre
+import os
+import re
+import numpy as np
+import pandas as pd
+
+_MOJIBAKE_TOKENS = ("Ã", "Â", "�")
+_RE_MOJIBAKE = "|".join(_MOJIBAKE_TOKENS)
+_COLUNAS_TEXTO = ("Disciplina", "Avaliacao", "Turma", "Estudante")
+
+def _fix_mojibake(text):
+    if not isinstance(text, str):
+        return text
+    if any(tok in text for tok in _MOJIBAKE_TOKENS):
+        try:
+            return text.encode("latin-1").decode("utf-8")
+        except Exception:
+            return text
+    return text
+
+def _coluna_ja_normalizada(serie: pd.Series) -> bool:
+    """True se todos os valores distintos já são texto sem mojibake e sem espaços nas pontas."""
+    if serie.dtype != object:
+        return False
+    textos = pd.Series(pd.unique(serie), dtype=object)
+    if pd.api.types.infer_dtype(textos, skipna=False) != "string":
+        return False  # ausentes ou não-texto: ainda precisam virar str
+    return not textos.str.contains(_RE_MOJIBAKE, regex=True).any() and textos.str.strip().eq(textos).all()
+
+def _normalizar_coluna_texto(serie: pd.Series) -> np.ndarray:
+    """Equivale a astype(str).map(_fix_mojibake).str.strip(), mas roda uma vez por valor distinto."""
+    codigos, uniques = pd.factorize(serie)
+    textos = pd.Series(uniques.astype(str), dtype=object)
+    suspeitos = textos.str.contains(_RE_MOJIBAKE, regex=True).to_numpy()
+    if suspeitos.any():
+        textos[suspeitos] = textos[suspeitos].map(_fix_mojibake)
+    corrigidos = textos.str.strip().to_numpy(dtype=object)
+    out = corrigidos.take(np.where(codigos < 0, 0, codigos)) if len(corrigidos) else np.empty(len(serie), dtype=object)
+    if (codigos < 0).any():
+        # Ausentes viram o texto que astype(str) daria ('nan', 'None', '<NA>'), como antes
+        ausentes = codigos < 0
+        out[ausentes] = serie[ausentes].astype(str).map(_fix_mojibake).str.strip().to_numpy(dtype=object)
+    return out
+
+def normalizar_textos_df(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converte Disciplina/Avaliacao/Turma/Estudante para texto, corrige mojibake e remove espaços.
+    A correção roda por valor distinto; colunas cujos valores distintos já estão limpos não são regravadas.
+    """
+    cols = [c for c in _COLUNAS_TEXTO if c in df.columns]
+    for c in cols:
+        if not _coluna_ja_normalizada(df[c]):
+            df[c] = _normalizar_coluna_texto(df[c])
+    return df
+
+def _norm_text(s: str) -> str:
+    return re.sub(r"\s+", " ", s.replace("º", "").strip()) if isinstance(s, str) else ""
+
+def extrair_serie_de_texto_turma(txt: str) -> str | None:
+    s = _norm_text(txt).lower()
+    m = re.search(r"\b(\d{1,2})\s*ano\b", s)
+    if m:
+        return f"{int(m.group(1))}º ano"
+    m = re.search(r"\b(\d{1,2})\b", s)
+    if m:
+        return f"{int(m.group(1))}º ano"
+    return None
+
+def extrair_turma_letra_de_texto_turma(txt: str) -> str | None:
+    s = _norm_text(txt).upper()
+    m = re.search(r"\b\d{1,2}\D*([A-Z])\b", s)
+    if m and m.group(1) != "I":
+        return m.group(1)
+    letras = re.findall(r"\b([A-Z])\b", s)
+    for c in letras:
+        if c != "I":
+            return c
+    return None
+
+_ROMAN = {"i": 1, "ii": 2, "iii": 3}
+
+def parse_filename_metadata(fname: str):
+    base = os.path.basename(fname)
+    s = _norm_text(base)
+    slow = s.lower()
+
+    # Série
+    serie = None
+    m = re.search(r"\b(\d{1,2})\s*ano\b", slow)
+    if m:
+        serie = f"{int(m.group(1))}º ano"
+    else:
+        m = re.search(r"\b(\d{1,2})\b", slow)
+        if m:
+            serie = f"{int(m.group(1))}º ano"
+
+    # Trimestre
+    trimestre = None
+    m = re.search(r"\b([ivx]{1,3})\s*tri", slow)
+    if m:
+        trimestre = _ROMAN.get(m.group(1), None)
+    if trimestre is None:
+        m = re.search(r"\b([123])(?:º)?\s*tri", slow)
+        if m:
+            trimestre = int(m.group(1))
+
+    # Turma
+    turma = None
+    m = re.search(r"\b\d{1,2}\D*([A-Z])\s*[-–—]", s.upper())
+    if m and m.group(1) != "I":
+        turma = m.group(1)
+    if turma is None:
+        letras = re.findall(r"\b([A-Z])\b", s.upper())
+        for L in letras:
+            if L != "I":
+                turma = L
+                break
+
+    return serie, turma, trimestre
+
+def inferir_serie_turma_trimestre(df: pd.DataFrame, col_turma: str, fname: str,
+                                  trimestre_ui: int | None):
+    # Conteúdo
+    serie_txt = None
+    turma_letra = None
+    if col_turma in df.columns:
+        valores = df[col_turma].dropna().astype(str)
+        poss_series = valores.apply(extrair_serie_de_texto_turma).dropna()
+        if not poss_series.empty:
+            serie_txt = poss_series.mode().iloc[0]
+        poss_turmas = valores.apply(extrair_turma_letra_de_texto_turma).dropna()
+        if not poss_turmas.empty:
+            turma_letra = poss_turmas.mode().iloc[0]
+
+    # Nome do arquivo
+    serie_fname, turma_fname, trimestre_fname = parse_filename_metadata(fname)
+
+    # Fusão
+    serie_final = serie_txt or serie_fname
+    turma_final = turma_letra or turma_fname
+
+    # Trimestre
+    if "Trimestre" in df.columns and df["Trimestre"].notna().any():
+        try:
+            tri_val = int(pd.to_numeric(df["Trimestre"], errors="coerce").mode().iloc[0])
+        except Exception:
+            tri_val = None
+    else:
+        tri_val = None
+    if tri_val is None:
+        tri_val = trimestre_fname if trimestre_fname in (1, 2, 3) else None
+    if tri_val is None:
+        tri_val = trimestre_ui if trimestre_ui in (1, 2, 3) else None
+
+    return serie_final, turma_final, tri_val
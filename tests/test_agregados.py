@@ -0,0 +1,69 @@
+# tests/test_agregados.py — AgregadosGPA: lote com uma reagregação e resultado igual ao agregado direto
+import numpy as np
+import pandas as pd
+import pytest
+
+import gpa.agregados as ag
+
+
+def _arquivo(semente: int, turma: str) -> pd.DataFrame:
+    rng = np.random.default_rng(semente)
+    n = 60
+    return pd.DataFrame({
+        "Serie": "8º ano", "Turma": turma, "Estudante": [f"E{i % 10}" for i in range(n)],
+        "Disciplina": rng.choice(["Arte", "Matemática", "Português"], n), "Trimestre": rng.integers(1, 4, n),
+        "Media": rng.uniform(0, 10, n).round(1), "GPA": rng.choice([1.0, 2.0, 3.0, 4.0, np.nan], n),
+    })
+
+
+def _comparar(agregados: ag.AgregadosGPA, frames: list) -> None:
+    esperado = ag.agregar_linhas(pd.concat(frames, ignore_index=True))
+    obtido = agregados.tabela()
+    cols = [c for c in esperado.columns if c not in ag.DIMENSOES_AGREGADO]
+    assert len(obtido) == len(esperado)
+    np.testing.assert_allclose(obtido[cols].to_numpy(float), esperado[cols].to_numpy(float))
+
+
+@pytest.fixture
+def reagregacoes(monkeypatch):
+    chamadas = []
+    original = ag.reagregar
+
+    def contar(df, grao):
+        chamadas.append(len(df))
+        return original(df, grao)
+
+    monkeypatch.setattr(ag, "reagregar", contar)
+    return chamadas
+
+
+def test_carga_fria_reagrega_uma_vez(reagregacoes):
+    arquivos = {f"f{i}": _arquivo(i, "AB"[i % 2]) for i in range(12)}
+    agregados = ag.AgregadosGPA()
+    agregados.atualizar(arquivos)
+    assert len(reagregacoes) == 1
+    _comparar(agregados, list(arquivos.values()))
+
+
+def test_substituir_e_remover_no_mesmo_lote(reagregacoes):
+    arquivos = {f"f{i}": _arquivo(i, "AB"[i % 2]) for i in range(6)}
+    agregados = ag.AgregadosGPA()
+    agregados.atualizar(arquivos)
+    reagregacoes.clear()
+    arquivos["f1"] = _arquivo(99, "B")
+    agregados.atualizar({"f1": arquivos["f1"], "f6": _arquivo(6, "C")}, removidos=["f2", "f4"])
+    arquivos.update({"f6": _arquivo(6, "C")})
+    del arquivos["f2"], arquivos["f4"]
+    assert len(reagregacoes) == 1
+    _comparar(agregados, list(arquivos.values()))
+
+
+def test_adicionar_e_remover_um_a_um():
+    agregados = ag.AgregadosGPA()
+    a, b = _arquivo(1, "A"), _arquivo(2, "A")
+    agregados.adicionar("a", a)
+    agregados.adicionar("b", b)
+    agregados.remover("a")
+    _comparar(agregados, [b])
+    agregados.remover("b")
+    assert agregados.tabela().empty
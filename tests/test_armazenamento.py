@@ -0,0 +1,46 @@
+# tests/test_armazenamento.py — Parquet particionado: migração igual ao modo CSV, seleção vazia não filtra
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from gpa.armazenamento import carregar_processados_parquet, listar_particoes, migrar_csvs_para_parquet
+from gpa.dados import carregar_todos_processados
+
+COLUNAS = ["Estudante", "Turma", "Disciplina", "Trimestre", "P1", "Conclusiva", "Media", "GPA"]
+
+
+def _ordenado(df):
+    df = df[COLUNAS + ["Serie"]].astype({c: object for c in ["Estudante", "Turma", "Disciplina", "Serie"]})
+    return df.sort_values(["Estudante", "Disciplina", "Trimestre"]).reset_index(drop=True)
+
+
+@pytest.fixture
+def pasta(tmp_path):
+    df = pd.DataFrame({
+        "Estudante": ["ANA", "BRUNO", "CAIO"],
+        "Turma": ["6º ANO A", "6º ANO A", "7º ANO B"],
+        "Disciplina": ["MatemÃ¡tica", "MatemÃ¡tica", "HistÃ³ria"],  # mojibake corrigido na leitura
+        "Trimestre": [1, 2, 1],
+        "P1": [7.0, 8.0, 9.0], "Conclusiva": [8.0, 9.0, 10.0], "Media": [7.5, 8.5, 9.5], "GPA": [3.0, 3.3, 4.0],
+        "Serie": ["", "", ""],  # derivada da Turma na leitura
+    })
+    df.to_csv(tmp_path / "processado_export_20250101-000000.csv", index=False, encoding="utf-8-sig")
+    return tmp_path
+
+
+def test_migracao_igual_ao_modo_csv(pasta):
+    assert migrar_csvs_para_parquet(str(pasta), log=lambda msg: None) == 1
+    raiz = str(pasta / "parquet")
+    assert sorted(listar_particoes(raiz)["Serie"]) == ["6º ano", "6º ano", "7º ano"]
+    pd.testing.assert_frame_equal(
+        _ordenado(carregar_processados_parquet(raiz)), _ordenado(carregar_todos_processados(str(pasta))),
+        check_dtype=False, check_categorical=False,
+    )
+
+
+def test_selecao_vazia_nao_filtra(pasta):
+    migrar_csvs_para_parquet(str(pasta), log=lambda msg: None)
+    raiz = str(pasta / "parquet")
+    assert len(carregar_processados_parquet(raiz, series=[], turmas=(), trimestres=None)) == 3
+    assert len(carregar_processados_parquet(raiz, series=[], turmas=["7º ANO B"], trimestres=[])) == 1
@@ -0,0 +1,96 @@
+# tests/test_compactacao.py — Compactação "última versão vence" e espelho no GitHub (um commit, tudo ou nada)
+import os
+
+import pandas as pd
+
+from gpa.compactacao import compactar_processados, espelhar_no_github
+
+RELATORIO = [
+    {"mantido": "data/processado_8A_20250102-000000.csv",
+     "removidos": ["data/processado_8A_20250101-000000.csv", "data/processado_8A_20241231-000000.csv"]},
+    {"mantido": "data/processado_8B_20250102-000000.csv", "removidos": ["data/processado_8B_20250101-000000.csv"]},
+]
+
+
+def test_um_unico_commit():
+    chamadas = []
+
+    def commit_batch(envios, exclusoes, message=None):
+        chamadas.append((list(envios), list(exclusoes)))
+        return True, "abc1234"
+
+    assert espelhar_no_github(RELATORIO, commit_batch) == (2, 3)
+    assert len(chamadas) == 1
+    envios, exclusoes = chamadas[0]
+    assert [rel for _, rel in envios] == ["data/processado_8A_20250102-000000.csv",
+                                          "data/processado_8B_20250102-000000.csv"]
+    assert len(exclusoes) == 3
+
+
+def test_falha_nao_conta_nada():
+    erros = []
+    res = espelhar_no_github(RELATORIO, lambda e, x, message=None: (False, "409"), log=erros.append)
+    assert res == (0, 0) and len(erros) == 1
+
+
+def test_caminho_repo():
+    vistos = []
+
+    def commit_batch(envios, exclusoes, message=None):
+        vistos.extend([rel for _, rel in envios] + list(exclusoes))
+        return True, "abc1234"
+
+    espelhar_no_github(RELATORIO[1:], commit_batch, caminho_repo=lambda c: "remoto/" + c.split("/")[-1])
+    assert all(v.startswith("remoto/processado_8B") for v in vistos)
+
+
+def _gravar(pasta, nome, linhas):
+    df = pd.DataFrame(linhas, columns=["Estudante", "Turma", "Disciplina", "Trimestre", "GPA", "Serie"])
+    caminho = pasta / nome
+    df.to_csv(caminho, index=False, encoding="utf-8-sig")
+    return str(caminho)
+
+
+
+def test_homonimos_na_versao_mais_nova_ficam(tmp_path):
+    _gravar(tmp_path, "processado_8A_20250101-080000.csv", [("JOÃO", "8A", "Matemática", 1, 1.0, "8º ano")])
+    novo = _gravar(tmp_path, "processado_8A_20250102-080000.csv", [
+        ("JOÃO", "8A", "Matemática", 1, 3.0, "8º ano"),
+        ("JOÃO", "8A", "Matemática", 1, 2.3, "8º ano"),
+    ])
+    (r,) = compactar_processados(str(tmp_path))
+    assert r["linhas_depois"] == 2
+    assert sorted(pd.read_csv(novo)["GPA"]) == [2.3, 3.0]
+
+def test_compactar_mantem_versao_mais_nova(tmp_path):
+    antigo = _gravar(tmp_path, "processado_8A - I TRI_20250101-080000.csv", [
+        ("ANA", "8A", "Matemática", 1, 2.0, "8º ano"),
+        ("CARLOS", "8A", "Matemática", 1, 3.0, "8º ano"),  # só na versão antiga: fica
+    ])
+    novo = _gravar(tmp_path, "processado_8A - I TRI_20250102-080000.csv", [
+        ("ANA", "8A", "Matemática", 1, 3.7, "8º ano"),
+        ("JOÃO", "8A", "Matemática", 1, 3.0, "8º ano"),  # homônimos na mesma turma: as duas linhas ficam
+        ("JOÃO", "8A", "Matemática", 1, 2.3, "8º ano"),
+    ])
+    outro = _gravar(tmp_path, "processado_8B - I TRI_20250101-080000.csv", [
+        ("BIA", "8B", "Matemática", 1, 4.0, "8º ano"),
+    ])
+
+    relatorio = compactar_processados(str(tmp_path))
+
+    assert len(relatorio) == 1
+    r = relatorio[0]
+    assert r["mantido"] == novo and r["removidos"] == [antigo]
+    assert r["linhas_antes"] == 5 and r["linhas_depois"] == 4
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(c) for c in (novo, outro))
+    final = pd.read_csv(novo).sort_values(["Estudante", "GPA"]).reset_index(drop=True)
+    assert list(zip(final["Estudante"], final["GPA"])) == [("ANA", 3.7), ("CARLOS", 3.0), ("JOÃO", 2.3), ("JOÃO", 3.0)]
+
+
+def test_compactar_simular_nao_grava(tmp_path):
+    _gravar(tmp_path, "processado_8A_20250101-080000.csv", [("ANA", "8A", "Matemática", 1, 2.0, "8º ano")])
+    _gravar(tmp_path, "processado_8A_20250102-080000.csv", [("ANA", "8A", "Matemática", 1, 3.7, "8º ano")])
+    antes = {n: (tmp_path / n).read_bytes() for n in os.listdir(tmp_path)}
+    (r,) = compactar_processados(str(tmp_path), simular=True)
+    assert r["linhas_depois"] == 1
+    assert {n: (tmp_path / n).read_bytes() for n in os.listdir(tmp_path)} == antes
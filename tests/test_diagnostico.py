@@ -0,0 +1,89 @@
+# tests/test_diagnostico.py — Coletas isoladas por contexto (sessões/threads) e propagação explícita
+import threading
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from gpa.diagnostico import coletar, etapa, medido, no_contexto
+
+
+@medido("soma")
+def _soma(xs):
+    return [sum(xs)]
+
+
+def _em_thread(func):
+    out = {}
+    t = threading.Thread(target=lambda: out.setdefault("r", func()))
+    t.start()
+    t.join()
+    return out["r"]
+
+
+def test_desligado_nao_registra():
+    with coletar() as regs:
+        with etapa("x"):
+            _soma([1, 2])
+    assert regs == []
+
+
+def test_sessoes_nao_se_misturam():
+    pronto_a, fim_b = threading.Event(), threading.Event()
+
+    def sessao_b():
+        pronto_a.wait()
+        with coletar(ligar=False) as regs_b:  # B abre a sua coleta (desligada) durante a de A
+            with etapa("b"):
+                _soma([3])
+        with etapa("b_fora"):
+            pass
+        fim_b.set()
+        return regs_b
+
+    with ThreadPoolExecutor(1) as pool:
+        futuro_b = pool.submit(sessao_b)
+        with coletar(ligar=True, memoria=False) as regs_a:
+            pronto_a.set()
+            fim_b.wait()
+            with etapa("a"):
+                _soma([1])
+        assert futuro_b.result() == []
+    assert [r["etapa"] for r in regs_a] == ["soma", "a"]
+
+
+def test_thread_de_pool_precisa_de_no_contexto():
+    def trabalho(i):
+        with etapa("t", arquivo=str(i)):
+            pass
+
+    with coletar(ligar=True, memoria=False) as regs:
+        with ThreadPoolExecutor(2) as pool:
+            list(pool.map(trabalho, range(2)))               # sem propagação: outra coleta (nenhuma)
+            list(pool.map(no_contexto(trabalho), range(3)))  # com propagação: coleta de quem chamou
+    assert sorted(r["arquivo"] for r in regs) == ["0", "1", "2"]
+
+
+def test_aninhada_recebe_o_seu_trecho():
+    with coletar(ligar=True, memoria=False) as externa:
+        with coletar() as interna:  # herda 'ligada'
+            with etapa("dentro"):
+                pass
+        with etapa("fora"):
+            pass
+    assert [r["etapa"] for r in interna] == ["dentro"]
+    assert [r["etapa"] for r in externa] == ["fora"]
+
+
+def test_tracemalloc_liberado_so_pelo_ultimo():
+    assert not tracemalloc.is_tracing()
+
+    def outra_sessao():
+        with coletar(ligar=True):
+            pass
+        return tracemalloc.is_tracing()
+
+    with coletar(ligar=True) as regs:
+        assert _em_thread(outra_sessao)  # a outra sessão terminou, mas esta ainda mede memória
+        with etapa("m"):
+            bytearray(1 << 20)
+    assert not tracemalloc.is_tracing()
+    assert regs[0]["pico_bytes"] >= 1 << 20
@@ -0,0 +1,51 @@
+# tests/test_github_api.py — Cache de ETag do ClienteGitHub: guarda só os metadados, nunca o base64
+import base64
+
+from gpa.github_api import ClienteGitHub
+
+CONTEUDO = base64.b64encode(b"x" * 200_000).decode()
+
+
+class _Resposta:
+    def __init__(self, status, dados=None, etag=None):
+        self.status_code, self._dados, self.text = status, dados, ""
+        self.headers = {"ETag": etag} if etag else {}
+
+    def json(self):
+        return self._dados
+
+
+def _cliente(respostas, cabecalhos):
+    cli = ClienteGitHub("t", "o", "r", base_url="http://local")
+
+    def requisitar(metodo, url, corpo=None, **kwargs):
+        cabecalhos.append(kwargs.get("headers") or {})
+        return respostas.pop(0)
+
+    cli.requisitar = requisitar
+    return cli
+
+
+def test_sha_nao_guarda_content_e_304_reaproveita():
+    arquivo = {"name": "a.csv", "path": "data/a.csv", "type": "file", "sha": "s1", "size": 150_000,
+               "content": CONTEUDO, "encoding": "base64"}
+    cabecalhos = []
+    cli = _cliente([_Resposta(200, arquivo, etag='"e1"'), _Resposta(304)], cabecalhos)
+
+    assert cli.sha_arquivo("data/a.csv") == ("s1", None)
+    (etag, guardado), = cli._etags.values()
+    assert "content" not in guardado and len(repr(guardado)) < 200
+
+    assert cli.sha_arquivo("data/a.csv") == ("s1", None)
+    assert cabecalhos[1] == {"If-None-Match": '"e1"'} and cli.respostas_304 == 1
+
+
+def test_listagem_usa_a_mesma_entrada():
+    itens = [{"name": f"{i}.csv", "path": f"data/{i}.csv", "type": "file", "sha": f"s{i}", "size": i,
+              "url": "http://...", "_links": {"self": "..."}} for i in range(3)]
+    cli = _cliente([_Resposta(200, itens, etag='"e2"'), _Resposta(304)], [])
+    ok, out = cli.listar("data")
+    assert ok and out[2] == {"name": "2.csv", "path": "data/2.csv", "type": "file", "sha": "s2", "size": 2}
+    out[0]["sha"] = "alterado"  # o retorno é uma cópia: não corrompe o cache
+    ok, out = cli.listar("data")
+    assert ok and out[0]["sha"] == "s0"
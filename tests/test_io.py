@@ -0,0 +1,60 @@
+# tests/test_io.py — Leitura robusta e CacheLeituras: o dialeto informado/em cache pula o sniffing
+import io
+
+import pytest
+
+import gpa.io as gio
+
+CSV = ("Nome;Turma;DescrMateria;DescrAvaliacao;Nota\r\n"
+       + "".join(f"ALUNO {i};6º ANO A;Matemática;P1;{i % 10},5\r\n" for i in range(50))).encode("latin-1")
+
+
+@pytest.fixture
+def sniffs(monkeypatch):
+    """Conta as chamadas de detectar_dialeto feitas por leitura_robusta."""
+    chamadas = []
+    original = gio.detectar_dialeto
+
+    def contar(bruto, *args, **kwargs):
+        chamadas.append(len(bruto))
+        return original(bruto, *args, **kwargs)
+
+    monkeypatch.setattr(gio, "detectar_dialeto", contar)
+    return chamadas
+
+
+def test_sem_dialeto_detecta_uma_vez(sniffs):
+    df, d = gio.leitura_robusta(CSV, retornar_dialeto=True)
+    assert len(df) == 50 and d.sep == ";" and d.decimal == ","
+    assert len(sniffs) == 1
+
+
+def test_dialeto_informado_nao_detecta(sniffs):
+    _, d = gio.leitura_robusta(CSV, retornar_dialeto=True)
+    sniffs.clear()
+    df, d2 = gio.leitura_robusta(CSV, dialeto=d, retornar_dialeto=True)
+    assert len(df) == 50 and df["Nota"].iloc[1] == 1.5
+    assert d2.origem == "informado"
+    assert sniffs == []
+
+
+def test_dialeto_informado_invalido_cai_no_sniffing(sniffs):
+    errado = gio.Dialeto(encoding="utf-8", sep="|", engine="c")
+    df, d = gio.leitura_robusta(CSV, dialeto=errado, retornar_dialeto=True)
+    assert len(df) == 50 and d.sep == ";"
+    assert len(sniffs) == 1
+
+
+def test_previa_e_promocao_detectam_uma_vez(sniffs):
+    cache = gio.CacheLeituras()
+    arquivo = io.BytesIO(CSV)
+    previa, d = cache.ler(arquivo, nrows=10)
+    assert len(previa) == 10 and len(sniffs) == 1
+
+    completo, d2 = cache.ler(arquivo)  # "Processar": promove a leitura parcial com o dialeto já detectado
+    assert len(completo) == 50 and d2.sep == d.sep
+    assert len(sniffs) == 1
+
+    # O dialeto repassado aos processos de ingestão também não é detectado de novo
+    df, _ = gio.leitura_robusta(CSV, dialeto=cache.dialeto_em_cache(CSV), retornar_dialeto=True)
+    assert len(df) == 50 and len(sniffs) == 1
@@ -0,0 +1,30 @@
+# tests/test_texto.py — Normalização de textos: "já normalizada" é decidido pelos dados, não pelo buffer
+import numpy as np
+import pandas as pd
+
+from gpa.texto import normalizar_textos_df
+
+
+def _df():
+    return pd.DataFrame({"Disciplina": ["CiÃªncias", " Matemática ", "Arte"] * 3,
+                         "Estudante": ["ANA", "JOÃƒO", np.nan] * 3, "Nota": np.arange(9.0)})
+
+
+def test_normaliza():
+    df = normalizar_textos_df(_df())
+    assert list(df["Disciplina"][:3]) == ["Ciências", "Matemática", "Arte"]
+    assert df["Estudante"][2] == "nan"  # como astype(str)
+
+
+def test_edicao_no_lugar_e_renormalizada():
+    df = normalizar_textos_df(_df())
+    df.loc[0, "Disciplina"] = "CiÃªncias  "
+    normalizar_textos_df(df)
+    assert df.loc[0, "Disciplina"] == "Ciências"
+
+
+def test_coluna_limpa_nao_e_regravada():
+    df = normalizar_textos_df(_df())
+    antes = df["Disciplina"].to_numpy()
+    normalizar_textos_df(df)
+    assert df["Disciplina"].to_numpy() is antes or np.shares_memory(df["Disciplina"].to_numpy(), antes)